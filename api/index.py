@@ -3,10 +3,22 @@ Vercel serverless entrypoint for the Road Sign Classification API.
 
 This file adapts the existing FastAPI application so that the Vercel
 runtime can import and run it as an ASGI-compatible handler.
+
+To keep cold starts short, importing this module does not import FastAPI or
+the backend. ``app`` is a small ASGI shim that answers ``GET /api/health``
+on its own until the backend is loaded, and imports ``backend.app`` (in a
+worker thread, so health checks keep being served) on the first other
+request. With WARMUP_ON_START set, the backend is loaded and the upstream
+connection opened in the background as soon as the instance starts.
 """
 
 from pathlib import Path
+import asyncio
+import json
+import logging
+import os
 import sys
+import threading
 
 # Ensure the backend package is importable when running in the Vercel runtime.
 ROOT_DIR = Path(__file__).resolve().parent.parent
@@ -18,9 +30,171 @@ if str(ROOT_DIR) not in sys.path:
 if str(BACKEND_PATH) not in sys.path:
     sys.path.insert(0, str(BACKEND_PATH))
 
-from backend.app import app  # noqa: E402  pylint: disable=C0413  (import after path setup)
+logger = logging.getLogger(__name__)
 
-# The variable `app` is what Vercel will look for when handling requests.
-__all__ = ["app"]
+HEALTH_PATHS = ("/api/health", "/health")
+
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "").lower() in ("1", "true", "yes")
+
+
+def load_backend_app():
+    """Import the FastAPI application (the expensive part of a cold start)."""
+    from backend.app import app as backend_app  # pylint: disable=C0415
+
+    return backend_app
+
+
+class FastStartApp:
+    """
+    ASGI application that defers importing the backend until it is needed.
+    """
+
+    def __init__(self, loader=load_backend_app, warm_up=WARMUP_ON_START):
+        self._loader = loader
+        self._warm_up = warm_up
+        self._app = None
+        self._load_lock = threading.Lock()
+        self._loading = None
+        self._warm_up_started = False
+        # Lifespan of the backend app, when the server supports lifespan events
+        self._lifespan_supported = False
+        self._inner_lifespan = None
+
+    @property
+    def loaded(self):
+        return self._app is not None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+
+        if self._app is None and self._is_health_check(scope):
+            self._start_warm_up()
+            await self._send_health(send)
+            return
+
+        backend_app = await self.get_app()
+        await backend_app(scope, receive, send)
+
+    async def get_app(self):
+        """Return the backend app, importing it on first use."""
+        if self._app is not None:
+            return self._app
+
+        loop = asyncio.get_running_loop()
+        if self._loading is None or self._loading.get_loop() is not loop:
+            self._loading = loop.create_task(self._load())
+        return await asyncio.shield(self._loading)
+
+    async def _load(self):
+        try:
+            backend_app = await asyncio.to_thread(self._load_sync)
+        except BaseException:
+            # Let the next request retry the import
+            self._loading = None
+            raise
+        if self._lifespan_supported and self._inner_lifespan is None:
+            self._inner_lifespan = _LifespanDriver(backend_app)
+            await self._inner_lifespan.startup()
+        return backend_app
 
+    def _load_sync(self):
+        with self._load_lock:
+            if self._app is None:
+                self._app = self._loader()
+            return self._app
 
+    def _start_warm_up(self):
+        """Load the backend in the background (WARMUP_ON_START)."""
+        if not self._warm_up or self._warm_up_started:
+            return
+        self._warm_up_started = True
+        asyncio.get_running_loop().create_task(self._warm_up_backend())
+
+    async def _warm_up_backend(self):
+        try:
+            await self.get_app()
+            if not self._lifespan_supported:
+                # The backend lifespan warms up when it runs; otherwise do it here
+                from services.classification_service import classification_service
+
+                await classification_service.warm_up()
+        except Exception as exc:  # warm-up is best effort
+            logger.warning("Backend warm-up failed: %s", exc)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self._lifespan_supported = True
+                self._start_warm_up()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._inner_lifespan is not None:
+                    await self._inner_lifespan.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    def _is_health_check(scope):
+        return (
+            scope["type"] == "http"
+            and scope["method"] in ("GET", "HEAD")
+            and scope["path"] in HEALTH_PATHS
+        )
+
+    @staticmethod
+    async def _send_health(send):
+        body = json.dumps({"status": "ok", "message": "API is running"}).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+class _LifespanDriver:
+    """
+    Runs an ASGI app's lifespan protocol after the server's own lifespan
+    startup has already completed (the backend is loaded lazily).
+    """
+
+    def __init__(self, asgi_app):
+        self._app = asgi_app
+        self._receive_queue = asyncio.Queue()
+        self._started = asyncio.Event()
+        self._stopped = asyncio.Event()
+        self._task = None
+
+    async def startup(self):
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        self._task = asyncio.get_running_loop().create_task(
+            self._app(scope, self._receive_queue.get, self._send)
+        )
+        # An app that does not support lifespan simply returns or raises
+        self._task.add_done_callback(lambda _: (self._started.set(), self._stopped.set()))
+        await self._receive_queue.put({"type": "lifespan.startup"})
+        await self._started.wait()
+
+    async def shutdown(self):
+        await self._receive_queue.put({"type": "lifespan.shutdown"})
+        await self._stopped.wait()
+
+    async def _send(self, message):
+        if message["type"].startswith("lifespan.startup"):
+            self._started.set()
+        elif message["type"].startswith("lifespan.shutdown"):
+            self._stopped.set()
+
+
+# The variable `app` is what Vercel will look for when handling requests.
+app = FastStartApp()
+
+__all__ = ["app"]
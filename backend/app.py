@@ -1,16 +1,51 @@
 import os
+from contextlib import asynccontextmanager
 
-from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DOTENV_PATH = os.path.join(BASE_DIR, ".env")
 
-# Load environment variables from backend/.env if available
-load_dotenv(dotenv_path=DOTENV_PATH, override=False)
-
-app = FastAPI(title="Road Sign Classification API", version="1.0.0")
+# Load environment variables from backend/.env if available (the import is
+# skipped when there is no .env file, e.g. on serverless deployments)
+if os.path.exists(DOTENV_PATH):
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path=DOTENV_PATH, override=False)
+
+# Open the upstream connection (or load the local model) during startup so the
+# first request does not pay for it
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "").lower() in ("1", "true", "yes")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared upstream clients on startup and close them on shutdown."""
+    from services.classification_service import classification_service
+    from services.job_queue import job_queue
+    from services.profiler import profiling_service
+    from services.results_store import results_store
+
+    # Answer SIGUSR2 profile requests from sibling workers (PROFILER_TOKEN)
+    profiling_service.install()
+    await classification_service.startup()
+    if WARMUP_ON_START:
+        await classification_service.warm_up()
+    await job_queue.start()
+    try:
+        yield
+    finally:
+        # Finish queued classifications before closing upstream clients
+        await job_queue.stop()
+        await classification_service.shutdown()
+        # Commit any queued results before the process exits
+        results_store.close()
+        profiling_service.uninstall()
+
+
+app = FastAPI(title="Road Sign Classification API", version="1.0.0", lifespan=lifespan)
 
 # Configure CORS for frontend access
 # Allow all origins in production (Vercel serves frontend and API from same domain)
@@ -33,23 +68,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profiles single requests sent with X-Profile (when PROFILER_TOKEN is set)
+from services.profiler import ProfilerMiddleware
+
+app.add_middleware(ProfilerMiddleware)
+
+# Request counts, latency and in-flight requests for /metrics
+from services.metrics import MetricsMiddleware
+
+app.add_middleware(MetricsMiddleware)
+
 # Import routes
-from routes import upload_routes, classification_routes
+from routes import upload_routes, classification_routes, debug_routes
 
 app.include_router(upload_routes.router, prefix="/api/upload", tags=["upload"])
 app.include_router(classification_routes.router, prefix="/api/classification", tags=["classification"])
+app.include_router(debug_routes.router, prefix="/debug", include_in_schema=False)
 
 
 @app.get("/health")
 def health():
-    """Health check endpoint"""
-    return {"status": "ok"}
+    """Health check endpoint (includes circuit breaker state)"""
+    from services.classification_service import classification_service
+
+    return {"status": "ok", "classification": classification_service.health()}
 
 
 @app.get("/api/health")
 def api_health():
     """Health check endpoint for Vercel deployment"""
-    return {"status": "ok", "message": "API is running"}
+    from services.classification_service import classification_service
+
+    return {
+        "status": "ok",
+        "message": "API is running",
+        "classification": classification_service.health(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics (per-stage latency, backend counters, payload sizes)"""
+    from services.metrics import CONTENT_TYPE, registry
+
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,3 @@
+"""
+Benchmark suite for the classification API (see "Benchmarks" in README.md).
+"""
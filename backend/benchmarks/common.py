@@ -0,0 +1,132 @@
+"""
+Benchmark Helpers
+Related Jira Ticket: RSCI-10
+
+Shared helpers for the benchmark scripts: latency summaries, test images,
+peak memory readings and the JSON report envelope.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from io import BytesIO
+from typing import Dict, List, Optional, Sequence
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(samples: Sequence[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of ``samples`` (0-100), or None when empty."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def summarize_latencies(samples: Sequence[float]) -> Dict:
+    """Latency summary in milliseconds."""
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        "count": len(samples),
+        "mean_ms": ms(sum(samples) / len(samples)) if samples else None,
+        "p50_ms": ms(percentile(samples, 50)),
+        "p95_ms": ms(percentile(samples, 95)),
+        "p99_ms": ms(percentile(samples, 99)),
+        "max_ms": ms(max(samples)) if samples else None,
+    }
+
+
+def make_image(edge: int, image_format: str = "JPEG", variant: int = 0) -> bytes:
+    """
+    Encode a ``edge`` x ``edge`` test image with some structure, so that
+    encoders and resamplers do realistic work (flat images compress to nothing).
+    Different ``variant`` values give different image bytes.
+    """
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", (edge, edge), (235, 235, 235))
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((edge // 8, edge // 8, edge * 7 // 8, edge * 7 // 8), fill=(200, 20, 30))
+    draw.rectangle((edge // 4, edge * 7 // 16, edge * 3 // 4, edge * 9 // 16), fill=(250, 250, 250))
+    noise = Image.effect_noise((max(1, edge // 4), max(1, edge // 4)), 40).convert("RGB")
+    image = Image.blend(image, noise.resize((edge, edge)), 0.15)
+    # Encode the variant in the corner pixels so every image hashes differently
+    for bit in range(16):
+        if variant >> bit & 1:
+            image.putpixel((bit % edge, 0), (0, 0, 0))
+
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, quality=90)
+    return buffer.getvalue()
+
+
+def peak_rss_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """
+    Peak resident set size of ``pid`` (default: this process), or None if
+    it cannot be determined on this platform.
+    """
+    if pid is not None:
+        try:
+            with open(f"/proc/{pid}/status", encoding="ascii") as status:
+                for line in status:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            return None
+        return None
+
+    try:
+        # Unix-only; imported here so the suite still imports on Windows
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(kind: str, config: Dict, results: List[Dict]) -> Dict:
+    """Wrap benchmark results with enough metadata to compare runs."""
+    return {
+        "benchmark": kind,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": config,
+        "results": results,
+    }
+
+
+def write_report(report: Dict, output: Optional[str]) -> None:
+    """Write the report as JSON to ``output`` (or stdout when not given)."""
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as report_file:
+            report_file.write(text + "\n")
+        print(f"Wrote {output}", file=sys.stderr)
+    else:
+        print(text)
@@ -0,0 +1,90 @@
+"""
+Compare Benchmark Reports
+Related Jira Ticket: RSCI-10
+
+Compares two JSON reports written by ``load_test``, ``micro_benchmarks`` or
+``request_memory`` and flags regressions beyond a threshold:
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.10
+
+Exits with status 1 when any scenario regressed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, Optional, Tuple
+
+# Metric name -> True when higher is better
+LOAD_METRICS = {"requests_per_second": True, "p50_ms": False, "p95_ms": False, "p99_ms": False}
+MICRO_METRICS = {"best_us": False, "peak_bytes": False}
+
+
+def _scenario_key(result: Dict) -> str:
+    if "endpoint" in result:
+        return f"{result['endpoint']} edge={result['image_edge']} c={result['concurrency']}"
+    params = ",".join(f"{key}={value}" for key, value in sorted(result["params"].items()))
+    return f"{result['name']}({params})"
+
+
+def _metrics(result: Dict) -> Iterator[Tuple[str, Optional[float], bool]]:
+    if "endpoint" in result:
+        for name, higher_is_better in LOAD_METRICS.items():
+            value = result.get(name, result["latency"].get(name))
+            yield name, value, higher_is_better
+    else:
+        for name, higher_is_better in MICRO_METRICS.items():
+            yield name, result.get(name), higher_is_better
+
+
+def compare(baseline: Dict, candidate: Dict, threshold: float) -> Tuple[list, bool]:
+    """
+    Return (rows, regressed) where each row is
+    (scenario, metric, baseline, candidate, relative_change, regressed).
+    """
+    baseline_results = {_scenario_key(result): result for result in baseline["results"]}
+    rows = []
+    regressed = False
+    for result in candidate["results"]:
+        key = _scenario_key(result)
+        previous = baseline_results.get(key)
+        if previous is None:
+            continue
+        old_metrics = {name: value for name, value, _ in _metrics(previous)}
+        for name, value, higher_is_better in _metrics(result):
+            old = old_metrics.get(name)
+            if not old or value is None:
+                continue
+            change = (value - old) / old
+            worse = -change if higher_is_better else change
+            is_regression = worse > threshold
+            regressed = regressed or is_regression
+            rows.append((key, name, old, value, change, is_regression))
+    return rows, regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative change counted as a regression (default 0.10)")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    with open(args.candidate, encoding="utf-8") as candidate_file:
+        candidate = json.load(candidate_file)
+
+    rows, regressed = compare(baseline, candidate, args.threshold)
+    for key, name, old, new, change, is_regression in rows:
+        marker = "REGRESSION" if is_regression else ""
+        print(f"{key:45s} {name:20s} {old:>12.3f} -> {new:>12.3f} {change:+8.1%} {marker}")
+
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Fake Gemini Server
+Related Jira Ticket: RSCI-10
+
+A local stand-in for the Gemini ``generateContent`` endpoint, used by the
+load tests so results do not depend on the real API, its quota or network
+conditions. Latency follows a configurable distribution and a configurable
+fraction of requests fails with a retryable status.
+
+Run standalone:
+    python -m benchmarks.fake_gemini --port 8090 --latency lognormal:0.3:0.5 --error-rate 0.05
+
+Then start the API with GEMINI_API=fake and GEMINI_API_BASE=http://127.0.0.1:8090.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator, Optional
+
+PREDICTIONS = [
+    {"label": "Stop", "confidence": 0.91},
+    {"label": "Yield", "confidence": 0.05},
+    {"label": "No Entry", "confidence": 0.04},
+]
+
+
+def parse_latency(spec: str, rng: random.Random = random) -> Callable[[], float]:
+    """
+    Build a latency sampler (seconds) from a spec string:
+
+    - ``fixed:0.2`` - always 200 ms
+    - ``uniform:0.1:0.5`` - uniform between 100 and 500 ms
+    - ``lognormal:0.3:0.5`` - log-normal with median 300 ms and sigma 0.5
+      (long tail, closest to real upstream behaviour)
+    - ``stall:0.3:0.5:0.02:20`` - the same log-normal, except that 2% of
+      requests stall for 20 s (the occasional very slow upstream call)
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(":") if value]
+
+    if kind == "fixed":
+        (seconds,) = values or [0.0]
+        return lambda: seconds
+    if kind == "uniform":
+        low, high = values
+        return lambda: rng.uniform(low, high)
+    if kind == "lognormal":
+        median, sigma = values
+        mu = math.log(median)
+        return lambda: rng.lognormvariate(mu, sigma)
+    if kind == "stall":
+        median, sigma, probability, stall_seconds = values
+        mu = math.log(median)
+        return lambda: stall_seconds if rng.random() < probability else rng.lognormvariate(mu, sigma)
+    raise ValueError(f"Unknown latency distribution: {spec!r}")
+
+
+class FakeGeminiServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering ``POST /v1beta/<model>:generateContent``.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        latency: Callable[[], float],
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        rng: Optional[random.Random] = None,
+    ):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = rng or random.Random()
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def next_outcome(self) -> bool:
+        """Count the request and return True if it should fail."""
+        with self._lock:
+            self.requests += 1
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return failed
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeGeminiServer
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):  # noqa: N802 (http.server naming)
+        length = int(self.headers.get("Content-Length", "0"))
+        body = self.rfile.read(length)
+
+        if not self.path.split("?")[0].endswith(":generateContent"):
+            self._reply(404, {"error": {"message": "Not found"}})
+            return
+
+        time.sleep(max(0.0, self.server.latency()))
+
+        if self.server.next_outcome():
+            self._reply(self.server.error_status, {"error": {"message": "Injected failure"}})
+            return
+
+        try:
+            payload = json.loads(body)
+            parts = payload["contents"][0]["parts"]
+        except (ValueError, KeyError, IndexError):
+            self._reply(400, {"error": {"message": "Invalid JSON payload"}})
+            return
+
+        # Packed requests carry several images and get one entry per image
+        images = sum(1 for part in parts if "inlineData" in part)
+        if images > 1:
+            text = json.dumps(
+                [{"index": index, "predictions": PREDICTIONS} for index in range(images)]
+            )
+        else:
+            text = json.dumps({"predictions": PREDICTIONS})
+
+        self._reply(
+            200,
+            {
+                "candidates": [{"content": {"parts": [{"text": text}]}}],
+                "usageMetadata": {"promptTokenCount": 300, "candidatesTokenCount": 40 * images},
+            },
+        )
+
+    def _reply(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):  # keep benchmark output clean
+        return
+
+
+@contextmanager
+def run_fake_gemini(
+    latency: str = "fixed:0",
+    error_rate: float = 0.0,
+    error_status: int = 503,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    seed: Optional[int] = None,
+) -> Iterator[FakeGeminiServer]:
+    """
+    Run a fake Gemini server in a background thread for the duration of the block.
+    ``port=0`` picks a free port; read it from ``server.base_url``.
+    """
+    rng = random.Random(seed)
+    server = FakeGeminiServer(
+        (host, port), parse_latency(latency, rng), error_rate, error_status, rng=rng
+    )
+    thread = threading.Thread(target=server.serve_forever, name="fake-gemini", daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a fake Gemini generateContent server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default="lognormal:0.3:0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    args = parser.parse_args()
+
+    with run_fake_gemini(
+        args.latency, args.error_rate, args.error_status, args.host, args.port
+    ) as server:
+        print(f"Fake Gemini listening on {server.base_url} (latency {args.latency})")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
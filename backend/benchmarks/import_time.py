@@ -0,0 +1,148 @@
+"""
+Import Time Profile
+Related Jira Ticket: RSCI-10
+
+Measures how long the cold-start import path takes, using ``python -X
+importtime`` in fresh interpreters, and reports the slowest modules and any
+heavy dependencies that were imported eagerly:
+
+    python -m benchmarks.import_time --runs 5 --budget-ms api.index=150 app=1500
+
+Targets are ``api.index`` (the serverless entry point, which should only
+load the fast-start shim) and ``app`` (the full FastAPI application).
+Exits with status 1 when a target exceeds its budget or imports a module
+that must stay lazy.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from benchmarks.common import BACKEND_DIR, build_report, write_report
+
+ROOT_DIR = os.path.dirname(BACKEND_DIR)
+
+# Modules that must not be imported until first use, per target
+LAZY_MODULES = {
+    "api.index": ["fastapi", "pydantic", "httpx", "numpy", "PIL", "dotenv", "requests"],
+    "app": ["httpx", "numpy", "PIL", "requests", "onnxruntime"],
+}
+
+
+def profile_import(target: str) -> Tuple[float, List[Tuple[str, int, int]], List[str]]:
+    """
+    Import ``target`` in a fresh interpreter with ``-X importtime``.
+
+    Returns (total_ms, [(module, self_us, cumulative_us), ...], loaded_lazy_modules).
+    """
+    lazy = LAZY_MODULES.get(target, [])
+    code = (
+        "import sys; "
+        f"sys.path[:0] = [{ROOT_DIR!r}, {BACKEND_DIR!r}]; "
+        f"import {target}; "
+        f"print(','.join(m for m in {lazy!r} if m in sys.modules))"
+    )
+    env = dict(os.environ)
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules = []
+    for line in completed.stderr.splitlines():
+        # "import time: <self us> | <cumulative us> | <module>"
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if self_us.strip().isdigit():
+            modules.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    # Cumulative time of the target itself covers everything it imported
+    total_us = next(
+        (cumulative for name, _, cumulative in reversed(modules) if name == target),
+        sum(self_us for _, self_us, _ in modules),
+    )
+    loaded = [name for name in completed.stdout.strip().split(",") if name]
+    return total_us / 1000, modules, loaded
+
+
+def profile_target(target: str, runs: int, top: int) -> Dict:
+    totals = []
+    modules: List[Tuple[str, int, int]] = []
+    loaded: List[str] = []
+    for _ in range(runs):
+        total_ms, modules, loaded = profile_import(target)
+        totals.append(total_ms)
+
+    slowest = sorted(modules, key=lambda module: module[1], reverse=True)[:top]
+    return {
+        "target": target,
+        "runs": runs,
+        "median_ms": round(statistics.median(totals), 2),
+        "min_ms": round(min(totals), 2),
+        "modules_imported": len(modules),
+        "eagerly_imported_lazy_modules": loaded,
+        "slowest_modules": [
+            {
+                "module": name,
+                "self_ms": round(self_us / 1000, 2),
+                "cumulative_ms": round(cumulative_us / 1000, 2),
+            }
+            for name, self_us, cumulative_us in slowest
+        ],
+    }
+
+
+def parse_budgets(values: List[str]) -> Dict[str, float]:
+    budgets = {}
+    for value in values:
+        target, _, milliseconds = value.partition("=")
+        budgets[target] = float(milliseconds)
+    return budgets
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile cold-start import time")
+    parser.add_argument("--targets", nargs="+", default=["api.index", "app"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to report")
+    parser.add_argument("--budget-ms", nargs="*", default=[],
+                        help="Per-target budgets, e.g. api.index=150 app=1500")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+
+    budgets = parse_budgets(args.budget_ms)
+    results = []
+    failed = False
+    for target in args.targets:
+        result = profile_target(target, args.runs, args.top)
+        budget = budgets.get(target)
+        result["budget_ms"] = budget
+        result["within_budget"] = budget is None or result["median_ms"] <= budget
+        results.append(result)
+        eager = result["eagerly_imported_lazy_modules"]
+        failed = failed or not result["within_budget"] or bool(eager)
+        print(
+            f"{target}: median {result['median_ms']} ms"
+            + (f" (budget {budget} ms)" if budget is not None else "")
+            + (f", eagerly imported: {', '.join(eager)}" if eager else ""),
+            file=sys.stderr,
+        )
+
+    config = {"targets": args.targets, "runs": args.runs, "budgets": budgets}
+    write_report(build_report("import_time", config, results), args.output)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
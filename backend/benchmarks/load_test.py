@@ -0,0 +1,236 @@
+"""
+Load Test
+Related Jira Ticket: RSCI-10
+
+Drives ``/api/classification/classify`` and ``/api/upload/`` at fixed
+concurrency levels and image sizes and reports throughput, latency
+percentiles and the server's peak RSS as JSON.
+
+By default the API is started in a subprocess (uvicorn) and pointed at a
+local fake Gemini server, so runs are reproducible:
+
+    python -m benchmarks.load_test --concurrency 1 8 32 --sizes 64 640 1920 \\
+        --requests 200 --latency lognormal:0.3:0.5 --output load.json
+
+Use ``--target http://host:port`` to benchmark an already running server
+instead (peak RSS is then not reported).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import (
+    BACKEND_DIR,
+    build_report,
+    make_image,
+    peak_rss_bytes,
+    summarize_latencies,
+    write_report,
+)
+from benchmarks.fake_gemini import run_fake_gemini
+
+ENDPOINTS = {
+    "classify": "/api/classification/classify",
+    "upload": "/api/upload/",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(
+    port: int, gemini_base: Optional[str], env_overrides: Dict, workers: int = 1
+) -> subprocess.Popen:
+    """Start the API with the production launcher in a subprocess and wait until it is healthy."""
+    env = dict(os.environ)
+    env.pop("GEMINI_API", None)
+    env["RESULTS_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "results.db")
+    if gemini_base:
+        env["GEMINI_API"] = "benchmark-key"
+        env["GEMINI_API_BASE"] = gemini_base
+    env.update(env_overrides)
+
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "server.py",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("API server did not become healthy within 30 seconds")
+
+
+async def run_scenario(
+    base_url: str, endpoint: str, images: List[bytes], concurrency: int, total_requests: int
+) -> Dict:
+    """
+    Send ``total_requests`` uploads, cycling through ``images``, with
+    ``concurrency`` workers.
+    """
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    remaining = iter(range(total_requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+
+        async def worker():
+            for index in remaining:
+                image = images[index % len(images)]
+                started = time.perf_counter()
+                try:
+                    response = await client.post(
+                        endpoint, files={"file": ("sign.jpg", image, "image/jpeg")}
+                    )
+                    status = str(response.status_code)
+                except httpx.TransportError as exc:
+                    status = exc.__class__.__name__
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    succeeded = sum(count for status, count in statuses.items() if status.startswith("2"))
+    return {
+        "requests": total_requests,
+        "elapsed_seconds": round(elapsed, 3),
+        "requests_per_second": round(total_requests / elapsed, 2) if elapsed else None,
+        "success_ratio": round(succeeded / total_requests, 4) if total_requests else None,
+        "statuses": statuses,
+        "latency": summarize_latencies(latencies),
+    }
+
+
+async def run_load_test(args, base_url: str, server_pid: Optional[int]) -> List[Dict]:
+    results = []
+    for size in args.sizes:
+        # Distinct images, so concurrent requests are not coalesced into one
+        # upstream call (use --distinct-images 1 to measure coalescing)
+        images = [make_image(size, variant=variant) for variant in range(args.distinct_images)]
+        for endpoint_name in args.endpoints:
+            for concurrency in args.concurrency:
+                if args.warmup:
+                    await run_scenario(
+                        base_url, ENDPOINTS[endpoint_name], images, concurrency, args.warmup
+                    )
+                scenario = await run_scenario(
+                    base_url, ENDPOINTS[endpoint_name], images, concurrency, args.requests
+                )
+                # VmHWM is the high-water mark since the server started
+                scenario.update(
+                    endpoint=endpoint_name,
+                    image_edge=size,
+                    image_bytes=len(images[0]),
+                    concurrency=concurrency,
+                    server_peak_rss_bytes=peak_rss_bytes(server_pid) if server_pid else None,
+                )
+                results.append(scenario)
+                print(
+                    f"{endpoint_name:9s} edge={size:5d} c={concurrency:3d} "
+                    f"{scenario['requests_per_second']} req/s "
+                    f"p50={scenario['latency']['p50_ms']}ms p99={scenario['latency']['p99_ms']}ms",
+                    file=sys.stderr,
+                )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the classification API")
+    parser.add_argument("--target", help="Benchmark a running server instead of starting one")
+    parser.add_argument(
+        "--endpoints", nargs="+", choices=sorted(ENDPOINTS), default=sorted(ENDPOINTS)
+    )
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[64, 640, 1920],
+                        help="Square image edge lengths in pixels")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--distinct-images", type=int, default=64,
+                        help="Number of different images cycled through per size")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per scenario")
+    parser.add_argument("--latency", default="lognormal:0.3:0.5",
+                        help="Fake Gemini latency distribution (see fake_gemini.parse_latency)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of fake Gemini requests answered with 503")
+    parser.add_argument("--no-gemini", action="store_true",
+                        help="Run the API without Gemini (stubbed classifications)")
+    parser.add_argument("--result-cache", action="store_true",
+                        help="Keep the result cache and near-duplicate index enabled "
+                        "(repeated images skip Gemini)")
+    parser.add_argument("--hedging", action="store_true",
+                        help="Enable hedged Gemini requests (CLASSIFICATION_HEDGING)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="API worker processes (see server.py)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+
+    if args.target:
+        results = asyncio.run(run_load_test(args, args.target.rstrip("/"), None))
+        write_report(build_report("load_test", config, results), args.output)
+        return
+
+    with run_fake_gemini(args.latency, args.error_rate, seed=args.seed) as fake_gemini:
+        port = _free_port()
+        # Images repeat (and variants differ by a few pixels), so the result
+        # cache and near-duplicate index would otherwise answer most requests
+        # without calling Gemini
+        env_overrides = {} if args.result_cache else {
+            "CLASSIFICATION_CACHE_MAX_ENTRIES": "0",
+            "NEAR_DUPLICATE_MAX_ENTRIES": "0",
+        }
+        if args.hedging:
+            env_overrides["CLASSIFICATION_HEDGING"] = "1"
+        gemini_base = None if args.no_gemini else fake_gemini.base_url
+        server = start_server(port, gemini_base, env_overrides, workers=args.workers)
+        try:
+            # With several workers the supervisor's RSS would be meaningless
+            server_pid = server.pid if args.workers == 1 else None
+            results = asyncio.run(run_load_test(args, f"http://127.0.0.1:{port}", server_pid))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        config["fake_gemini"] = {"requests": fake_gemini.requests, "errors": fake_gemini.errors}
+
+    write_report(build_report("load_test", config, results), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Micro Benchmarks
+Related Jira Ticket: RSCI-10
+
+Times the hot helpers of the classification path in isolation:
+upload size validation, base64 encoding of the image payload, parsing of
+Gemini prediction text, mapping labels onto the canonical vocabulary and
+perceptual hashing for near-duplicate lookups.
+Results are written as JSON.
+
+    python -m benchmarks.micro_benchmarks --output micro.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import random
+import sys
+import timeit
+from io import BytesIO
+from typing import Callable, Dict, List
+
+from benchmarks.common import BACKEND_DIR, build_report, write_report
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from fastapi import UploadFile  # noqa: E402
+
+from services.classification_service import (  # noqa: E402
+    GeminiClassificationService,
+    StubbedClassificationService,
+)
+from services.label_index import DEFAULT_ALIASES, LabelIndex  # noqa: E402
+from services.perceptual_hash import (  # noqa: E402
+    HASH_BITS,
+    THUMBNAIL_SIZE,
+    Fingerprint,
+    NearDuplicateIndex,
+    fingerprint,
+)
+from services.validation_service import validate_file_size  # noqa: E402
+
+PAYLOAD_SIZES = (64 * 1024, 512 * 1024, 5 * 1024 * 1024)
+
+PREDICTION_TEXTS = {
+    "plain_json": json.dumps(
+        {
+            "predictions": [
+                {"label": "Stop", "confidence": 0.91},
+                {"label": "Yield", "confidence": 0.05},
+                {"label": "No Entry", "confidence": 0.04},
+            ]
+        }
+    ),
+    "code_fenced": '```json\n{"predictions": [{"label": "Stop", "confidence": 0.91}, '
+    '{"label": "Yield", "confidence": 0.09}]}\n```',
+    "with_commentary": 'Here are the results: {"predictions": [{"label": "Stop", '
+    '"confidence": 0.91}]} Let me know if you need anything else.',
+}
+
+
+def measure(
+    name: str, function: Callable[[], object], repeat: int, min_time: float, **params
+) -> Dict:
+    """
+    Time ``function`` with timeit (auto-ranged to ``min_time`` seconds per
+    run) and report the best and median per-call time over ``repeat`` runs.
+    """
+    timer = timeit.Timer(function)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    runs = sorted(timer.repeat(repeat=repeat, number=number))
+    per_call = [run / number for run in runs]
+    return {
+        "name": name,
+        "params": params,
+        "calls_per_run": number,
+        "best_us": round(per_call[0] * 1e6, 3),
+        "median_us": round(per_call[len(per_call) // 2] * 1e6, 3),
+        "ops_per_second": round(1 / per_call[0], 1),
+    }
+
+
+def bench_validate_file_size(repeat: int, min_time: float) -> List[Dict]:
+    results = []
+    for size in PAYLOAD_SIZES:
+        content = os.urandom(size)
+
+        def run():
+            upload = UploadFile(file=BytesIO(content), filename="sign.jpg", size=size)
+            validate_file_size(upload)
+
+        results.append(measure("validate_file_size", run, repeat, min_time, bytes=size))
+
+        # Uploads without a declared size fall back to seeking the spooled file
+        def run_unknown_size():
+            validate_file_size(UploadFile(file=BytesIO(content), filename="sign.jpg"))
+
+        results.append(
+            measure(
+                "validate_file_size",
+                run_unknown_size,
+                repeat,
+                min_time,
+                bytes=size,
+                declared_size=False,
+            )
+        )
+    return results
+
+
+def bench_base64(repeat: int, min_time: float) -> List[Dict]:
+    results = []
+    for size in PAYLOAD_SIZES:
+        content = os.urandom(size)
+        results.append(
+            measure(
+                "base64_encode",
+                lambda: base64.b64encode(content).decode("utf-8"),
+                repeat,
+                min_time,
+                bytes=size,
+            )
+        )
+    return results
+
+
+def bench_parse_predictions(repeat: int, min_time: float) -> List[Dict]:
+    return [
+        measure(
+            "parse_predictions",
+            lambda: GeminiClassificationService._parse_predictions(text),
+            repeat,
+            min_time,
+            variant=variant,
+        )
+        for variant, text in PREDICTION_TEXTS.items()
+    ]
+
+
+def bench_label_index(repeat: int, min_time: float) -> List[Dict]:
+    index = LabelIndex(StubbedClassificationService.TRAFFIC_SIGNS, DEFAULT_ALIASES)
+    labels = {
+        "canonical": "Speed Limit 60",
+        "variant": "Speed limit 60 km/h",
+        "fuzzy": "Pedestrian crosing",
+    }
+    results = []
+    for variant, label in labels.items():
+        def run(label=label):
+            # Clearing the memo measures the uncached lookup
+            index._memo.clear()
+            index.resolve(label)
+
+        results.append(measure("label_index_resolve", run, repeat, min_time, variant=variant))
+
+    results.append(
+        measure(
+            "label_index_resolve",
+            lambda: index.resolve("Speed limit 60 km/h"),
+            repeat,
+            min_time,
+            variant="memoised",
+        )
+    )
+    return results
+
+
+def bench_perceptual_hash(repeat: int, min_time: float) -> List[Dict]:
+    from benchmarks.common import make_image
+
+    results = []
+    for edge in (256, 768):
+        image = make_image(edge)
+        results.append(
+            measure("fingerprint", lambda image=image: fingerprint(image), repeat, min_time, edge=edge)
+        )
+
+    rng = random.Random(1234)
+    thumbnail = bytes(THUMBNAIL_SIZE * THUMBNAIL_SIZE)
+    index = NearDuplicateIndex(max_entries=4096, frames_per_namespace=4096)
+    for _ in range(4096):
+        stored = Fingerprint(rng.getrandbits(HASH_BITS), thumbnail)
+        index.put("gemini:model:session", stored, {"classification": "Stop"})
+    probe = Fingerprint(rng.getrandbits(HASH_BITS), thumbnail)
+    results.append(
+        measure(
+            "near_duplicate_lookup",
+            lambda: index.get("gemini:model:session", probe),
+            repeat,
+            min_time,
+            entries=4096,
+        )
+    )
+    return results
+
+
+BENCHMARKS = {
+    "validate_file_size": bench_validate_file_size,
+    "base64": bench_base64,
+    "parse_predictions": bench_parse_predictions,
+    "label_index": bench_label_index,
+    "perceptual_hash": bench_perceptual_hash,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run classification path micro-benchmarks")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), default=sorted(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.05,
+                        help="Minimum seconds per timing run")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.only:
+        results.extend(BENCHMARKS[name](args.repeat, args.min_time))
+
+    config = {"only": args.only, "repeat": args.repeat, "min_time": args.min_time}
+    write_report(build_report("micro", config, results), args.output)
+
+
+if __name__ == "__main__":
+    main()
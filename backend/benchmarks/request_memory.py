@@ -0,0 +1,105 @@
+"""
+Request Body Memory Benchmark
+Related Jira Ticket: RSCI-10
+
+Measures the peak memory (tracemalloc) allocated while producing one Gemini
+request body, for the previous approach (base64 string inside a dict, then
+``json.dumps`` and encode, as ``httpx`` does for ``json=``) and for the
+streamed ``JsonStreamBody``:
+
+    python -m benchmarks.request_memory --sizes 256 2048 13312 --output memory.json
+
+Sizes are image sizes in KB. The image itself is allocated before tracing
+starts, so the reported peak is the extra memory one request needs; the
+``peak_ratio`` column is that peak divided by the image size.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import sys
+import tracemalloc
+from typing import Callable, Dict, List
+
+from benchmarks.common import BACKEND_DIR, build_report, write_report
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from services.classification_service import GeminiClassificationService  # noqa: E402
+from services.request_body import JsonStreamBody  # noqa: E402
+
+
+def json_body(image: bytes) -> int:
+    """Previous approach: base64 str in a dict, serialised in one piece."""
+    part = {
+        "inlineData": {
+            "mimeType": "image/jpeg",
+            "data": base64.b64encode(image).decode("utf-8"),
+        }
+    }
+    payload = {"contents": [{"role": "user", "parts": [{"text": "prompt"}, part]}]}
+    body = json.dumps(payload).encode("utf-8")
+    return len(body)
+
+
+def streamed_body(image: bytes) -> int:
+    """Streamed approach: chunks are produced and dropped, as a socket write would."""
+    parts = [{"text": "prompt"}, GeminiClassificationService._image_part(image, "image/jpeg")]
+    body = JsonStreamBody({"contents": [{"role": "user", "parts": parts}]})
+    sent = 0
+    for chunk in body.iter_chunks():
+        sent += len(chunk)
+    assert sent == len(body)
+    return sent
+
+
+STRATEGIES: Dict[str, Callable[[bytes], int]] = {
+    "json": json_body,
+    "stream": streamed_body,
+}
+
+
+def measure_peak(strategy: Callable[[bytes], int], image: bytes) -> Dict:
+    """Peak traced allocation (bytes) while ``strategy`` builds one body."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        body_bytes = strategy(image)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"body_bytes": body_bytes, "peak_bytes": peak, "peak_ratio": round(peak / len(image), 3)}
+
+
+def run(sizes_kb: List[int]) -> List[Dict]:
+    results = []
+    for size_kb in sizes_kb:
+        image = os.urandom(size_kb * 1024)
+        for name, strategy in STRATEGIES.items():
+            result = measure_peak(strategy, image)
+            results.append({"name": f"request_body_{name}", "params": {"kb": size_kb}, **result})
+            print(
+                f"{name:6s} {size_kb:>6d} KB: peak {result['peak_bytes'] / 1024:>9.1f} KB "
+                f"({result['peak_ratio']}x image)",
+                file=sys.stderr,
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure peak memory per Gemini request body")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[256, 2048, 13312],
+                        help="Image sizes in KB")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+
+    config = {"sizes_kb": args.sizes}
+    write_report(build_report("request_memory", config, run(args.sizes)), args.output)
+
+
+if __name__ == "__main__":
+    main()
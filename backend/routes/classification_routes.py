@@ -5,17 +5,199 @@ Related Jira Tickets: RSCI-10, RSCI-12, RSCI-13, RSCI-14
 This module handles classification endpoints for road sign images.
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File
+import asyncio
+import math
+import os
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query, Request, WebSocket
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-from services.validation_service import validate_file_type, validate_file_size
+from services.validation_service import (
+    validate_file_type,
+    read_validated_upload,
+    validate_image_content,
+    validate_frame,
+)
 from services.classification_service import classification_service
+from services.http_cache import CachedBody, response_cache
+from services.image_inspection import ImageInfo
+from services.job_queue import Job, QueueFullError, job_queue
+from services.metrics import payload_bytes, stage_seconds
+from services.preprocessing_service import image_preprocessor
+from services.quota_scheduler import QuotaExceededError
+from services.results_store import JobState, results_store
+from services.sign_detection import sign_detector
+from services.stream_service import FrameStreamSession
 from services.error_messages import get_error_message
 
 router = APIRouter()
 
+# Batch classification limits (configurable via environment)
+BATCH_MAX_FILES = int(os.getenv("CLASSIFY_BATCH_MAX_FILES", "32"))
+BATCH_CONCURRENCY = max(1, int(os.getenv("CLASSIFY_BATCH_CONCURRENCY", "4")))
+
+# Async (queued) classification settings
+RESULT_MAX_WAIT_SECONDS = float(os.getenv("CLASSIFY_RESULT_MAX_WAIT_SECONDS", "30"))
+QUEUE_FULL_RETRY_AFTER_SECONDS = 1
+# How often a long-poll re-reads a job queued on another worker process
+SHARED_JOB_POLL_SECONDS = 0.25
+
+# Finished results never change, so clients and proxies may keep them
+RESULT_CACHE_CONTROL = (
+    f"public, max-age={int(os.getenv('CLASSIFY_RESULT_MAX_AGE_SECONDS', '31536000'))}, immutable"
+)
+
+# Frame stream settings: frames in the smoothing window (default and maximum)
+STREAM_SMOOTHING_WINDOW = int(os.getenv("CLASSIFY_STREAM_WINDOW", "5"))
+STREAM_MAX_SMOOTHING_WINDOW = 30
+
+
+def _validate_upload(file: UploadFile) -> Tuple[bytes, ImageInfo]:
+    """
+    Validate an upload and return its content and image header information.
+
+    Raises HTTPException for validation errors.
+    """
+    # Validate image file type, then read it once while enforcing the size
+    # limits (oversized uploads are rejected without being buffered)
+    with stage_seconds.time(stage="validate"):
+        validate_file_type(file)
+        image_data = read_validated_upload(file)
+
+        # Reject non-image, truncated or mismatched content from its headers
+        # before it is sent upstream
+        image_info = validate_image_content(file, image_data)
+    payload_bytes.observe(len(image_data), stage="upload")
+    return image_data, image_info
+
+
+def _observe_parse_time(request: Request) -> None:
+    """
+    Record the time between the request arriving and the handler starting,
+    which is dominated by reading and parsing the multipart body.
+    """
+    started = getattr(request.state, "request_started", None)
+    if started is not None:
+        stage_seconds.observe(time.perf_counter() - started, stage="parse")
+
+
+async def _preprocess_and_classify(image_data: bytes, image_info: ImageInfo) -> Tuple[Dict, Dict]:
+    """
+    Preprocess and classify a validated image; returns the result and the
+    preprocessing metadata.
+    """
+    # Downscale and re-encode before sending upstream (CPU-bound, so it runs
+    # off the event loop)
+    with stage_seconds.time(stage="preprocess"):
+        prepared = await run_in_threadpool(
+            image_preprocessor.preprocess, image_data, image_info
+        )
+    payload_bytes.observe(len(prepared.data), stage="upstream")
+
+    # Classify image using classification service; when every upstream
+    # key/model is at its rate limit the request is shed with a 429
+    try:
+        result = await classification_service.classify(
+            prepared.data,
+            mime_type=prepared.mime_type,
+            upload=image_data,
+            preprocessing=prepared.metadata,
+        )
+    except QuotaExceededError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=get_error_message("UPSTREAM_QUOTA_EXCEEDED"),
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+        )
+    return result, prepared.metadata
+
+
+async def _classify_image(
+    image_data: bytes,
+    image_info: ImageInfo,
+    filename: Optional[str],
+    image_id: Optional[str] = None,
+) -> Dict:
+    """
+    Preprocess, classify and store a validated image.
+
+    An exact repeat of an earlier upload is answered from the result cache
+    before any decoding or re-encoding.
+
+    Raises HTTPException (429) when the upstream quota is exhausted and lets
+    other classification errors propagate to the caller.
+    """
+    cached = classification_service.cached_upload(image_data)
+    if cached is not None:
+        result, preprocessing = cached["result"], cached["preprocessing"]
+    else:
+        result, preprocessing = await _preprocess_and_classify(image_data, image_info)
+
+    # Persist the result (queued; written in batches off the request path)
+    image_id = image_id or uuid.uuid4().hex
+    with stage_seconds.time(stage="store"):
+        results_store.record(image_id, result, filename=filename)
+
+    return {
+        "image_id": image_id,
+        "classification": result["classification"],
+        "confidence": result["confidence"],
+        "all_classes": result["all_classes"],
+        "filename": filename,
+        "preprocessing": preprocessing,
+    }
+
+
+async def _classify_upload(file: UploadFile) -> Dict:
+    """
+    Validate a single upload and run it through the classification service.
+
+    Raises HTTPException for validation errors and lets classification
+    errors propagate to the caller.
+    """
+    image_data, image_info = _validate_upload(file)
+    return await _classify_image(image_data, image_info, file.filename)
+
+
+async def _enqueue_upload(file: UploadFile, request: Request) -> JSONResponse:
+    """
+    Validate an upload and queue it for background classification.
+    """
+    image_data, image_info = _validate_upload(file)
+    image_id = uuid.uuid4().hex
+    filename = file.filename
+
+    try:
+        job = await job_queue.submit(
+            image_id,
+            lambda: _classify_image(image_data, image_info, filename, image_id=image_id),
+        )
+    except QueueFullError:
+        raise HTTPException(
+            status_code=429,
+            detail=get_error_message("QUEUE_FULL"),
+            headers={"Retry-After": str(QUEUE_FULL_RETRY_AFTER_SECONDS)},
+        )
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            **job.to_dict(),
+            "filename": filename,
+            "status_url": request.url_for("get_classification_result", image_id=image_id).path,
+        },
+    )
+
 
 @router.post("/classify")
-async def classify_image(file: UploadFile = File(...)):
+async def classify_image(
+    request: Request,
+    file: UploadFile = File(...),
+    mode: str = Query("sync", pattern="^(sync|async)$"),
+):
     """
     Send validated image to API for classification.
     
@@ -27,95 +209,423 @@ async def classify_image(file: UploadFile = File(...)):
     - Sends image data to classification service
     - Returns classification results with confidence scores
     
+    With mode=async the image is validated and queued, and the response is
+    202 with an image_id to poll at /results/{image_id} (429 if the queue
+    is full).
+    
     Args:
         file: Uploaded image file (JPG or PNG, max 10MB)
+        mode: "sync" (default) or "async"
         
     Returns:
         JSONResponse with classification results:
+        - image_id: id for retrieving the stored result later
         - classification: predicted sign name
         - confidence: confidence score (0-1)
         - all_classes: list of all predictions with confidence scores
+        - preprocessing: original and reduced image sizes
     """
+    _observe_parse_time(request)
     try:
-        # Validate image file (type and size)
-        validate_file_type(file)
-        validate_file_size(file)
-        
-        # Ensure file pointer is at the beginning (validate_file_size resets it, but being explicit)
-        # Read image data - validation already verified the file is valid
-        # Use async read for consistency with FastAPI
-        image_data = await file.read()
-        
-        # Validate that image data is not empty (additional check after reading)
-        if not image_data or len(image_data) == 0:
-            error_msg = get_error_message("EMPTY_FILE")
-            raise HTTPException(status_code=400, detail=error_msg)
+        if mode == "async":
+            return await _enqueue_upload(file, request)
+
+        content = await _classify_upload(file)
+
+        # Return classification results
+        return JSONResponse(status_code=200, content=content)
         
-        # Classify image using classification service
-        result = classification_service.classify(
-            image_data, mime_type=file.content_type
+    except HTTPException as e:
+        # Re-raise HTTP exceptions (validation errors)
+        raise e
+    except ValueError as e:
+        # Handle classification service errors
+        error_msg = get_error_message("GENERIC_VALIDATION_ERROR")
+        raise HTTPException(status_code=400, detail=f"{error_msg}: {str(e)}")
+    except Exception as e:
+        # Handle unexpected errors
+        raise HTTPException(
+            status_code=500,
+            detail=f"Classification failed: {str(e)}"
         )
-        
-        # Return classification results
-        return JSONResponse(
-            status_code=200,
-            content={
+
+
+@router.post("/classify/batch")
+async def classify_images_batch(request: Request, files: List[UploadFile] = File(...)):
+    """
+    Classify several images in a single request.
+
+    Each file is validated with the same rules as /classify and dispatched to
+    the classification service, with at most CLASSIFY_BATCH_CONCURRENCY
+    classifications in flight at once. A failing file does not fail the batch;
+    its error is reported in place of its result.
+
+    Args:
+        files: Uploaded image files (JPG or PNG, max 10MB each)
+
+    Returns:
+        JSONResponse with a "results" list in the same order as the uploads.
+        Each entry has "index", "filename" and "status" ("ok" or "error"),
+        plus either the classification fields or "status_code" and "error".
+    """
+    _observe_parse_time(request)
+    if len(files) > BATCH_MAX_FILES:
+        error_msg = get_error_message("TOO_MANY_FILES")
+        raise HTTPException(
+            status_code=400,
+            detail=f"{error_msg} (Received: {len(files)}, maximum: {BATCH_MAX_FILES})",
+        )
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def classify_one(index: int, file: UploadFile) -> Dict:
+        entry = {"index": index, "filename": file.filename}
+        async with semaphore:
+            try:
+                content = await _classify_upload(file)
+            except HTTPException as e:
+                entry.update(status="error", status_code=e.status_code, error=e.detail)
+                return entry
+            except ValueError as e:
+                error_msg = get_error_message("GENERIC_VALIDATION_ERROR")
+                entry.update(status="error", status_code=400, error=f"{error_msg}: {str(e)}")
+                return entry
+            except Exception as e:
+                entry.update(
+                    status="error", status_code=500, error=f"Classification failed: {str(e)}"
+                )
+                return entry
+
+        entry.update(status="ok", **content)
+        return entry
+
+    results = await asyncio.gather(
+        *(classify_one(index, file) for index, file in enumerate(files))
+    )
+    succeeded = sum(1 for entry in results if entry["status"] == "ok")
+
+    return JSONResponse(
+        status_code=200,
+        content={
+            "results": results,
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+        },
+    )
+
+
+@router.post("/classify/scene")
+async def classify_scene(request: Request, file: UploadFile = File(...)):
+    """
+    Detect and classify every road sign in a street-scene image.
+
+    Candidate sign regions are found by colour segmentation and shape
+    filtering (see sign_detection), cropped, and the crops are classified
+    together as one batch. When no region is found, the whole image is
+    classified as a single sign covering the full frame. Scene results are
+    not stored in the results store.
+
+    Args:
+        file: Uploaded image file (JPG or PNG, max 10MB)
+
+    Returns:
+        JSONResponse with:
+        - filename: uploaded file name
+        - signs: list of {bbox, classification, confidence, color}, with bbox
+          as {x, y, width, height} in original image pixels (color is null
+          for the full-frame fallback)
+        - detected: number of regions found by the detector
+    """
+    _observe_parse_time(request)
+    try:
+        image_data, image_info = _validate_upload(file)
+
+        with stage_seconds.time(stage="detect"):
+            regions = await run_in_threadpool(
+                sign_detector.detect, image_data, image_info.display_size
+            )
+
+        if regions:
+            images = [(region.crop, region.mime_type) for region in regions]
+            boxes = [(region.bbox, region.color) for region in regions]
+        else:
+            with stage_seconds.time(stage="preprocess"):
+                prepared = await run_in_threadpool(
+                    image_preprocessor.preprocess, image_data, image_info
+                )
+            images = [(prepared.data, prepared.mime_type)]
+            width, height = image_info.display_size
+            full_frame = {"x": 0, "y": 0, "width": width, "height": height}
+            boxes = [(full_frame, None)]
+        payload_bytes.observe(sum(len(data) for data, _ in images), stage="upstream")
+
+        try:
+            results = await classification_service.classify_many(images)
+        except QuotaExceededError as e:
+            raise HTTPException(
+                status_code=429,
+                detail=get_error_message("UPSTREAM_QUOTA_EXCEEDED"),
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+            )
+
+        signs = [
+            {
+                "bbox": bbox,
                 "classification": result["classification"],
                 "confidence": result["confidence"],
-                "all_classes": result["all_classes"],
-                "filename": file.filename
+                "color": color,
             }
+            for (bbox, color), result in zip(boxes, results)
+        ]
+        return JSONResponse(
+            status_code=200,
+            content={"filename": file.filename, "signs": signs, "detected": len(regions)},
         )
-        
+
     except HTTPException as e:
-        # Re-raise HTTP exceptions (validation errors)
         raise e
     except ValueError as e:
-        # Handle classification service errors
         error_msg = get_error_message("GENERIC_VALIDATION_ERROR")
         raise HTTPException(status_code=400, detail=f"{error_msg}: {str(e)}")
     except Exception as e:
-        # Handle unexpected errors
         raise HTTPException(
             status_code=500,
             detail=f"Classification failed: {str(e)}"
         )
 
 
+async def _classify_frame(data: bytes, session: str) -> Dict:
+    """
+    Validate, preprocess and classify one frame of a stream. Frames are not
+    stored in the results store; a frame nearly identical to the session's
+    previous one may reuse its result.
+    """
+    with stage_seconds.time(stage="validate"):
+        image_info = validate_frame(data)
+    payload_bytes.observe(len(data), stage="upload")
+
+    with stage_seconds.time(stage="preprocess"):
+        prepared = await run_in_threadpool(image_preprocessor.preprocess, data, image_info)
+    payload_bytes.observe(len(prepared.data), stage="upstream")
+
+    return await classification_service.classify(
+        prepared.data, mime_type=prepared.mime_type, session=session
+    )
+
+
+def _describe_stream_error(exc: Exception) -> Dict:
+    """
+    Map a frame's classification error to the fields of a stream error
+    message, mirroring the status codes of the HTTP endpoints.
+    """
+    if isinstance(exc, HTTPException):
+        return {"status": exc.status_code, "detail": exc.detail}
+    if isinstance(exc, QuotaExceededError):
+        return {
+            "status": 429,
+            "detail": get_error_message("UPSTREAM_QUOTA_EXCEEDED"),
+            "retry_after": max(1, math.ceil(exc.retry_after)),
+        }
+    if isinstance(exc, ValueError):
+        error_msg = get_error_message("GENERIC_VALIDATION_ERROR")
+        return {"status": 400, "detail": f"{error_msg}: {str(exc)}"}
+    return {"status": 500, "detail": f"Classification failed: {str(exc)}"}
+
+
+@router.websocket("/stream")
+async def classify_stream(
+    websocket: WebSocket,
+    window: int = Query(STREAM_SMOOTHING_WINDOW, ge=1, le=STREAM_MAX_SMOOTHING_WINDOW),
+):
+    """
+    Classify a continuous stream of frames over a WebSocket.
+
+    Jira Ticket: RSCI-10
+
+    The client sends each frame (JPG or PNG bytes) as a binary message. One
+    frame is classified at a time; frames that arrive meanwhile replace each
+    other, so the newest frame is classified next and older ones are
+    dropped. Every classified frame is answered with a JSON message:
+    - type: "result"
+    - frame: sequence number of the frame (1-based, in order received)
+    - classification, confidence: label voted over the last ``window`` frames
+    - frames: number of frames in that vote (up to ``window``)
+    - frame_classification, frame_confidence: this frame's own result
+    - near_duplicate: true when this frame reused the result of a
+      near-identical earlier frame of the same stream
+    - latency_ms: time from receiving the frame to sending its result
+    - dropped: frames skipped so far
+
+    Frames that fail validation or classification are answered with
+    ``{"type": "error", "frame", "status", "detail"}`` (plus ``retry_after``
+    seconds for status 429) and the stream continues. Text messages are
+    answered with ``{"type": "error", "status": 400, "detail"}``, without a
+    frame number.
+    """
+    await websocket.accept()
+    session_id = uuid.uuid4().hex
+    session = FrameStreamSession(
+        classify=lambda data: _classify_frame(data, session_id),
+        send=websocket.send_json,
+        describe_error=_describe_stream_error,
+        window=window,
+    )
+
+    async def receive_frame() -> Optional[bytes]:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return None
+            if message.get("bytes") is not None:
+                return message["bytes"]
+            # Through the session, so it cannot interleave with a result
+            await session.send(
+                {
+                    "type": "error",
+                    "status": 400,
+                    "detail": get_error_message("INVALID_STREAM_MESSAGE"),
+                }
+            )
+
+    try:
+        await session.run(receive_frame)
+    finally:
+        classification_service.end_session(session_id)
+
+
+async def _shared_job_state(image_id: str, wait: float) -> Optional[JobState]:
+    """
+    State of a job queued on another worker process, re-read until it
+    finishes or ``wait`` seconds pass.
+    """
+    deadline = time.monotonic() + wait
+    while True:
+        state = await run_in_threadpool(results_store.get_job, image_id)
+        if state is None or state.status not in (Job.QUEUED, Job.RUNNING):
+            return state
+        if time.monotonic() >= deadline:
+            return state
+        await asyncio.sleep(SHARED_JOB_POLL_SECONDS)
+
+
 @router.get("/results/{image_id}")
-async def get_classification_result(image_id: str):
+async def get_classification_result(
+    request: Request,
+    image_id: str,
+    wait: float = Query(0, ge=0),
+):
     """
     Get classification results for a specific image.
     
     Jira Tickets: RSCI-12, RSCI-13
     
-    TODO: Implement result retrieval
-    - Fetch stored classification results (RSCI-12)
-    - Format results for display (RSCI-13)
+    Queued (async mode) classifications report "queued" or "running" with
+    status 202 until they finish. Pass ``wait`` (seconds) to long-poll until
+    the job finishes. Finished results are looked up in the results store,
+    as is the state of jobs queued on another server worker.
+
+    Completed results are immutable: they are served with a strong ETag
+    (304 Not Modified for a matching If-None-Match) and a long
+    Cache-Control lifetime, from a body serialised once.
+    
+    Returns:
+        JSONResponse with the job status or stored classification, or 404 if unknown
     """
-    # Placeholder implementation
-    return JSONResponse(
-        status_code=200,
-        content={
-            "image_id": image_id,
-            "classification": "Speed Limit 60",
-            "confidence": 0.95,
-            "status": "completed"
-        }
-    )
+    cached = response_cache.get(("result", image_id))
+    if cached is not None:
+        return response_cache.respond(request.headers, cached, RESULT_CACHE_CONTROL)
+
+    job = job_queue.get(image_id)
+    if job is not None and not job.finished and wait > 0:
+        job = await job_queue.wait(image_id, min(wait, RESULT_MAX_WAIT_SECONDS))
+
+    if job is not None and not job.finished:
+        return JSONResponse(
+            status_code=202, content=job.to_dict(), headers={"Cache-Control": "no-store"}
+        )
+    if job is not None and job.status == Job.FAILED:
+        return JSONResponse(
+            status_code=200, content=job.to_dict(), headers={"Cache-Control": "no-store"}
+        )
+    # Completed results are always served in the stored shape, so every
+    # worker (and every later read) sends the same body and ETag
+    entry = await run_in_threadpool(results_store.get, image_id)
+    if job is None and entry is None:
+        state = await _shared_job_state(image_id, min(wait, RESULT_MAX_WAIT_SECONDS))
+        if state is not None and state.status in (Job.QUEUED, Job.RUNNING):
+            return JSONResponse(
+                status_code=202, content=state.to_dict(), headers={"Cache-Control": "no-store"}
+            )
+        if state is not None and state.status == Job.FAILED:
+            return JSONResponse(
+                status_code=200, content=state.to_dict(), headers={"Cache-Control": "no-store"}
+            )
+        entry = await run_in_threadpool(results_store.get, image_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Classification result not found.")
+    content = {**entry, "status": Job.COMPLETED}
+
+    cached = response_cache.put(("result", image_id), content)
+    return response_cache.respond(request.headers, cached, RESULT_CACHE_CONTROL)
+
+
+@router.get("/stats")
+async def get_classification_stats():
+    """
+    Get classification service counters (e.g. result cache hits and misses).
+    """
+    stats = classification_service.get_stats()
+    stats["jobs"] = job_queue.stats()
+    stats["http_cache"] = response_cache.stats()
+    return JSONResponse(status_code=200, content=stats)
+
+
+def _history_body(
+    limit: int,
+    cursor: Optional[int],
+    label: Optional[str],
+    since: Optional[float],
+    until: Optional[float],
+) -> CachedBody:
+    """
+    Serialised history page, reused until another result is stored (the
+    newest row id is part of the cache key). Blocking; run it in a thread.
+    """
+    key = ("history", results_store.latest_id(), limit, cursor, label, since, until)
+    cached = response_cache.get(key)
+    if cached is None:
+        history, next_cursor = results_store.history(
+            limit=limit, cursor=cursor, label=label, since=since, until=until
+        )
+        cached = response_cache.put(key, {"history": history, "next_cursor": next_cursor})
+    return cached
 
 
 @router.get("/history")
-async def get_classification_history():
+async def get_classification_history(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[int] = Query(None, ge=0),
+    label: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+):
     """
-    Get classification history.
+    Get classification history, newest first.
     Jira Ticket: RSCI-14
+    
+    Args:
+        limit: Page size (1-100)
+        cursor: "next_cursor" from the previous page
+        label: Only include results with this classification
+        since: Only include results created at or after this Unix timestamp
+        until: Only include results created before this Unix timestamp
+        
+    Returns:
+        JSONResponse with "history" entries and "next_cursor" (null on the last page).
+        Pages carry an ETag and must be revalidated (304 while unchanged);
+        large pages are compressed when the client accepts gzip or brotli.
     """
-    # Placeholder implementation
-    return JSONResponse(
-        status_code=200,
-        content={
-            "history": []
-        }
-    )
-
+    cached = await run_in_threadpool(_history_body, limit, cursor, label, since, until)
+    return response_cache.respond(request.headers, cached, "no-cache")
@@ -0,0 +1,76 @@
+"""
+Debug Routes
+Related Jira Ticket: RSCI-10
+
+This module exposes the on-demand sampling profiler. The routes only exist
+for callers that send the PROFILER_TOKEN in an ``X-Profiler-Token`` header;
+without PROFILER_TOKEN they answer 404.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from services.error_messages import get_error_message
+from services.profiler import collapsed_text, profiling_service
+
+router = APIRouter()
+
+
+def _authorise(token: Optional[str]) -> None:
+    """
+    Raise 404 while profiling is disabled and 403 for a missing or wrong
+    token.
+    """
+    if not profiling_service.enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not profiling_service.authorised(token):
+        raise HTTPException(status_code=403, detail=get_error_message("PROFILER_FORBIDDEN"))
+
+
+@router.get("/profile")
+async def profile(
+    seconds: float = Query(10.0, gt=0),
+    scope: str = Query("worker", pattern="^(worker|all)$"),
+    x_profiler_token: Optional[str] = Header(None),
+):
+    """
+    Sample the server's Python stacks for ``seconds`` and return the profile
+    in collapsed-stack format (one ``frame;frame;frame count`` line per
+    stack), ready for flamegraph.pl or speedscope.
+
+    With scope=all, every worker started by the same supervisor is profiled
+    and the stacks are merged. The X-Profile-Workers header reports how many
+    workers contributed. Only one such profile runs at a time; another
+    request meanwhile gets 409.
+    """
+    _authorise(x_profiler_token)
+    seconds = min(seconds, profiling_service.max_seconds)
+
+    if scope == "all":
+        merged = await profiling_service.profile_all_workers(seconds)
+        if merged is None:
+            raise HTTPException(status_code=409, detail=get_error_message("PROFILE_IN_PROGRESS"))
+        return PlainTextResponse(
+            collapsed_text(merged["stacks"]),
+            headers={"X-Profile-Workers": str(merged["workers"])},
+        )
+
+    profiler = await profiling_service.profile_worker(seconds)
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={"X-Profile-Samples": str(profiler.samples), "X-Profile-Workers": "1"},
+    )
+
+
+@router.get("/profile/{profile_id}")
+async def request_profile(profile_id: str, x_profiler_token: Optional[str] = Header(None)):
+    """
+    Return the profile of a single request sent with ``X-Profile: 1`` (its
+    id is in that response's X-Profile-Id header), in collapsed-stack format.
+    """
+    _authorise(x_profiler_token)
+    profile_text = profiling_service.request_profile(profile_id)
+    if profile_text is None:
+        raise HTTPException(status_code=404, detail=get_error_message("PROFILE_NOT_FOUND"))
+    return PlainTextResponse(profile_text)
@@ -8,7 +8,11 @@ TODO: Implement upload functionality per Jira tickets
 
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from fastapi.responses import JSONResponse
-from services.validation_service import validate_file_type, validate_file_size
+from services.validation_service import (
+    validate_file_type,
+    read_validated_upload,
+    validate_image_content,
+)
 from services.error_messages import get_error_message
 
 router = APIRouter()
@@ -33,7 +37,8 @@ async def upload_image(file: UploadFile = File(...)):
     # RSCI-9: Provide clear error messages for invalid uploads
     try:
         validate_file_type(file)
-        validate_file_size(file)
+        content = read_validated_upload(file)
+        image_info = validate_image_content(file, content)
     except HTTPException as e:
         # Re-raise with clear error message (already formatted by validation service)
         raise HTTPException(
@@ -46,7 +51,8 @@ async def upload_image(file: UploadFile = File(...)):
             "message": "File validated successfully",
             "filename": file.filename,
             "content_type": file.content_type,
-            "validated": True
+            "validated": True,
+            "image": image_info.to_dict()
         }
     )
 
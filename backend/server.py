@@ -0,0 +1,188 @@
+"""
+Production Server
+Related Jira Ticket: RSCI-10
+
+Multi-process launcher for the API:
+
+    python server.py                     # one worker per CPU core
+    python server.py --workers 4 --port 8080
+    python server.py --manager gunicorn  # gunicorn master with uvicorn workers
+
+Configuration (command-line options override the environment):
+
+- ``HOST`` / ``PORT`` - bind address (default ``0.0.0.0:8000``)
+- ``WEB_CONCURRENCY`` - worker processes (default: CPU count; see below)
+- ``SERVER_LOOP`` - ``auto`` (uvloop when installed), ``uvloop`` or ``asyncio``
+- ``SERVER_HTTP`` - ``auto`` (httptools when installed), ``httptools`` or ``h11``
+- ``SERVER_GRACEFUL_TIMEOUT`` - seconds to drain in-flight requests on
+  shutdown or restart (default ``30``)
+- ``SERVER_KEEPALIVE_TIMEOUT`` - idle keep-alive seconds (default ``5``)
+- ``SERVER_MAX_REQUESTS`` - recycle a worker after this many requests
+  (default ``0``, never)
+- ``SERVER_MANAGER`` - ``uvicorn`` (default) or ``gunicorn``
+
+Every worker warms up ``classification_service`` (opens the upstream
+connection or loads the local model) during its lifespan startup, before it
+starts accepting connections on the shared socket. Connections that arrive
+meanwhile wait in the listen backlog or go to workers that are already up.
+
+On SIGTERM/SIGINT workers stop accepting connections, finish in-flight
+requests for up to the graceful timeout, then drain the job queue and flush
+the results store. With ``--manager gunicorn`` (requires gunicorn), SIGHUP
+replaces workers one generation at a time with the same draining, for
+restarts without dropped requests.
+
+Each worker has its own job queue, caches, circuit breaker and Gemini quota
+lanes. Workers therefore split ``GEMINI_RPM``/``GEMINI_TPM`` between them
+(the launcher exports the worker count as ``WEB_CONCURRENCY``), and queued
+job state is shared through the SQLite results store so any worker can
+answer a status poll. Caches and the breaker are not shared.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import os
+import sys
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+APP = "app:app"
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def resolve_loop(choice: str) -> str:
+    """Event loop implementation: uvloop when available for ``auto``."""
+    if choice == "auto":
+        return "uvloop" if _installed("uvloop") and sys.platform != "win32" else "asyncio"
+    return choice
+
+
+def resolve_http(choice: str) -> str:
+    """HTTP parser implementation: httptools when available for ``auto``."""
+    if choice == "auto":
+        return "httptools" if _installed("httptools") else "h11"
+    return choice
+
+
+def default_workers() -> int:
+    """Worker processes: WEB_CONCURRENCY, or one per CPU core."""
+    return int(os.environ.get("WEB_CONCURRENCY") or os.cpu_count() or 1)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the Road Sign Classification API")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--loop", default=os.environ.get("SERVER_LOOP", "auto"),
+                        choices=["auto", "uvloop", "asyncio"])
+    parser.add_argument("--http", default=os.environ.get("SERVER_HTTP", "auto"),
+                        choices=["auto", "httptools", "h11"])
+    parser.add_argument("--graceful-timeout", type=float,
+                        default=float(os.environ.get("SERVER_GRACEFUL_TIMEOUT", "30")))
+    parser.add_argument("--keepalive-timeout", type=float,
+                        default=float(os.environ.get("SERVER_KEEPALIVE_TIMEOUT", "5")))
+    parser.add_argument("--max-requests", type=int,
+                        default=int(os.environ.get("SERVER_MAX_REQUESTS", "0")))
+    parser.add_argument("--manager", default=os.environ.get("SERVER_MANAGER", "uvicorn"),
+                        choices=["uvicorn", "gunicorn"])
+    parser.add_argument("--log-level", default=os.environ.get("SERVER_LOG_LEVEL", "info"))
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="Do not warm up the classification service in each worker")
+    return parser.parse_args(argv)
+
+
+def prepare_environment(args: argparse.Namespace) -> None:
+    """
+    Set the environment inherited by worker processes (read by ``app`` when
+    each worker imports it).
+    """
+    if not args.no_warmup:
+        os.environ["WARMUP_ON_START"] = "1"
+    # Workers divide the Gemini quota between them
+    os.environ["WEB_CONCURRENCY"] = str(max(1, args.workers))
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+
+def uvicorn_config(args: argparse.Namespace) -> Dict:
+    """Keyword arguments for ``uvicorn.run``."""
+    return {
+        "app": APP,
+        "app_dir": BACKEND_DIR,
+        "host": args.host,
+        "port": args.port,
+        "workers": max(1, args.workers),
+        "loop": resolve_loop(args.loop),
+        "http": resolve_http(args.http),
+        "lifespan": "on",
+        "timeout_keep_alive": args.keepalive_timeout,
+        "timeout_graceful_shutdown": args.graceful_timeout,
+        "limit_max_requests": args.max_requests or None,
+        "log_level": args.log_level,
+        "proxy_headers": True,
+    }
+
+
+def gunicorn_options(args: argparse.Namespace) -> Dict:
+    """Settings for a gunicorn master running uvicorn workers."""
+    return {
+        "bind": f"{args.host}:{args.port}",
+        "workers": max(1, args.workers),
+        # UvicornWorker picks uvloop/httptools itself when they are installed
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "graceful_timeout": args.graceful_timeout,
+        "keepalive": args.keepalive_timeout,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests // 10,
+        "chdir": BACKEND_DIR,
+        "loglevel": args.log_level,
+    }
+
+
+def run_gunicorn(args: argparse.Namespace) -> None:
+    from gunicorn.app.base import BaseApplication  # pylint: disable=C0415
+
+    options = gunicorn_options(args)
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app import app  # pylint: disable=C0415
+
+            return app
+
+    Application().run()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    prepare_environment(args)
+
+    if args.manager == "gunicorn":
+        if not _installed("gunicorn"):
+            sys.exit("--manager gunicorn requires gunicorn (pip install gunicorn)")
+        run_gunicorn(args)
+        return
+
+    import uvicorn
+
+    config = uvicorn_config(args)
+    print(
+        f"Starting {config['workers']} worker(s) on {args.host}:{args.port} "
+        f"(loop={config['loop']}, http={config['http']})",
+        file=sys.stderr,
+    )
+    uvicorn.run(**config)
+
+
+if __name__ == "__main__":
+    main()
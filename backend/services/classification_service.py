@@ -3,21 +3,58 @@ Classification Service
 Related Jira Ticket: RSCI-10
 
 This module handles classification logic. It supports a Gemini integration
-when the GEMINI_API environment variable is set, and falls back to the
-stubbed logic otherwise.
+when the GEMINI_API environment variable is set, a local CPU model when
+LOCAL_MODEL_PATH is set (see local_inference_service), and falls back to the
+stubbed logic otherwise. CLASSIFICATION_BACKEND ("auto", "gemini", "local"
+or "stub") selects the engine explicitly.
+
+Gemini calls are made with a shared, pooled ``httpx.AsyncClient`` so that
+concurrent requests overlap their upstream waits and reuse keep-alive
+connections. The client is opened at application startup and closed at
+shutdown (see ``UnifiedClassificationService.startup``/``shutdown``).
+With GEMINI_PACK_SIZE > 1, concurrent classifications are packed into
+multi-image generateContent requests (see ``GeminiClassificationService.classify_many``).
+GEMINI_STRUCTURED_OUTPUT requests schema-constrained JSON, and with
+GEMINI_CANONICAL_LABELS Gemini labels are mapped onto the canonical
+vocabulary by a LabelIndex.
+httpx itself is imported on first use, so importing this module stays cheap
+on serverless cold starts. With WARMUP_ON_START set, ``warm_up`` opens the
+upstream connection (DNS, TCP and TLS) before the first classification.
 """
 
 from __future__ import annotations
 
-import base64
+import asyncio
 import json
 import logging
 import os
 import random
 import re
-from typing import Dict, List, Optional
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from services.hedging import HedgePolicy
+from services.label_index import LabelIndex
+from services.local_inference_service import LocalClassificationService
+from services.metrics import backend_errors, backend_in_flight, backend_requests, stage_seconds
+from services.micro_batcher import MicroBatcher
+from services.perceptual_hash import Fingerprint, NearDuplicateIndex, fingerprint
+from services.quota_scheduler import QuotaExceededError, QuotaScheduler
+from services.request_body import InlineData, JsonStreamBody
+from services.resilience import (
+    AdaptiveTimeout,
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    RetryBudget,
+    backoff_delay,
+)
+from services.result_cache import ResultCache
+from services.results_store import results_store
+from services.single_flight import SingleFlight
 
-import requests
+if TYPE_CHECKING:
+    import httpx
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -113,60 +150,319 @@ class GeminiClassificationService:
     Classification service that leverages Google Gemini API.
     """
 
+    name = "gemini"
     DEFAULT_MODEL = "models/gemini-2.0-flash"
+    DEFAULT_API_BASE = "https://generativelanguage.googleapis.com"
+    REQUEST_TIMEOUT_SECONDS = 45.0
+    CONNECT_TIMEOUT_SECONDS = 10.0
+    # Upstream statuses worth retrying (rate limiting and server errors)
+    RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+    MAX_RETRY_AFTER_SECONDS = 5.0
+
+    PROMPT = (
+        "You are an expert road-sign classification system. "
+        "Return a JSON object exactly in the following format:\n"
+        '{"predictions": [{"label": "Speed Limit 60", "confidence": 0.95}, '
+        '{"label": "Speed Limit 50", "confidence": 0.03}, {"label": "Yield", "confidence": 0.02}]}\n'
+        "Rules:\n"
+        "- Provide between 3 and 5 predictions ordered from highest to lowest confidence.\n"
+        "- Confidence values must be decimals between 0 and 1.\n"
+        "- Labels must be concise road-sign names.\n"
+        "- Return JSON only, do not include code fences or additional commentary."
+    )
+    # Used when several images are packed into one request (the instructions
+    # are sent once, so per-image prompt tokens shrink with the pack size)
+    PACKED_PROMPT = (
+        "You are an expert road-sign classification system. "
+        "You will receive {count} images, each preceded by its index (\"Image 0:\", "
+        "\"Image 1:\", ...). Classify every image independently and return a JSON array "
+        "with one entry per image, exactly in the following format:\n"
+        '[{{"index": 0, "predictions": [{{"label": "Speed Limit 60", "confidence": 0.95}}, '
+        '{{"label": "Speed Limit 50", "confidence": 0.03}}]}}, '
+        '{{"index": 1, "predictions": [{{"label": "Stop", "confidence": 0.9}}, '
+        '{{"label": "Yield", "confidence": 0.1}}]}}]\n'
+        "Rules:\n"
+        "- Include exactly one entry per image index, in order.\n"
+        "- Provide between 3 and 5 predictions per image ordered from highest to lowest confidence.\n"
+        "- Confidence values must be decimals between 0 and 1.\n"
+        "- Labels must be concise road-sign names.\n"
+        "- Return JSON only, do not include code fences or additional commentary."
+    )
+    # With GEMINI_STRUCTURED_OUTPUT the response format is enforced by a
+    # response schema, so the prompts only describe the task
+    STRUCTURED_PROMPT = (
+        "You are an expert road-sign classification system. Give between 3 and 5 "
+        "predictions for the sign in the image, ordered from highest to lowest "
+        "confidence (0 to 1), using concise road-sign names such as \"Speed Limit 60\"."
+    )
+    STRUCTURED_PACKED_PROMPT = (
+        "You are an expert road-sign classification system. You will receive {count} "
+        "images, each preceded by its index (\"Image 0:\", \"Image 1:\", ...). For every "
+        "image give between 3 and 5 predictions ordered from highest to lowest confidence "
+        "(0 to 1), using concise road-sign names such as \"Speed Limit 60\"."
+    )
+    PREDICTIONS_SCHEMA = {
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": {"label": {"type": "STRING"}, "confidence": {"type": "NUMBER"}},
+            "required": ["label", "confidence"],
+            "propertyOrdering": ["label", "confidence"],
+        },
+    }
+    RESPONSE_SCHEMA = {
+        "type": "OBJECT",
+        "properties": {"predictions": PREDICTIONS_SCHEMA},
+        "required": ["predictions"],
+    }
+    PACKED_RESPONSE_SCHEMA = {
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": {"index": {"type": "INTEGER"}, "predictions": PREDICTIONS_SCHEMA},
+            "required": ["index", "predictions"],
+            "propertyOrdering": ["index", "predictions"],
+        },
+    }
 
-    def __init__(self, api_key: str, model: str = DEFAULT_MODEL):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = DEFAULT_MODEL,
+        client: Optional[httpx.AsyncClient] = None,
+        scheduler: Optional[QuotaScheduler] = None,
+        labels: Optional[LabelIndex] = None,
+    ):
         self.api_key = api_key
         self.model = model
-        self.endpoint = f"https://generativelanguage.googleapis.com/v1beta/{model}:generateContent"
+        # GEMINI_API_BASE points the client at another host (e.g. the
+        # benchmark suite's fake Gemini server)
+        self.api_base = os.environ.get("GEMINI_API_BASE", self.DEFAULT_API_BASE).rstrip("/")
+        self.endpoint = self._endpoint(model)
+        # Spreads requests over GEMINI_API_KEYS x GEMINI_MODELS within their
+        # RPM/TPM limits, and sheds load when all of them are exhausted
+        self.scheduler = scheduler or QuotaScheduler.from_env(api_key, model)
+        self._client = client
+        self.max_retries = int(os.environ.get("GEMINI_MAX_RETRIES", "2"))
+        self.retry_budget = RetryBudget(
+            ratio=float(os.environ.get("GEMINI_RETRY_BUDGET_RATIO", "0.2"))
+        )
+        # Per-attempt latency drives the adaptive request timeout
+        self.latency = LatencyTracker()
+        self.timeout = AdaptiveTimeout(
+            self.latency,
+            min_seconds=float(os.environ.get("GEMINI_MIN_TIMEOUT_SECONDS", "5")),
+            max_seconds=self.REQUEST_TIMEOUT_SECONDS,
+        )
+        # Concurrent requests are packed into multi-image calls when
+        # GEMINI_PACK_SIZE > 1, collected for up to GEMINI_PACK_WINDOW_MS
+        self.pack_size = int(os.environ.get("GEMINI_PACK_SIZE", "1"))
+        self.packer: Optional[MicroBatcher] = None
+        if self.pack_size > 1:
+            self.packer = MicroBatcher(
+                self.classify_many,
+                max_batch_size=self.pack_size,
+                max_wait_seconds=float(os.environ.get("GEMINI_PACK_WINDOW_MS", "10")) / 1000,
+            )
+        self.pack_fallbacks = 0
+        # Hedged requests (see UnifiedClassificationService) go to this
+        # model's lanes when set, e.g. a faster model from GEMINI_MODELS
+        self.hedge_model = os.environ.get("GEMINI_HEDGE_MODEL") or None
+        # GEMINI_STRUCTURED_OUTPUT asks for schema-constrained JSON
+        # (responseSchema) instead of describing the format in the prompt
+        self.structured_output = os.environ.get("GEMINI_STRUCTURED_OUTPUT", "").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+        # GEMINI_CANONICAL_LABELS maps free-form labels onto the canonical
+        # vocabulary (opt-in: it merges labels and their confidences)
+        self.labels = labels
+        if labels is None and os.environ.get("GEMINI_CANONICAL_LABELS", "").lower() in (
+            "1",
+            "true",
+            "yes",
+        ):
+            self.labels = LabelIndex.from_env(StubbedClassificationService.TRAFFIC_SIGNS)
+
+    @staticmethod
+    def create_client() -> httpx.AsyncClient:
+        """
+        Build the pooled HTTP client used for Gemini requests.
+
+        Pool sizes can be tuned with GEMINI_MAX_CONNECTIONS and
+        GEMINI_MAX_KEEPALIVE_CONNECTIONS.
+        """
+        # Imported on first use to keep it off the cold-start import path
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=int(os.environ.get("GEMINI_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(
+                os.environ.get("GEMINI_MAX_KEEPALIVE_CONNECTIONS", "10")
+            ),
+            keepalive_expiry=60.0,
+        )
+        timeout = httpx.Timeout(
+            GeminiClassificationService.REQUEST_TIMEOUT_SECONDS,
+            connect=GeminiClassificationService.CONNECT_TIMEOUT_SECONDS,
+        )
+        return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client, created on first use if startup was skipped."""
+        if self._client is None or self._client.is_closed:
+            self._client = self.create_client()
+        return self._client
+
+    async def startup(self) -> None:
+        """Open the pooled HTTP client."""
+        _ = self.client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client and its keep-alive connections."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def warm_up(self) -> bool:
+        """
+        Open a pooled connection to the Gemini API ahead of the first request.
+
+        Fetches the model's metadata (a cheap call that uses no generation
+        quota), so DNS resolution and the TLS handshake are already done and
+        the keep-alive connection is reused by the first classification.
+        Failures are logged and otherwise ignored.
+        """
+        started = time.perf_counter()
+        try:
+            await self.client.get(
+                f"{self.api_base}/v1beta/{self.model}",
+                params={"key": self.api_key},
+                timeout=self.CONNECT_TIMEOUT_SECONDS,
+            )
+        except Exception as exc:  # warm-up is best effort
+            logger.warning("Gemini warm-up failed: %s", exc)
+            return False
+        logger.info("Gemini connection warmed up in %.0f ms", (time.perf_counter() - started) * 1000)
+        return True
 
-    def classify(self, image_data: bytes, mime_type: Optional[str]) -> Dict:
+    async def classify(self, image_data: bytes, mime_type: Optional[str]) -> Dict:
+        """
+        Classify one image. When packing is enabled (GEMINI_PACK_SIZE > 1),
+        concurrent calls are collected into multi-image requests.
+        """
         if not image_data:
             raise ValueError("Image data is empty")
+        if self.packer is not None:
+            return await self.packer.submit((image_data, mime_type))
+        return await self._classify_single(image_data, mime_type)
 
-        if not mime_type:
-            mime_type = "image/jpeg"
-
-        image_base64 = base64.b64encode(image_data).decode("utf-8")
-
-        prompt = (
-            "You are an expert road-sign classification system. "
-            "Return a JSON object exactly in the following format:\n"
-            '{"predictions": [{"label": "Speed Limit 60", "confidence": 0.95}, '
-            '{"label": "Speed Limit 50", "confidence": 0.03}, {"label": "Yield", "confidence": 0.02}]}\n'
-            "Rules:\n"
-            "- Provide between 3 and 5 predictions ordered from highest to lowest confidence.\n"
-            "- Confidence values must be decimals between 0 and 1.\n"
-            "- Labels must be concise road-sign names.\n"
-            "- Return JSON only, do not include code fences or additional commentary."
-        )
+    async def classify_many(self, images: List[Tuple[bytes, Optional[str]]]) -> List:
+        """
+        Classify several images with one generateContent request.
 
-        payload = {
-            "contents": [
-                {
-                    "role": "user",
-                    "parts": [
-                        {"text": prompt},
-                        {
-                            "inlineData": {
-                                "mimeType": mime_type,
-                                "data": image_base64,
-                            }
-                        },
-                    ],
-                }
-            ],
-        }
+        Each image is sent as its own part, preceded by its index, and the
+        model is asked for a JSON array with one prediction list per index.
+        Images whose predictions cannot be read from the packed response are
+        classified with individual requests. Returns one result per image, or
+        an exception instance in the slot of an image that failed.
+        """
+        if len(images) == 1:
+            image_data, mime_type = images[0]
+            try:
+                return [await self._classify_single(image_data, mime_type)]
+            except Exception as exc:  # report in the image's slot
+                return [exc]
 
-        response = requests.post(
-            self.endpoint,
-            params={"key": self.api_key},
-            json=payload,
-            timeout=45,
+        prompt = self.STRUCTURED_PACKED_PROMPT if self.structured_output else self.PACKED_PROMPT
+        parts: List[Dict] = [{"text": prompt.format(count=len(images))}]
+        for index, (image_data, mime_type) in enumerate(images):
+            parts.append({"text": f"Image {index}:"})
+            parts.append(self._image_part(image_data, mime_type))
+
+        data = await self._generate(
+            self._build_payload(parts, self.PACKED_RESPONSE_SCHEMA), images=len(images)
         )
-        response.raise_for_status()
-        data = response.json()
+        text = self._response_text(data)
+
+        with stage_seconds.time(stage="parse_predictions"):
+            packed = {
+                index: self._canonicalise(predictions)
+                for index, predictions in self._parse_packed_predictions(text, len(images)).items()
+            }
+
+        results: List = [None] * len(images)
+        missing = []
+        for index in range(len(images)):
+            predictions = packed.get(index)
+            if predictions:
+                results[index] = self._to_result(predictions)
+            else:
+                missing.append(index)
+
+        if missing:
+            logger.warning(
+                "Packed Gemini response had no predictions for %d of %d images; "
+                "classifying them individually",
+                len(missing),
+                len(images),
+            )
+            self.pack_fallbacks += len(missing)
+            retried = await asyncio.gather(
+                *(self._classify_single(*images[index]) for index in missing),
+                return_exceptions=True,
+            )
+            for index, result in zip(missing, retried):
+                results[index] = result
+
+        return results
+
+    async def classify_hedge(self, image_data: bytes, mime_type: Optional[str]) -> Dict:
+        """
+        Classify one image as a hedge for a slow request: sent on its own
+        (never packed) to GEMINI_HEDGE_MODEL's lanes when it is set.
+        """
+        return await self._classify_single(image_data, mime_type, model=self.hedge_model)
 
+    async def _classify_single(
+        self, image_data: bytes, mime_type: Optional[str], model: Optional[str] = None
+    ) -> Dict:
+        prompt = self.STRUCTURED_PROMPT if self.structured_output else self.PROMPT
+        parts = [{"text": prompt}, self._image_part(image_data, mime_type)]
+
+        data = await self._generate(self._build_payload(parts, self.RESPONSE_SCHEMA), model=model)
+        text = self._response_text(data)
+
+        with stage_seconds.time(stage="parse_predictions"):
+            predictions = self._canonicalise(self._parse_predictions(text))
+        if not predictions:
+            raise ValueError("Gemini did not return any predictions.")
+
+        return self._to_result(predictions)
+
+    @staticmethod
+    def _image_part(image_data: bytes, mime_type: Optional[str]) -> Dict:
+        # Base64-encoded while the request body is streamed (see request_body)
+        return {"inlineData": InlineData(image_data, mime_type or "image/jpeg")}
+
+    def _build_payload(self, parts: List[Dict], schema: Dict) -> Dict:
+        payload: Dict = {"contents": [{"role": "user", "parts": parts}]}
+        if self.structured_output:
+            payload["generationConfig"] = {
+                "responseMimeType": "application/json",
+                "responseSchema": schema,
+            }
+        return payload
+
+    def _canonicalise(self, predictions: List[Dict]) -> List[Dict]:
+        if self.labels is None or not predictions:
+            return predictions
+        return self.labels.canonicalise(predictions)
+
+    @staticmethod
+    def _response_text(data: Dict) -> str:
         try:
             text = (
                 data["candidates"][0]["content"]["parts"][0].get("text", "")
@@ -180,11 +476,10 @@ class GeminiClassificationService:
             "Gemini classification request successful (response tokens: %s)",
             data.get("usageMetadata", {}).get("candidatesTokenCount", "n/a"),
         )
+        return text
 
-        predictions = self._parse_predictions(text)
-        if not predictions:
-            raise ValueError("Gemini did not return any predictions.")
-
+    @staticmethod
+    def _to_result(predictions: List[Dict]) -> Dict:
         # Sort predictions by confidence (descending)
         predictions.sort(key=lambda item: item.get("confidence", 0.0), reverse=True)
         top_prediction = predictions[0]
@@ -195,31 +490,206 @@ class GeminiClassificationService:
             "all_classes": predictions,
         }
 
+    def _endpoint(self, model: str) -> str:
+        return f"{self.api_base}/v1beta/{model}:generateContent"
+
+    async def _generate(self, payload: Dict, images: int = 1, model: Optional[str] = None) -> Dict:
+        """
+        POST a generateContent request and return the decoded response.
+
+        The payload is sent as a streamed JsonStreamBody with an exact
+        Content-Length; image parts are base64-encoded chunk by chunk.
+
+        Every attempt is admitted by the quota scheduler, which picks the
+        key/model lane and may raise QuotaExceededError. Rate-limited (429),
+        server-error (5xx), connection failures and timeouts are retried with
+        jittered backoff while the retry budget allows; a 429 also takes its
+        lane out of rotation, so the retry goes to another key or model.
+        ``model`` restricts the request to that model's lanes.
+
+        Base64 encoding happens while the body is sent; it is reported as
+        the "encode" stage and left out of the "upstream" stage.
+        """
+        body = JsonStreamBody(payload)
+        started = time.perf_counter()
+        try:
+            return await self._send(body, images, model)
+        finally:
+            stage_seconds.observe(body.encode_seconds, stage="encode")
+            stage_seconds.observe(
+                max(0.0, time.perf_counter() - started - body.encode_seconds), stage="upstream"
+            )
+
+    async def _send(self, body: JsonStreamBody, images: int, model: Optional[str]) -> Dict:
+        import httpx
+
+        self.retry_budget.record_request()
+        attempt = 0
+        while True:
+            lease = await self.scheduler.acquire(images, model=model)
+            try:
+                timeout_seconds = self.timeout.seconds
+                timeout = httpx.Timeout(timeout_seconds, connect=self.CONNECT_TIMEOUT_SECONDS)
+                started = time.perf_counter()
+                try:
+                    response = await self.client.post(
+                        self._endpoint(lease.model),
+                        params={"key": lease.api_key},
+                        content=body,
+                        headers=body.headers,
+                        timeout=timeout,
+                    )
+                except (
+                    httpx.ConnectError,
+                    httpx.RemoteProtocolError,
+                    httpx.TimeoutException,
+                ) as exc:
+                    if isinstance(exc, (httpx.ReadTimeout, httpx.WriteTimeout)):
+                        # The upstream took at least the whole timeout; leaving
+                        # it out would bias the percentile low and keep
+                        # shrinking the timeout under load
+                        self.latency.record(timeout_seconds)
+                    if not self._may_retry(attempt):
+                        raise
+                    delay = backoff_delay(attempt)
+                    logger.info("Gemini connection failed (%s); retrying in %.2fs", exc, delay)
+                else:
+                    if response.status_code == 429:
+                        lease.rate_limited(self._retry_after_header(response))
+                    if response.status_code not in self.RETRYABLE_STATUS_CODES:
+                        self.latency.record(time.perf_counter() - started)
+                        response.raise_for_status()
+                        data = response.json()
+                        lease.complete(data.get("usageMetadata"))
+                        return data
+                    if not self._may_retry(attempt):
+                        response.raise_for_status()
+                    delay = self._retry_after(response) or backoff_delay(attempt)
+                    logger.info(
+                        "Gemini returned %d; retrying in %.2fs", response.status_code, delay
+                    )
+            finally:
+                # Refunds the token reservation unless the response reported
+                # usage (failed, timed-out or cancelled attempts, such as a
+                # hedge that lost the race)
+                lease.release()
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _may_retry(self, attempt: int) -> bool:
+        return attempt < self.max_retries and self.retry_budget.try_acquire()
+
+    def _retry_after(self, response: httpx.Response) -> Optional[float]:
+        """Honour a short numeric Retry-After header on 429/503 responses."""
+        seconds = self._retry_after_header(response)
+        if seconds is None or seconds > self.MAX_RETRY_AFTER_SECONDS:
+            return None
+        return seconds
+
+    @staticmethod
+    def _retry_after_header(response: httpx.Response) -> Optional[float]:
+        try:
+            seconds = float(response.headers.get("retry-after", ""))
+        except ValueError:
+            return None
+        return seconds if seconds >= 0 else None
+
+    def stats(self) -> Dict:
+        """Retry budget, latency, quota and packing figures."""
+        p99 = self.latency.percentile(99)
+        stats = {
+            "retry_budget": self.retry_budget.stats(),
+            "latency_p99_seconds": round(p99, 3) if p99 is not None else None,
+            "timeout_seconds": round(self.timeout.seconds, 2),
+        }
+        stats["quota"] = self.scheduler.stats()
+        stats["structured_output"] = self.structured_output
+        if self.labels is not None:
+            stats["labels"] = self.labels.stats()
+        if self.packer is not None:
+            stats["packing"] = {**self.packer.stats(), "fallbacks": self.pack_fallbacks}
+        return stats
+
     @staticmethod
     def _parse_predictions(text: str) -> List[Dict]:
         """
         Attempt to parse predictions from Gemini response text.
         """
-        if not text:
+        payload = GeminiClassificationService._load_json(text, r"\{.*\}")
+        if not isinstance(payload, dict):
             return []
+        return GeminiClassificationService._normalise_predictions(payload.get("predictions", []))
+
+    @staticmethod
+    def _parse_packed_predictions(text: str, count: int) -> Dict[int, List[Dict]]:
+        """
+        Parse a packed (multi-image) response into predictions per image index.
+        Indexes that are missing or malformed are left out.
+        """
+        payload = GeminiClassificationService._load_json(text, r"\[.*\]")
+        if isinstance(payload, dict):
+            payload = payload.get("results", [])
+        if not isinstance(payload, list):
+            return {}
+
+        packed: Dict[int, List[Dict]] = {}
+        for position, entry in enumerate(payload):
+            if not isinstance(entry, dict):
+                continue
+            try:
+                index = int(entry.get("index", position))
+            except (TypeError, ValueError):
+                continue
+            if 0 <= index < count and index not in packed:
+                predictions = GeminiClassificationService._normalise_predictions(
+                    entry.get("predictions", [])
+                )
+                if predictions:
+                    packed[index] = predictions
+        return packed
+
+    @staticmethod
+    def _load_json(text: str, fallback_pattern: str):
+        """
+        Decode JSON from response text, tolerating code fences and commentary
+        around it. Returns None when nothing can be decoded.
+        """
+        if not text:
+            return None
+
+        # Fast path: the text is plain JSON (always the case with structured output)
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
 
         cleaned = text.strip()
         # Remove code fences if present
         cleaned = re.sub(r"```(?:json)?", "", cleaned).strip()
 
         try:
-            payload = json.loads(cleaned)
+            return json.loads(cleaned)
         except json.JSONDecodeError:
             # Attempt to extract JSON substring
-            match = re.search(r"\{.*\}", cleaned, re.DOTALL)
+            match = re.search(fallback_pattern, cleaned, re.DOTALL)
             if not match:
                 logger.debug("Failed to parse Gemini response: %s", cleaned)
-                return []
-            payload = json.loads(match.group(0))
+                return None
+            try:
+                return json.loads(match.group(0))
+            except json.JSONDecodeError:
+                logger.debug("Failed to parse Gemini response: %s", cleaned)
+                return None
 
-        predictions = payload.get("predictions", [])
+    @staticmethod
+    def _normalise_predictions(predictions) -> List[Dict]:
         normalised: List[Dict] = []
+        if not isinstance(predictions, list):
+            return normalised
         for item in predictions:
+            if not isinstance(item, dict):
+                continue
             label = item.get("label") or item.get("sign") or item.get("name")
             confidence = item.get("confidence")
             if label is None or confidence is None:
@@ -238,39 +708,408 @@ class GeminiClassificationService:
 
 class UnifiedClassificationService:
     """
-    Unified service that prefers Gemini integration when available.
+    Unified service that routes requests to the configured engine (Gemini or
+    a local CPU model) and falls back to stubbed results if it fails.
+
+    Engine results are cached by image content (see ResultCache); stubbed
+    fallback results are never cached.
     """
 
+    BACKENDS = ("auto", "gemini", "local", "stub")
+
     def __init__(self):
         self.stub = StubbedClassificationService()
+        self.cache = ResultCache(
+            max_entries=int(os.environ.get("CLASSIFICATION_CACHE_MAX_ENTRIES", "1024")),
+            max_bytes=int(os.environ.get("CLASSIFICATION_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+            ttl_seconds=float(os.environ.get("CLASSIFICATION_CACHE_TTL_SECONDS", "3600")),
+        )
+        # Skips the engine (straight to fallback) while it is failing or slow
+        self.breaker = CircuitBreaker.from_env()
+        # Identical images classified concurrently share one engine call
+        self.inflight = SingleFlight()
+        # Near-identical frames of one stream session reuse the previous
+        # frame's result (opt-in with NEAR_DUPLICATE_MAX_ENTRIES)
+        self.near_duplicates = NearDuplicateIndex.from_env()
+        # With CLASSIFICATION_HEDGING, Gemini calls slower than the recent
+        # latency percentile are raced against a second request
+        self.hedging: Optional[HedgePolicy] = None
+        if os.environ.get("CLASSIFICATION_HEDGING", "").lower() in ("1", "true", "yes"):
+            self.hedging = HedgePolicy.from_env()
         api_key = os.environ.get("GEMINI_API")
+        model_path = os.environ.get("LOCAL_MODEL_PATH")
         self.gemini: Optional[GeminiClassificationService] = None
+        self.local: Optional[LocalClassificationService] = None
+
+        backend = os.environ.get("CLASSIFICATION_BACKEND", "auto").lower()
+        if backend not in self.BACKENDS:
+            logger.warning("Unknown CLASSIFICATION_BACKEND '%s'; using 'auto'.", backend)
+            backend = "auto"
+        if backend == "auto":
+            backend = "gemini" if api_key else "local" if model_path else "stub"
 
-        if api_key:
+        if backend == "gemini" and api_key:
             self.gemini = GeminiClassificationService(api_key=api_key)
             logger.info("Gemini classification enabled.")
-        else:
+        elif backend == "local" and model_path:
+            self.local = LocalClassificationService.from_env(
+                default_labels=StubbedClassificationService.TRAFFIC_SIGNS
+            )
+            logger.info("Local classification enabled (model: %s).", model_path)
+        elif backend == "gemini":
             logger.info("GEMINI_API not set. Using stubbed classification service.")
+        elif backend == "local":
+            logger.info("LOCAL_MODEL_PATH not set. Using stubbed classification service.")
+        else:
+            logger.info("Using stubbed classification service.")
+
+    @property
+    def backend(self):
+        """The active classification engine, or None when only the stub is used."""
+        return self.gemini if self.gemini is not None else self.local
+
+    async def startup(self) -> None:
+        """Open upstream connection pools and load local models (application startup)."""
+        if self.backend is not None:
+            await self.backend.startup()
+
+    async def shutdown(self) -> None:
+        """Release upstream connection pools (called on application shutdown)."""
+        if self.backend is not None:
+            await self.backend.aclose()
+
+    async def warm_up(self) -> None:
+        """
+        Prepare the engine for the first request: open the Gemini connection
+        or load the local model (enabled with WARMUP_ON_START).
+        """
+        if self.gemini is not None:
+            await self.gemini.warm_up()
+        elif self.local is not None:
+            await self.local.startup()
+
+    def cached_upload(self, upload: bytes) -> Optional[Dict]:
+        """
+        Engine result and preprocessing metadata cached for the raw bytes of
+        an upload (``{"result": ..., "preprocessing": ...}``), so an exact
+        repeat skips decoding and re-encoding. None on a miss.
+        """
+        backend = self.backend
+        if backend is None or not upload:
+            return None
+        # A miss here is followed by the content lookup in classify, which counts it
+        cached = self.cache.get(self._upload_key(backend, upload), count_miss=False)
+        if cached is not None:
+            backend_requests.inc(backend="cache")
+        return cached
+
+    async def classify(
+        self,
+        image_data: bytes,
+        mime_type: Optional[str] = None,
+        upload: Optional[bytes] = None,
+        preprocessing: Optional[Dict] = None,
+        session: Optional[str] = None,
+    ) -> Dict:
+        """
+        Classify ``image_data`` with the active engine, falling back to
+        stubbed results. When the image was preprocessed from ``upload``,
+        engine results are also cached under the raw upload bytes together
+        with ``preprocessing`` (see ``cached_upload``).
+
+        Frames of a stream pass their ``session``; only they may reuse the
+        result of a near-identical earlier frame of the same session.
+        Unrelated uploads never share results by similarity.
+        """
+        backend = self.backend
+        if backend is not None and image_data:
+            cache_key = ResultCache.make_key(image_data, backend.name, backend.model)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                backend_requests.inc(backend="cache")
+                self._remember_upload(backend, upload, preprocessing, cached)
+                return cached
+
+            namespace = self._session_namespace(backend, session)
+            image_fingerprint = await self._fingerprint(image_data, session)
+            if image_fingerprint is not None:
+                near = self.near_duplicates.get(namespace, image_fingerprint)
+                if near is not None:
+                    result, distance = near
+                    backend_requests.inc(backend="near_duplicate")
+                    return {**result, "near_duplicate": True, "hash_distance": distance}
 
-    def classify(self, image_data: bytes, mime_type: Optional[str] = None) -> Dict:
-        if self.gemini:
             try:
+                result = await self.inflight.do(
+                    cache_key,
+                    lambda: self._classify_with_backend(
+                        backend, cache_key, image_data, mime_type, namespace, image_fingerprint
+                    ),
+                )
+                self._remember_upload(backend, upload, preprocessing, result)
+                return result
+            except QuotaExceededError:
+                # Shed with a 429 rather than answering with stubbed results
+                raise
+            except CircuitOpenError:
                 logger.info(
-                    "Sending image to Gemini model '%s' (size=%d bytes)",
-                    self.gemini.model,
-                    len(image_data) if image_data else 0,
+                    "%s circuit breaker is open. Using stubbed results.",
+                    backend.name.capitalize(),
                 )
-                return self.gemini.classify(image_data, mime_type)
             except Exception as exc:  # broad catch to avoid breaking API
                 logger.warning(
-                    "Gemini classification failed (%s). Falling back to stubbed results.",
+                    "%s classification failed (%s). Falling back to stubbed results.",
+                    backend.name.capitalize(),
                     exc,
                 )
+            fallback = "fallback"
+        else:
+            fallback = "stub"
 
-        return self.stub.classify(image_data, mime_type=mime_type)
+        backend_requests.inc(backend=fallback)
+        with stage_seconds.time(stage="stub"):
+            return self.stub.classify(image_data, mime_type=mime_type)
 
-    def get_classification_history(self) -> List[Dict]:
-        return self.stub.get_classification_history()
+    def end_session(self, session: str) -> None:
+        """Forget a finished stream session's frames."""
+        backend = self.backend
+        if backend is not None:
+            self.near_duplicates.discard_namespace(self._session_namespace(backend, session))
+
+    @staticmethod
+    def _session_namespace(backend, session: Optional[str]) -> str:
+        return f"{backend.name}:{backend.model}:{session}"
+
+    @staticmethod
+    def _upload_key(backend, upload: bytes) -> str:
+        return ResultCache.make_key(upload, f"{backend.name}-upload", backend.model)
+
+    def _remember_upload(
+        self, backend, upload: Optional[bytes], preprocessing: Optional[Dict], result: Dict
+    ) -> None:
+        """Alias an engine result under the raw upload bytes it came from."""
+        if upload is None:
+            return
+        self.cache.put(
+            self._upload_key(backend, upload),
+            {"result": result, "preprocessing": preprocessing or {}},
+        )
+
+    async def classify_many(self, images: List[Tuple[bytes, Optional[str]]]) -> List[Dict]:
+        """
+        Classify several images (e.g. the sign crops of one scene) as a batch.
+
+        Without Gemini, each image goes through ``classify``; the local
+        model's micro-batcher then packs the concurrent calls into one
+        forward pass. With Gemini, images are looked up in the result cache
+        first. Images already in flight (the same crop in another request)
+        are joined, and the remaining distinct images are sent as one packed
+        request through the circuit breaker. Packed images are not hedged.
+        Images the engine fails on get stubbed results, as in ``classify``.
+        """
+        if self.gemini is None or len(images) < 2:
+            return list(await asyncio.gather(*(self.classify(*image) for image in images)))
+
+        backend = self.gemini
+        results: List[Optional[Dict]] = [None] * len(images)
+        misses: Dict[str, List[int]] = {}
+        for index, (image_data, _) in enumerate(images):
+            cache_key = ResultCache.make_key(image_data, backend.name, backend.model)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                backend_requests.inc(backend="cache")
+                results[index] = cached
+            else:
+                misses.setdefault(cache_key, []).append(index)
+        if not misses:
+            return results
+
+        # Registered with single-flight before any of them runs
+        packed = [cache_key for cache_key in misses if not self.inflight.running(cache_key)]
+        batch = None
+        if packed:
+            batch = asyncio.ensure_future(self._classify_batch_with_backend(
+                backend, [images[misses[cache_key][0]] for cache_key in packed]
+            ))
+        flights = [
+            self.inflight.start(
+                cache_key,
+                lambda cache_key=cache_key: self._packed_result(
+                    backend, batch, packed.index(cache_key), cache_key
+                ),
+            )
+            for cache_key in misses
+        ]
+        outcomes = await asyncio.gather(
+            *(asyncio.shield(flight) for flight in flights), return_exceptions=True
+        )
+
+        failures = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+        for failure in failures:
+            if isinstance(failure, QuotaExceededError):
+                raise failure
+        if any(isinstance(failure, CircuitOpenError) for failure in failures):
+            logger.info("Gemini circuit breaker is open. Using stubbed results.")
+        elif failures:
+            logger.warning(
+                "Gemini batch classification failed (%s). Falling back to stubbed results.",
+                failures[0],
+            )
+
+        for indexes, outcome in zip(misses.values(), outcomes):
+            for index in indexes:
+                if isinstance(outcome, dict):
+                    results[index] = outcome
+                    continue
+                backend_requests.inc(backend="fallback")
+                with stage_seconds.time(stage="stub"):
+                    results[index] = self.stub.classify(*images[index])
+
+        return results
+
+    async def _packed_result(self, backend, batch: asyncio.Future, position: int, cache_key: str) -> Dict:
+        """One image's result from a packed engine call, cached like a single call's."""
+        result = (await batch)[position]
+        if isinstance(result, Exception):
+            backend_errors.inc(backend=backend.name)
+            raise result
+        backend_requests.inc(backend=backend.name)
+        self.cache.put(cache_key, result)
+        return result
+
+    async def _classify_batch_with_backend(self, backend, images: List[Tuple[bytes, Optional[str]]]) -> List:
+        """
+        One packed engine call through the circuit breaker; returns a result
+        or an exception instance per image.
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"{backend.name} circuit breaker is open")
+
+        logger.info(
+            "Sending %d images to %s model '%s' (size=%d bytes)",
+            len(images),
+            backend.name,
+            backend.model,
+            sum(len(image_data) for image_data, _ in images),
+        )
+        started = time.perf_counter()
+        try:
+            with backend_in_flight.track(backend=backend.name):
+                results = await backend.classify_many(images)
+        except QuotaExceededError:
+            raise
+        except Exception:
+            self.breaker.record_failure(time.perf_counter() - started)
+            backend_errors.inc(backend=backend.name)
+            raise
+
+        self.breaker.record_success(time.perf_counter() - started)
+        return results
+
+    async def _call_backend(self, backend, image_data: bytes, mime_type: Optional[str]) -> Dict:
+        """
+        One engine call, hedged with a second Gemini request when hedging is
+        enabled (the local model shares one CPU pool, so it is never hedged).
+        """
+        if self.hedging is None or backend is not self.gemini:
+            return await backend.classify(image_data, mime_type)
+        return await self.hedging.run(
+            lambda: backend.classify(image_data, mime_type),
+            lambda: backend.classify_hedge(image_data, mime_type),
+        )
+
+    async def _fingerprint(self, image_data: bytes, session: Optional[str]) -> Optional[Fingerprint]:
+        if session is None or not self.near_duplicates.enabled:
+            return None
+        with stage_seconds.time(stage="perceptual_hash"):
+            # Decoding is CPU-bound; keep it off the event loop
+            return await asyncio.to_thread(fingerprint, image_data)
+
+    async def _classify_with_backend(
+        self,
+        backend,
+        cache_key: str,
+        image_data: bytes,
+        mime_type: Optional[str],
+        namespace: Optional[str] = None,
+        image_fingerprint: Optional[Fingerprint] = None,
+    ) -> Dict:
+        """
+        Call the engine through the circuit breaker and cache its result
+        (also under its fingerprint in ``namespace``, for near-duplicate
+        lookups by later frames of the same stream).
+        Runs once per distinct in-flight image (see SingleFlight).
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"{backend.name} circuit breaker is open")
+
+        logger.info(
+            "Sending image to %s model '%s' (size=%d bytes)",
+            backend.name,
+            backend.model,
+            len(image_data),
+        )
+        started = time.perf_counter()
+        try:
+            with backend_in_flight.track(backend=backend.name):
+                result = await self._call_backend(backend, image_data, mime_type)
+        except QuotaExceededError:
+            # Shed locally before reaching the upstream; not an upstream failure
+            raise
+        except Exception:
+            self.breaker.record_failure(time.perf_counter() - started)
+            backend_errors.inc(backend=backend.name)
+            raise
+
+        self.breaker.record_success(time.perf_counter() - started)
+        backend_requests.inc(backend=backend.name)
+        self.cache.put(cache_key, result)
+        if image_fingerprint is not None:
+            self.near_duplicates.put(namespace, image_fingerprint, result)
+        return result
+
+    def get_classification_history(self, limit: int = 20) -> List[Dict]:
+        """
+        Get the most recent stored classifications.
+        Jira Ticket: RSCI-14
+        """
+        history, _ = results_store.history(limit=limit)
+        return history
+
+    def get_stats(self) -> Dict:
+        """Return runtime counters for the classification pipeline."""
+        backend = self.backend
+        stats = {
+            "backend": backend.name if backend is not None else "stub",
+            "cache": self.cache.stats(),
+            "coalescing": self.inflight.stats(),
+            "near_duplicates": self.near_duplicates.stats(),
+            "results_store": results_store.stats(),
+        }
+        if backend is not None:
+            stats["circuit_breaker"] = self.breaker.snapshot()
+        if self.hedging is not None:
+            stats["hedging"] = self.hedging.stats()
+        if self.gemini is not None:
+            stats["gemini"] = self.gemini.stats()
+        if self.local is not None:
+            stats["local_batches"] = self.local.batcher.stats()
+        return stats
+
+    def health(self) -> Dict:
+        """
+        Summary for the health endpoints: the active engine and whether the
+        service is degraded (circuit breaker not closed).
+        """
+        backend = self.backend
+        if backend is None:
+            return {"backend": "stub", "degraded": False}
+        breaker = self.breaker.snapshot()
+        return {
+            "backend": backend.name,
+            "degraded": breaker["state"] != CircuitBreaker.CLOSED,
+            "circuit_breaker": breaker,
+        }
 
 
 # Global instance
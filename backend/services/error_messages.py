@@ -14,7 +14,17 @@ ERROR_MESSAGES = {
     "MISSING_FILENAME": "Filename is required. Please ensure your file has a name.",
     "EMPTY_FILE": "The uploaded file is empty. Please upload a valid image file.",
     "CORRUPTED_FILE": "The uploaded file appears to be corrupted or invalid. Please try uploading the file again.",
+    "INVALID_IMAGE_CONTENT": "The uploaded file is not a valid image. Only JPG and PNG images are allowed.",
+    "MISMATCHED_FILE_TYPE": "The file content does not match its file type. Please check the file extension.",
+    "IMAGE_DIMENSIONS_TOO_LARGE": "The image dimensions are too large. Please upload a smaller image.",
     "NETWORK_ERROR": "Network error occurred during upload. Please check your internet connection and try again.",
+    "TOO_MANY_FILES": "Too many files in one request. Please split the upload into smaller batches.",
+    "QUEUE_FULL": "The classification queue is full. Please try again shortly.",
+    "UPSTREAM_QUOTA_EXCEEDED": "The classification service is at its rate limit. Please try again shortly.",
+    "INVALID_STREAM_MESSAGE": "Stream messages must be binary JPEG or PNG frames.",
+    "PROFILER_FORBIDDEN": "A valid X-Profiler-Token header is required.",
+    "PROFILE_IN_PROGRESS": "An all-worker profile is already running. Please try again when it finishes.",
+    "PROFILE_NOT_FOUND": "No finished profile with this id. Only the most recent request profiles are kept.",
     "GENERIC_VALIDATION_ERROR": "File validation failed. Please check that your file is a valid JPG or PNG image under 10 MB.",
 }
 
@@ -0,0 +1,140 @@
+"""
+Request Hedging
+Related Jira Ticket: RSCI-10
+
+This module cuts tail latency of engine calls with hedged requests: when the
+primary call has not answered within a percentile of recent latencies (the
+hedge delay), a second call is started and whichever answers first wins;
+the other is cancelled.
+
+Only the slowest few percent of calls are hedged, so the extra upstream
+cost stays small, and a token budget (like the retry budget) caps hedges at
+a fraction of all calls even when latency degrades across the board.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from services.metrics import hedge_requests
+from services.resilience import LatencyTracker, RetryBudget
+
+T = TypeVar("T")
+
+
+class HedgePolicy:
+    """
+    Decides when to hedge a call and races the primary against the hedge.
+
+    The hedge delay is the ``percentile`` of recent primary latencies (at
+    least ``min_delay_seconds``); nothing is hedged until ``min_samples``
+    latencies have been observed. Every call deposits ``max_ratio`` budget
+    tokens and every hedge spends one.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        max_ratio: float = 0.05,
+        min_delay_seconds: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        self.percentile = percentile
+        self.min_delay_seconds = min_delay_seconds
+        self.min_samples = min_samples
+        self.latency = LatencyTracker(window)
+        # No per-second allowance: hedges are strictly bounded by traffic
+        self.budget = RetryBudget(ratio=max_ratio, min_per_second=0.0, max_tokens=5.0)
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @classmethod
+    def from_env(cls) -> "HedgePolicy":
+        """Build a policy configured from HEDGE_* environment variables."""
+        return cls(
+            percentile=float(os.getenv("HEDGE_PERCENTILE", "95")),
+            max_ratio=float(os.getenv("HEDGE_MAX_RATIO", "0.05")),
+            min_delay_seconds=float(os.getenv("HEDGE_MIN_DELAY_MS", "50")) / 1000,
+            min_samples=int(os.getenv("HEDGE_MIN_SAMPLES", "20")),
+        )
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while latency is unknown."""
+        if self.latency.count < self.min_samples:
+            return None
+        return max(self.min_delay_seconds, self.latency.percentile(self.percentile))
+
+    async def run(
+        self,
+        primary: Callable[[], Awaitable[T]],
+        hedge: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Return the result of ``primary()``, or of ``hedge()`` if it was
+        started after the hedge delay and answered first.
+
+        A call that fails does not win: the other one is awaited instead,
+        and the primary's exception is raised only if both fail.
+        """
+        self.calls += 1
+        self.budget.record_request()
+        started = time.perf_counter()
+        first = asyncio.ensure_future(primary())
+        second: Optional[asyncio.Future] = None
+        try:
+            delay = self.delay()
+            if delay is not None:
+                await asyncio.wait({first}, timeout=delay)
+            if first.done() or delay is None:
+                result = await first
+                self.latency.record(time.perf_counter() - started)
+                return result
+            if not self.budget.try_acquire():
+                hedge_requests.inc(outcome="budget_exhausted")
+                result = await first
+                self.latency.record(time.perf_counter() - started)
+                return result
+
+            self.hedged += 1
+            second = asyncio.ensure_future(hedge())
+            pending = {first, second}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in (first, second):
+                    if task not in done:
+                        continue
+                    if task is first:
+                        self.latency.record(time.perf_counter() - started)
+                    if task.exception() is not None:
+                        continue
+                    if task is second:
+                        self.hedge_wins += 1
+                        hedge_requests.inc(outcome="hedge_won")
+                    else:
+                        hedge_requests.inc(outcome="primary_won")
+                    return task.result()
+            hedge_requests.inc(outcome="both_failed")
+            return first.result()
+        finally:
+            if not first.done():
+                first.cancel()
+                # Cancelled by a faster hedge: its latency is at least this
+                self.latency.record(time.perf_counter() - started)
+            if second is not None and not second.done():
+                second.cancel()
+
+    def stats(self) -> Dict:
+        delay = self.delay()
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedge_ratio": round(self.hedged / self.calls, 3) if self.calls else 0.0,
+            "delay_seconds": round(delay, 3) if delay is not None else None,
+            "budget": self.budget.stats(),
+        }
@@ -0,0 +1,220 @@
+"""
+HTTP Cache
+Related Jira Tickets: RSCI-12, RSCI-14
+
+This module makes repeated polling of result and history reads cheap.
+Response bodies are serialised once and kept in a small LRU
+(``ResponseCache``) together with a strong ETag derived from the body and
+lazily compressed variants:
+
+- A client that sends the ETag back in ``If-None-Match`` gets an empty
+  ``304 Not Modified``.
+- Bodies of at least ``min_compress_bytes`` are sent gzip- or
+  brotli-compressed when the client accepts it (brotli requires the optional
+  ``brotli`` package). Responses carry ``Vary: Accept-Encoding``.
+- Callers key bodies so that a cached body is only reused while the data
+  behind it is unchanged (finished results never change; history pages are
+  keyed by the newest stored row).
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from fastapi.responses import Response
+
+# Preferred first when the client accepts several
+ENCODINGS = ("br", "gzip")
+
+_brotli_module: Any = None
+_brotli_checked = False
+
+
+def _brotli():
+    """The brotli module, or None when it is not installed."""
+    global _brotli_module, _brotli_checked
+    if not _brotli_checked:
+        try:
+            import brotli  # pylint: disable=C0415
+
+            _brotli_module = brotli
+        except ImportError:
+            _brotli_module = None
+        _brotli_checked = True
+    return _brotli_module
+
+
+def serialise(content: Any) -> bytes:
+    """JSON body bytes, identical to what JSONResponse renders."""
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def accepted_encodings(header: Optional[str]) -> set:
+    """Content codings accepted by an Accept-Encoding header (q=0 excluded)."""
+    accepted = set()
+    for item in (header or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding)
+    return accepted
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of If-None-Match against an ETag and its encoded
+    variants (``"<hash>-gzip"`` matches ``"<hash>"``).
+    """
+    if not if_none_match:
+        return False
+    opaque = etag.strip('"')
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        candidate = candidate.strip('"')
+        if candidate == opaque or candidate.rsplit("-", 1)[0] == opaque:
+            return True
+    return False
+
+
+class CachedBody:
+    """
+    A serialised JSON body, its ETag and compressed variants.
+    """
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        self._encoded: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: str) -> bytes:
+        """The body compressed with ``encoding`` (computed once)."""
+        with self._lock:
+            data = self._encoded.get(encoding)
+            if data is None:
+                if encoding == "br":
+                    data = _brotli().compress(self.body, quality=5)
+                else:
+                    data = gzip.compress(self.body, compresslevel=6, mtime=0)
+                self._encoded[encoding] = data
+            return data
+
+
+class ResponseCache:
+    """
+    LRU of serialised response bodies with conditional-GET and compression
+    support.
+    """
+
+    def __init__(self, max_entries: int = 1024, min_compress_bytes: int = 1024):
+        self.max_entries = max_entries
+        self.min_compress_bytes = min_compress_bytes
+        self._entries: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.compressed = 0
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Build a cache configured from HTTP_CACHE_* environment variables."""
+        return cls(
+            max_entries=int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "1024")),
+            min_compress_bytes=int(os.getenv("HTTP_COMPRESS_MIN_BYTES", "1024")),
+        )
+
+    def get(self, key: Hashable) -> Optional[CachedBody]:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached
+
+    def put(self, key: Hashable, content: Any) -> CachedBody:
+        """Serialise ``content`` and keep it under ``key``."""
+        cached = CachedBody(serialise(content))
+        if self.max_entries <= 0:
+            return cached
+        with self._lock:
+            self._entries[key] = cached
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def respond(
+        self,
+        request_headers,
+        cached: CachedBody,
+        cache_control: str,
+        status_code: int = 200,
+    ) -> Response:
+        """
+        Response for ``cached``: 304 when the request's If-None-Match matches,
+        otherwise the body, compressed when accepted and large enough.
+        """
+        encoding = self._choose_encoding(request_headers.get("accept-encoding"), cached)
+        # Strong validators are per representation: "<hash>" or "<hash>-gzip"
+        etag = f'{cached.etag[:-1]}-{encoding}"' if encoding else cached.etag
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if etag_matches(request_headers.get("if-none-match"), cached.etag):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        body = cached.body
+        if encoding:
+            body = cached.encoded(encoding)
+            headers["Content-Encoding"] = encoding
+            with self._lock:
+                self.compressed += 1
+        return Response(
+            content=body, status_code=status_code, media_type="application/json", headers=headers
+        )
+
+    def _choose_encoding(self, accept_encoding: Optional[str], cached: CachedBody) -> Optional[str]:
+        if len(cached.body) < self.min_compress_bytes:
+            return None
+        accepted = accepted_encodings(accept_encoding)
+        for encoding in ENCODINGS:
+            if encoding in accepted and (encoding != "br" or _brotli() is not None):
+                return encoding
+        return None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "compressed": self.compressed,
+            }
+
+
+# Global instance
+response_cache = ResponseCache.from_env()
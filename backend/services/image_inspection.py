@@ -0,0 +1,245 @@
+"""
+Image Inspection
+Related Jira Tickets: RSCI-6, RSCI-9
+
+This module identifies JPEG and PNG uploads from their headers. Only the JPEG
+marker segments up to the frame header (SOFn) and the PNG signature and IHDR
+chunk are parsed; pixel data is never decoded, so inspection costs
+microseconds regardless of the image size. The EXIF Orientation tag of JPEGs
+(phone photos are often stored sideways) is read from the APP1 segment.
+"""
+
+from __future__ import annotations
+
+import zlib
+from dataclasses import asdict, dataclass
+from typing import Dict, Tuple
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SOI = b"\xff\xd8"
+JPEG_EOI = b"\xff\xd9"
+
+# SOF markers carrying frame dimensions (C4 = DHT, C8 = JPG, CC = DAC are not frames)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+JPEG_PROGRESSIVE_MARKERS = {0xC2, 0xC6, 0xCA, 0xCE}
+JPEG_SOS = 0xDA
+JPEG_APP1 = 0xE1
+EXIF_HEADER = b"Exif\x00\x00"
+EXIF_ORIENTATION_TAG = 0x0112
+# Orientations 5-8 store the image rotated by 90 degrees (width and height swapped)
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+JPEG_EOI_MARKER = 0xD9
+# Markers without a length field (TEM and RST0-RST7)
+JPEG_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD8)}
+
+JPEG_COLOR_TYPES = {1: "grayscale", 3: "ycbcr", 4: "cmyk"}
+
+# PNG color type -> (name, allowed bit depths)
+PNG_COLOR_TYPES = {
+    0: ("grayscale", {1, 2, 4, 8, 16}),
+    2: ("rgb", {8, 16}),
+    3: ("palette", {1, 2, 4, 8}),
+    4: ("grayscale_alpha", {8, 16}),
+    6: ("rgba", {8, 16}),
+}
+
+FORMAT_MIME_TYPES = {"jpeg": "image/jpeg", "png": "image/png"}
+
+
+class ImageInspectionError(ValueError):
+    """
+    Raised when image content is not a well-formed JPEG or PNG.
+
+    ``reason`` is "unsupported" when the content is not a JPEG/PNG at all,
+    "truncated" when the file ends early, and "corrupted" for malformed headers.
+    """
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+@dataclass(frozen=True)
+class ImageInfo:
+    """
+    Header-level description of an image.
+    """
+
+    format: str
+    width: int
+    height: int
+    color_type: str
+    bit_depth: int
+    progressive: bool = False
+    # EXIF Orientation (1 = stored upright)
+    orientation: int = 1
+
+    @property
+    def mime_type(self) -> str:
+        return FORMAT_MIME_TYPES[self.format]
+
+    @property
+    def display_size(self) -> Tuple[int, int]:
+        """(width, height) once the EXIF orientation is applied."""
+        if self.orientation in TRANSPOSED_ORIENTATIONS:
+            return self.height, self.width
+        return self.width, self.height
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+    def to_dict(self) -> Dict:
+        info = asdict(self)
+        info["mime_type"] = self.mime_type
+        return info
+
+
+def inspect_image(data: bytes) -> ImageInfo:
+    """
+    Identify a JPEG or PNG image and extract its dimensions from the header.
+
+    Args:
+        data: Image file bytes
+
+    Returns:
+        ImageInfo: Format, dimensions and color information
+
+    Raises:
+        ImageInspectionError: If the content is not a complete JPEG or PNG
+    """
+    if data[:8] == PNG_SIGNATURE:
+        return _inspect_png(data)
+    if data[:2] == JPEG_SOI:
+        return _inspect_jpeg(data)
+    raise ImageInspectionError("unsupported", "Content is not a JPEG or PNG image")
+
+
+def _inspect_png(data: bytes) -> ImageInfo:
+    # Signature (8) + IHDR length (4) + type (4) + data (13) + CRC (4)
+    if len(data) < 33:
+        raise ImageInspectionError("truncated", "PNG header is truncated")
+
+    length = int.from_bytes(data[8:12], "big")
+    if length != 13 or data[12:16] != b"IHDR":
+        raise ImageInspectionError("corrupted", "PNG does not start with an IHDR chunk")
+
+    if int.from_bytes(data[29:33], "big") != zlib.crc32(data[12:29]):
+        raise ImageInspectionError("corrupted", "PNG IHDR checksum mismatch")
+
+    width = int.from_bytes(data[16:20], "big")
+    height = int.from_bytes(data[20:24], "big")
+    bit_depth = data[24]
+    color_type = data[25]
+    interlace = data[28]
+
+    if width == 0 or height == 0:
+        raise ImageInspectionError("corrupted", "PNG has zero width or height")
+    if color_type not in PNG_COLOR_TYPES or bit_depth not in PNG_COLOR_TYPES[color_type][1]:
+        raise ImageInspectionError("corrupted", "PNG has an invalid color type or bit depth")
+
+    # The IEND chunk must be present after the header for the file to be complete
+    if data.rfind(b"IEND") < 33:
+        raise ImageInspectionError("truncated", "PNG is missing its IEND chunk")
+
+    return ImageInfo(
+        format="png",
+        width=width,
+        height=height,
+        color_type=PNG_COLOR_TYPES[color_type][0],
+        bit_depth=bit_depth,
+        progressive=interlace == 1,
+    )
+
+
+def _inspect_jpeg(data: bytes) -> ImageInfo:
+    size = len(data)
+    offset = 2
+    frame = None
+    orientation = 1
+
+    while True:
+        if offset + 2 > size:
+            raise ImageInspectionError("truncated", "JPEG ends before its image data")
+        if data[offset] != 0xFF:
+            raise ImageInspectionError("corrupted", "JPEG marker expected")
+
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            offset += 1
+            continue
+        if marker in JPEG_STANDALONE_MARKERS:
+            offset += 2
+            continue
+        if marker == JPEG_EOI_MARKER:
+            raise ImageInspectionError("corrupted", "JPEG ends before its image data")
+
+        if offset + 4 > size:
+            raise ImageInspectionError("truncated", "JPEG segment header is truncated")
+        length = int.from_bytes(data[offset + 2:offset + 4], "big")
+        if length < 2:
+            raise ImageInspectionError("corrupted", "JPEG segment has an invalid length")
+        segment_end = offset + 2 + length
+        if segment_end > size:
+            raise ImageInspectionError("truncated", "JPEG segment is truncated")
+
+        if marker in JPEG_SOF_MARKERS:
+            if length < 8:
+                raise ImageInspectionError("corrupted", "JPEG frame header is too short")
+            frame = (
+                marker,
+                data[offset + 4],
+                int.from_bytes(data[offset + 5:offset + 7], "big"),
+                int.from_bytes(data[offset + 7:offset + 9], "big"),
+                data[offset + 9],
+            )
+        elif marker == JPEG_APP1 and data[offset + 4:offset + 10] == EXIF_HEADER:
+            orientation = _exif_orientation(data[offset + 10:segment_end])
+        elif marker == JPEG_SOS:
+            break
+
+        offset = segment_end
+
+    if frame is None:
+        raise ImageInspectionError("corrupted", "JPEG has no frame header")
+
+    marker, precision, height, width, components = frame
+    if width == 0 or height == 0:
+        raise ImageInspectionError("corrupted", "JPEG has zero width or height")
+    if components not in JPEG_COLOR_TYPES:
+        raise ImageInspectionError("corrupted", "JPEG has an unsupported number of components")
+
+    # Entropy-coded data follows SOS; the file is complete only if an EOI
+    # marker comes after it (trailing bytes after EOI are tolerated).
+    if data.rfind(JPEG_EOI, offset) == -1:
+        raise ImageInspectionError("truncated", "JPEG is missing its end-of-image marker")
+
+    return ImageInfo(
+        format="jpeg",
+        width=width,
+        height=height,
+        color_type=JPEG_COLOR_TYPES[components],
+        bit_depth=precision,
+        progressive=marker in JPEG_PROGRESSIVE_MARKERS,
+        orientation=orientation,
+    )
+
+
+def _exif_orientation(tiff: bytes) -> int:
+    """
+    Orientation tag from the first IFD of an EXIF (TIFF) block; 1 when it
+    is missing or malformed (orientation never causes a rejection).
+    """
+    if len(tiff) < 8 or tiff[:2] not in (b"II", b"MM"):
+        return 1
+    byteorder = "little" if tiff[:2] == b"II" else "big"
+    ifd = int.from_bytes(tiff[4:8], byteorder)
+    if ifd + 2 > len(tiff):
+        return 1
+    count = int.from_bytes(tiff[ifd:ifd + 2], byteorder)
+    for entry in range(ifd + 2, min(ifd + 2 + count * 12, len(tiff) - 11), 12):
+        if int.from_bytes(tiff[entry:entry + 2], byteorder) == EXIF_ORIENTATION_TAG:
+            value = int.from_bytes(tiff[entry + 8:entry + 10], byteorder)
+            return value if 1 <= value <= 8 else 1
+    return 1
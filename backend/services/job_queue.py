@@ -0,0 +1,245 @@
+"""
+Job Queue
+Related Jira Tickets: RSCI-10, RSCI-12
+
+This module runs classifications as background jobs. Requests submitted in
+async mode are placed on a bounded queue and drained by a fixed pool of
+worker tasks; callers poll (or long-poll) for the result by job id. When the
+queue is full, submissions are rejected so the API can answer 429 instead of
+accepting work it cannot finish in time.
+
+Job states are mirrored to the results store, so a poll answered by another
+server worker process reports the job instead of "not found".
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+
+from services.results_store import ResultsStore, results_store
+
+logger = logging.getLogger(__name__)
+
+JobWork = Callable[[], Awaitable[Dict]]
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its maximum depth."""
+
+
+class Job:
+    """
+    A queued classification and its outcome.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    def __init__(self, job_id: str, work: JobWork):
+        self.job_id = job_id
+        self.work: Optional[JobWork] = work
+        self.status = self.QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.done = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (self.COMPLETED, self.FAILED)
+
+    def to_dict(self) -> Dict:
+        """Status summary for API responses (the result is added by the caller)."""
+        summary = {"image_id": self.job_id, "status": self.status}
+        if self.error is not None:
+            summary["error"] = self.error
+        return summary
+
+
+class ClassificationJobQueue:
+    """
+    Bounded queue of classification jobs drained by background workers.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_depth: int = 100,
+        retain_finished: int = 1000,
+        store: Optional[ResultsStore] = None,
+    ):
+        self.num_workers = max(1, workers)
+        self.max_depth = max(1, max_depth)
+        self.retain_finished = retain_finished
+        self.store = store
+        self._jobs: Dict[str, Job] = {}
+        self._finished: deque = deque()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    @classmethod
+    def from_env(cls) -> "ClassificationJobQueue":
+        """Build a queue configured from CLASSIFY_JOB_* environment variables."""
+        return cls(
+            workers=int(os.getenv("CLASSIFY_JOB_WORKERS", "4")),
+            max_depth=int(os.getenv("CLASSIFY_JOB_QUEUE_DEPTH", "100")),
+            retain_finished=int(os.getenv("CLASSIFY_JOB_RETAIN_FINISHED", "1000")),
+            store=results_store,
+        )
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers) and self._loop is asyncio.get_running_loop()
+
+    async def start(self) -> None:
+        """Start the worker tasks on the running event loop."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_depth)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"classification-worker-{index}")
+            for index in range(self.num_workers)
+        ]
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """
+        Let the workers drain queued jobs (up to ``timeout`` seconds), then stop them.
+        """
+        if not self._workers or self._loop is not asyncio.get_running_loop():
+            self._workers = []
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Stopping job workers with %d jobs still queued", self._queue.qsize())
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, job_id: str, work: JobWork) -> Job:
+        """
+        Enqueue ``work`` under ``job_id``.
+
+        Raises:
+            QueueFullError: If the queue already holds ``max_depth`` jobs
+        """
+        if not self.running:
+            await self.start()
+
+        if self._queue.full():
+            self.rejected += 1
+            raise QueueFullError(f"Classification queue is full ({self.max_depth} jobs)")
+
+        job = Job(job_id, work)
+        if self.store is not None:
+            # Committed before the caller hands out the job id to poll
+            await asyncio.to_thread(self.store.save_job, job_id, Job.QUEUED)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            message = f"Classification queue is full ({self.max_depth} jobs)"
+            if self.store is not None:
+                self.store.record_job(job_id, Job.FAILED, message)
+            raise QueueFullError(message)
+
+        self._jobs[job_id] = job
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return the job with ``job_id`` if it is still tracked."""
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """
+        Wait up to ``timeout`` seconds for a job to finish and return it.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.finished or timeout <= 0:
+            return job
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    def stats(self) -> Dict:
+        """Return queue depth and job counters."""
+        return {
+            "workers": len(self._workers),
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_depth": self.max_depth,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = Job.RUNNING
+        job.started_at = time.time()
+        self._publish(job)
+        try:
+            job.result = await job.work()
+            job.status = Job.COMPLETED
+            self.completed += 1
+        except asyncio.CancelledError:
+            job.status = Job.FAILED
+            job.error = "Classification was cancelled."
+            self.failed += 1
+            raise
+        except Exception as exc:  # report the failure to pollers
+            logger.warning("Classification job %s failed: %s", job.job_id, exc)
+            job.status = Job.FAILED
+            job.error = str(exc) or exc.__class__.__name__
+            self.failed += 1
+        finally:
+            job.work = None  # release the image data
+            job.finished_at = time.time()
+            job.done.set()
+            self._retain(job)
+            self._publish(job)
+
+    def _publish(self, job: Job) -> None:
+        """Share the job's state with the other worker processes."""
+        if self.store is not None:
+            self.store.record_job(job.job_id, job.status, job.error)
+
+    def _retain(self, job: Job) -> None:
+        """Keep the most recent finished jobs in memory; older ones are dropped."""
+        self._finished.append(job)
+        while len(self._finished) > self.retain_finished:
+            expired = self._finished.popleft()
+            if self._jobs.get(expired.job_id) is expired:
+                del self._jobs[expired.job_id]
+
+
+# Global instance
+job_queue = ClassificationJobQueue.from_env()
@@ -0,0 +1,168 @@
+"""
+Label Index
+Related Jira Ticket: RSCI-10
+
+This module maps free-form road-sign labels returned by an engine (e.g.
+"Speed limit 60 km/h", "GIVE WAY sign") onto a canonical vocabulary (e.g.
+"Speed Limit 60", "Yield"), so results can be aggregated, compared and
+cached consistently.
+
+The index is built once: every canonical label and alias is normalised
+(case, punctuation, units and filler words removed) into an exact-match
+table. Labels that miss the table are fuzzy-matched with ``difflib``, only
+against entries carrying the same numbers, so "Speed Limit 60" can never be
+matched to "Speed Limit 80". Resolved labels are memoised.
+"""
+
+from __future__ import annotations
+
+import difflib
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# Words that carry no meaning for matching ("Stop sign", "Speed limit 60 km/h")
+FILLER_WORDS = {"sign", "signs", "road", "traffic", "the", "a", "km", "h", "kmh", "kph", "mph", "zone"}
+
+# Common alternative names for the default vocabulary
+DEFAULT_ALIASES: Dict[str, Sequence[str]] = {
+    "Yield": ("give way",),
+    "No Entry": ("do not enter", "no entry for vehicles", "wrong way"),
+    "No Parking": ("parking prohibited", "no parking zone"),
+    "Roundabout": ("roundabout ahead", "mandatory roundabout", "traffic circle"),
+    "Pedestrian Crossing": ("crosswalk", "pedestrian crosswalk", "zebra crossing", "pedestrians"),
+    "School Zone": ("school", "children crossing", "school crossing", "children"),
+    "Construction Ahead": ("road work", "road works", "roadwork ahead", "men at work", "work zone"),
+}
+
+_non_word = re.compile(r"[^a-z0-9]+")
+_digits = re.compile(r"\d+")
+
+
+def normalise_label(label: str) -> str:
+    """Lower-case, strip punctuation, units and filler words."""
+    words = _non_word.sub(" ", label.lower()).split()
+    # "60kmh" -> "60"
+    words = [re.sub(r"^(\d+)(?:kmh|kph|mph|km)$", r"\1", word) for word in words]
+    return " ".join(word for word in words if word not in FILLER_WORDS)
+
+
+class LabelIndex:
+    """
+    Normalisation and fuzzy-match index over a canonical label vocabulary.
+    """
+
+    # Bound on memoised lookups (engines can return arbitrary text)
+    MAX_MEMO_ENTRIES = 4096
+
+    def __init__(
+        self,
+        labels: Iterable[str],
+        aliases: Optional[Mapping[str, Iterable[str]]] = None,
+        cutoff: float = 0.85,
+    ):
+        self.labels: List[str] = list(dict.fromkeys(labels))
+        self.cutoff = cutoff
+        self._exact: Dict[str, str] = {}
+        for label in self.labels:
+            self._exact.setdefault(normalise_label(label), label)
+        for label, names in (aliases or {}).items():
+            if label not in self.labels:
+                continue
+            for name in names:
+                self._exact.setdefault(normalise_label(name), label)
+
+        # Fuzzy candidates grouped by the numbers they contain
+        self._by_numbers: Dict[Tuple[str, ...], List[str]] = {}
+        for key in self._exact:
+            self._by_numbers.setdefault(tuple(_digits.findall(key)), []).append(key)
+
+        self._memo: Dict[str, Tuple[Optional[str], bool]] = {}
+        self._lock = threading.Lock()
+        self.exact = 0
+        self.fuzzy = 0
+        self.unmatched = 0
+
+    @classmethod
+    def from_env(cls, default_labels: Sequence[str]) -> "LabelIndex":
+        """
+        Build the index from LABEL_VOCABULARY_PATH, a text file with one
+        canonical label per line, optionally followed by aliases
+        (``Yield: give way, yield ahead``). Without it the default vocabulary
+        and aliases are used. LABEL_MATCH_CUTOFF sets the fuzzy-match
+        similarity threshold (default 0.85).
+        """
+        cutoff = float(os.environ.get("LABEL_MATCH_CUTOFF", "0.85"))
+        path = os.environ.get("LABEL_VOCABULARY_PATH")
+        if not path:
+            return cls(default_labels, DEFAULT_ALIASES, cutoff=cutoff)
+
+        labels: List[str] = []
+        aliases: Dict[str, List[str]] = {}
+        with open(path, encoding="utf-8") as vocabulary_file:
+            for line in vocabulary_file:
+                label, _, names = line.partition(":")
+                label = label.strip()
+                if not label:
+                    continue
+                labels.append(label)
+                aliases[label] = [name.strip() for name in names.split(",") if name.strip()]
+        return cls(labels, aliases, cutoff=cutoff)
+
+    def resolve(self, label: str) -> Optional[str]:
+        """Canonical label for ``label``, or None when nothing is close enough."""
+        memoised = self._memo.get(label)
+        if memoised is None:
+            memoised = self._lookup(label)
+            with self._lock:
+                if len(self._memo) >= self.MAX_MEMO_ENTRIES:
+                    self._memo.clear()
+                self._memo[label] = memoised
+
+        canonical, exact = memoised
+        with self._lock:
+            if canonical is None:
+                self.unmatched += 1
+            elif exact:
+                self.exact += 1
+            else:
+                self.fuzzy += 1
+        return canonical
+
+    def canonicalise(self, predictions: List[Dict]) -> List[Dict]:
+        """
+        Replace prediction labels with canonical ones. Predictions that map to
+        the same canonical label are merged (confidences summed, capped at
+        1); labels outside the vocabulary are kept unchanged.
+        """
+        merged: Dict[str, Dict] = {}
+        for prediction in predictions:
+            label = self.resolve(str(prediction["label"])) or prediction["label"]
+            existing = merged.get(label)
+            if existing is None:
+                merged[label] = {**prediction, "sign": label, "label": label}
+            else:
+                confidence = min(1.0, existing["confidence"] + prediction["confidence"])
+                existing["confidence"] = round(confidence, 3)
+        return list(merged.values())
+
+    def stats(self) -> Dict:
+        return {
+            "labels": len(self.labels),
+            "exact": self.exact,
+            "fuzzy": self.fuzzy,
+            "unmatched": self.unmatched,
+        }
+
+    def _lookup(self, label: str) -> Tuple[Optional[str], bool]:
+        key = normalise_label(label)
+        canonical = self._exact.get(key)
+        if canonical is None and key.isdigit():
+            # A bare number on a sign is its speed limit ("60 km/h")
+            canonical = self._exact.get(f"speed limit {key}")
+        if canonical is not None:
+            return canonical, True
+        candidates = self._by_numbers.get(tuple(_digits.findall(key)), [])
+        matches = difflib.get_close_matches(key, candidates, n=1, cutoff=self.cutoff)
+        return (self._exact[matches[0]], False) if matches else (None, False)
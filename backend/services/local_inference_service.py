@@ -0,0 +1,302 @@
+"""
+Local Inference Service
+Related Jira Ticket: RSCI-10
+
+This module runs a small exported traffic-sign model on the CPU, without any
+network access. Two model formats are supported:
+
+- ``.npz``: plain NumPy weights for a dense network. Layers are stored as
+  ``weights_0``/``bias_0``, ``weights_1``/``bias_1``, ... (ReLU between
+  layers, softmax on the output), with optional ``labels``, ``input_size``
+  (height, width), ``mean`` and ``std`` arrays.
+- ``.onnx``: any image classifier taking an NCHW or NHWC float32 tensor,
+  executed with onnxruntime (an optional dependency).
+
+Concurrent requests are collected by a MicroBatcher and run as one
+vectorized forward pass in a worker thread.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from io import BytesIO
+from typing import Dict, List, Optional, Sequence
+
+from fastapi.concurrency import run_in_threadpool
+
+from services.metrics import stage_seconds
+from services.micro_batcher import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+
+class NumpyModel:
+    """
+    Dense network evaluated with NumPy matrix products.
+    """
+
+    def __init__(self, path: str):
+        import numpy as np
+
+        with np.load(path, allow_pickle=False) as archive:
+            arrays = {name: archive[name] for name in archive.files}
+
+        self.layers = []
+        index = 0
+        while f"weights_{index}" in arrays:
+            weights = arrays[f"weights_{index}"].astype(np.float32)
+            bias = arrays.get(f"bias_{index}", np.zeros(weights.shape[1], dtype=np.float32))
+            self.layers.append((weights, bias.astype(np.float32)))
+            index += 1
+        if not self.layers:
+            raise ValueError(f"No weights_0 array found in {path}")
+
+        size = arrays.get("input_size", np.array([32, 32]))
+        self.input_size = (int(size[0]), int(size[1]))
+        self.channels_first = False
+        self.mean = arrays.get("mean", np.zeros(3, dtype=np.float32)).astype(np.float32)
+        self.std = arrays.get("std", np.ones(3, dtype=np.float32)).astype(np.float32)
+        self.labels = [str(label) for label in arrays["labels"]] if "labels" in arrays else None
+        self.num_classes = self.layers[-1][0].shape[1]
+
+    def predict(self, batch):
+        """Return class probabilities for a (N, H, W, 3) float32 batch."""
+        import numpy as np
+
+        activations = batch.reshape(batch.shape[0], -1)
+        for index, (weights, bias) in enumerate(self.layers):
+            activations = activations @ weights + bias
+            if index < len(self.layers) - 1:
+                np.maximum(activations, 0.0, out=activations)
+        return _softmax(activations)
+
+
+class OnnxModel:
+    """
+    ONNX image classifier executed with onnxruntime on the CPU.
+    """
+
+    def __init__(self, path: str):
+        import numpy as np
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        threads = int(os.getenv("LOCAL_MODEL_THREADS", "0"))
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        shape = model_input.shape
+        # NCHW models have the channel count in position 1
+        self.channels_first = shape[1] == 3
+        height, width = (shape[2], shape[3]) if self.channels_first else (shape[1], shape[2])
+        self.input_size = (
+            height if isinstance(height, int) else 32,
+            width if isinstance(width, int) else 32,
+        )
+        self.mean = np.zeros(3, dtype=np.float32)
+        self.std = np.ones(3, dtype=np.float32)
+        self.labels = None
+        output_shape = self.session.get_outputs()[0].shape
+        self.num_classes = output_shape[-1] if isinstance(output_shape[-1], int) else None
+
+    def predict(self, batch):
+        """Return class probabilities for a (N, H, W, 3) float32 batch."""
+        import numpy as np
+
+        if self.channels_first:
+            batch = np.ascontiguousarray(batch.transpose(0, 3, 1, 2))
+        outputs = self.session.run(None, {self.input_name: batch})[0]
+        outputs = outputs.reshape(outputs.shape[0], -1).astype(np.float32)
+
+        # Models may export logits or probabilities
+        sums = outputs.sum(axis=1)
+        if (outputs >= 0).all() and np.allclose(sums, 1.0, atol=1e-3):
+            return outputs
+        return _softmax(outputs)
+
+
+def _softmax(logits):
+    import numpy as np
+
+    logits = logits - logits.max(axis=1, keepdims=True)
+    np.exp(logits, out=logits)
+    logits /= logits.sum(axis=1, keepdims=True)
+    return logits
+
+
+class LocalClassificationService:
+    """
+    Classification service backed by a local CPU model.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        model_path: str,
+        labels: Optional[Sequence[str]] = None,
+        default_labels: Optional[Sequence[str]] = None,
+        top_k: int = 5,
+        max_batch_size: int = 32,
+        max_wait_seconds: float = 0.005,
+    ):
+        self.model_path = model_path
+        self.model = os.path.basename(model_path)
+        self.explicit_labels = list(labels) if labels else None
+        self.default_labels = list(default_labels) if default_labels else None
+        self.top_k = top_k
+        self._model = None
+        self._load_lock = threading.Lock()
+        self.labels: List[str] = []
+        self.batcher = MicroBatcher(
+            self.classify_many,
+            max_batch_size=max_batch_size,
+            max_wait_seconds=max_wait_seconds,
+        )
+
+    @classmethod
+    def from_env(cls, default_labels: Sequence[str]) -> "LocalClassificationService":
+        """
+        Build the service from LOCAL_MODEL_* environment variables.
+
+        LOCAL_MODEL_LABELS may point to a text file with one label per line;
+        otherwise labels come from the model file or ``default_labels``.
+        """
+        labels = None
+        labels_path = os.environ.get("LOCAL_MODEL_LABELS")
+        if labels_path:
+            with open(labels_path, encoding="utf-8") as labels_file:
+                labels = [line.strip() for line in labels_file if line.strip()]
+
+        return cls(
+            model_path=os.environ["LOCAL_MODEL_PATH"],
+            labels=labels,
+            default_labels=default_labels,
+            max_batch_size=int(os.environ.get("LOCAL_MODEL_BATCH_SIZE", "32")),
+            max_wait_seconds=float(os.environ.get("LOCAL_MODEL_BATCH_WAIT_MS", "5")) / 1000,
+        )
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self) -> None:
+        """
+        Load the model file. Called once at startup (or on first use).
+        """
+        with self._load_lock:
+            if self._model is None:
+                self._load()
+
+    def _load(self) -> None:
+        if self.model_path.endswith(".onnx"):
+            model = OnnxModel(self.model_path)
+        else:
+            model = NumpyModel(self.model_path)
+
+        labels = self.explicit_labels or model.labels or self.default_labels
+        if not labels:
+            raise ValueError("Local model has no labels")
+        if model.num_classes is not None and len(labels) != model.num_classes:
+            raise ValueError(
+                f"Local model has {model.num_classes} outputs but {len(labels)} labels"
+            )
+
+        self.labels = labels
+        self._model = model
+        logger.info(
+            "Loaded local classification model '%s' (%d classes, input %dx%d)",
+            self.model,
+            len(labels),
+            model.input_size[1],
+            model.input_size[0],
+        )
+
+    async def startup(self) -> None:
+        await run_in_threadpool(self.load)
+
+    async def aclose(self) -> None:
+        return None
+
+    async def classify(self, image_data: bytes, mime_type: Optional[str] = None) -> Dict:
+        """
+        Classify one image; concurrent calls are batched together.
+        """
+        if not image_data:
+            raise ValueError("Image data is empty")
+        with stage_seconds.time(stage="local_inference"):
+            return await self.batcher.submit(image_data)
+
+    async def classify_many(self, images: List[bytes]) -> List[Dict]:
+        """
+        Classify several images in one forward pass.
+        Failed images are returned as exception instances in their slot.
+        """
+        return await run_in_threadpool(self.classify_batch, images)
+
+    def classify_batch(self, images: List[bytes]) -> List:
+        """
+        Decode, stack and classify a batch of images (blocking).
+        """
+        import numpy as np
+
+        self.load()
+        model = self._model
+
+        results: List = [None] * len(images)
+        tensors = []
+        positions = []
+        for position, image_data in enumerate(images):
+            try:
+                tensors.append(self._to_tensor(image_data, model))
+                positions.append(position)
+            except Exception as exc:  # per-image decode failure
+                results[position] = ValueError(f"Could not decode image: {exc}")
+
+        if tensors:
+            batch = np.stack(tensors)
+            batch -= model.mean
+            batch /= model.std
+            probabilities = model.predict(batch)
+            for position, row in zip(positions, probabilities):
+                results[position] = self._to_result(row)
+
+        return results
+
+    @staticmethod
+    def _to_tensor(image_data: bytes, model):
+        import numpy as np
+        from PIL import Image
+
+        height, width = model.input_size
+        with Image.open(BytesIO(image_data)) as image:
+            # Decode JPEGs at reduced scale when the model input is small
+            image.draft("RGB", (width, height))
+            image = image.convert("RGB").resize((width, height), Image.BILINEAR)
+            return np.asarray(image, dtype=np.float32) / 255.0
+
+    def _to_result(self, probabilities) -> Dict:
+        import numpy as np
+
+        k = min(self.top_k, probabilities.shape[0])
+        top = np.argpartition(probabilities, -k)[-k:]
+        top = top[np.argsort(probabilities[top])[::-1]]
+
+        all_classes = []
+        for index in top:
+            label = self.labels[int(index)]
+            confidence = round(float(probabilities[index]), 3)
+            all_classes.append({"sign": label, "label": label, "confidence": confidence})
+
+        return {
+            "classification": all_classes[0]["label"],
+            "confidence": all_classes[0]["confidence"],
+            "all_classes": all_classes,
+        }
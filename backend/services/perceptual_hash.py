@@ -0,0 +1,274 @@
+"""
+Perceptual Hash
+Related Jira Ticket: RSCI-10
+
+This module recognises near-identical frames of one stream (a camera that
+has not moved, a frame re-sent after re-compression) so they can reuse the
+previous frame's result instead of another upstream call.
+
+Each image gets a ``Fingerprint``:
+
+- a 256-bit difference hash (dHash): the image is decoded at a reduced
+  scale, converted to grayscale, shrunk to 17x16 pixels and every bit
+  records whether a pixel is brighter than its right-hand neighbour.
+  Similar images have hashes that differ in few bits (a small Hamming
+  distance);
+- a 32x32 grayscale thumbnail. A hash alone cannot tell apart signs that
+  share a shape and colour (speed limit 30 and 80 hash within a couple of
+  bits), so a hash match is only reused when no thumbnail pixel differs by
+  more than ``max_pixel_difference``. That tolerates re-compression but not
+  a different sign, nor a moved one.
+
+``NearDuplicateIndex`` stores results by hash and finds stored hashes within
+a maximum distance using multi-index hashing: the hash is split into
+``max_distance + 1`` bands, and any hash within the distance matches at
+least one band exactly (pigeonhole), so a lookup only compares the few
+entries that share a band instead of scanning the whole index. Each
+namespace (one stream session of one engine) keeps only its most recent
+frames, and the index as a whole is LRU-bounded.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+HASH_SIZE = 16
+HASH_BITS = HASH_SIZE * HASH_SIZE
+THUMBNAIL_SIZE = 32
+# Minimum grayscale range across the thumbnail for an image to be fingerprinted
+MIN_CONTRAST = 8
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """
+    Perceptual hash of an image plus the thumbnail used to verify matches.
+    """
+
+    hash: int
+    # THUMBNAIL_SIZE x THUMBNAIL_SIZE grayscale pixels, row by row
+    thumbnail: bytes
+
+
+def fingerprint(image_data: bytes) -> Optional[Fingerprint]:
+    """
+    Fingerprint of an image, or None if it cannot be decoded or is (nearly)
+    a single flat colour.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(BytesIO(image_data)) as image:
+            if image.format == "JPEG":
+                # Decode at a reduced scale where possible; only 32x32 pixels are needed
+                image.draft("L", (THUMBNAIL_SIZE * 4, THUMBNAIL_SIZE * 4))
+            # Fingerprint the upright image, so a rotated copy matches its original
+            gray = ImageOps.exif_transpose(image.convert("L"))
+            thumbnail = gray.resize((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.BILINEAR)
+            pixels = list(gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.BILINEAR).getdata())
+    except (UnidentifiedImageError, OSError, ValueError):
+        return None
+
+    thumbnail_bytes = thumbnail.tobytes()
+    if max(thumbnail_bytes) - min(thumbnail_bytes) < MIN_CONTRAST:
+        # Flat images all hash to 0 whatever their colour; they carry too
+        # little structure to be matched safely
+        return None
+
+    value = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for column in range(HASH_SIZE):
+            value = (value << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+    return Fingerprint(hash=value, thumbnail=thumbnail_bytes)
+
+
+def dhash(image_data: bytes) -> Optional[int]:
+    """
+    256-bit difference hash of an image, or None if it cannot be decoded or
+    is (nearly) a single flat colour.
+    """
+    result = fingerprint(image_data)
+    return result.hash if result is not None else None
+
+
+def hamming_distance(first: int, second: int) -> int:
+    return bin(first ^ second).count("1")
+
+
+def pixel_difference(first: bytes, second: bytes) -> int:
+    """Largest absolute difference between corresponding thumbnail pixels."""
+    return max(abs(a - b) for a, b in zip(first, second))
+
+
+class NearDuplicateIndex:
+    """
+    Bounded LRU store of classification results, searchable by Hamming
+    distance between perceptual hashes and verified on thumbnail pixels.
+
+    Entries are kept per namespace, so a result is only reused within the
+    namespace (stream session and engine) that produced it, and only for the
+    namespace's last ``frames_per_namespace`` stored frames.
+    """
+
+    def __init__(
+        self,
+        max_distance: int = 8,
+        max_entries: int = 0,
+        max_pixel_difference: int = 24,
+        frames_per_namespace: int = 1,
+    ):
+        # Each band needs at least a couple of bits to be selective
+        self.max_distance = max(0, min(max_distance, HASH_BITS // 2 - 1))
+        self.max_entries = max_entries
+        self.max_pixel_difference = max_pixel_difference
+        self.frames_per_namespace = max(1, frames_per_namespace)
+        # Band boundaries (bit offset, width) covering all hash bits
+        bands = self.max_distance + 1
+        widths = [HASH_BITS // bands + (1 if index < HASH_BITS % bands else 0) for index in range(bands)]
+        self._bands: List[Tuple[int, int]] = []
+        offset = 0
+        for width in widths:
+            self._bands.append((offset, width))
+            offset += width
+
+        # (namespace, hash) -> (result JSON, thumbnail)
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[str, bytes]]" = OrderedDict()
+        self._tables: List[Dict[Tuple[str, int], Set[int]]] = [{} for _ in self._bands]
+        # Stored hashes per namespace, oldest first
+        self._namespaces: Dict[str, Deque[int]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "NearDuplicateIndex":
+        """Build an index configured from NEAR_DUPLICATE_* environment variables."""
+        return cls(
+            max_distance=int(os.getenv("NEAR_DUPLICATE_MAX_DISTANCE", "8")),
+            max_entries=int(os.getenv("NEAR_DUPLICATE_MAX_ENTRIES", "0")),
+            max_pixel_difference=int(os.getenv("NEAR_DUPLICATE_MAX_PIXEL_DIFFERENCE", "24")),
+            frames_per_namespace=int(os.getenv("NEAR_DUPLICATE_FRAMES_PER_SESSION", "1")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, namespace: str, image: Fingerprint) -> Optional[Tuple[Dict, int]]:
+        """
+        Return (copy of the closest stored result, distance) for a hash within
+        ``max_distance`` whose thumbnail matches, or None.
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            candidates: Dict[int, int] = {}
+            for table, band in zip(self._tables, self._band_values(image.hash)):
+                for candidate in table.get((namespace, band), ()):
+                    distance = hamming_distance(image.hash, candidate)
+                    if distance <= self.max_distance:
+                        candidates[candidate] = distance
+
+            match: Optional[int] = None
+            for candidate in sorted(candidates, key=candidates.get):
+                _, thumbnail = self._entries[(namespace, candidate)]
+                if pixel_difference(image.thumbnail, thumbnail) <= self.max_pixel_difference:
+                    match = candidate
+                    break
+
+            if match is None:
+                if candidates:
+                    # The hashes agreed but the pixels did not (e.g. 30 vs 80)
+                    self.rejected += 1
+                self.misses += 1
+                return None
+
+            key = (namespace, match)
+            self._entries.move_to_end(key)
+            self.hits += 1
+            payload, _ = self._entries[key]
+
+        return json.loads(payload), candidates[match]
+
+    def put(self, namespace: str, image: Fingerprint, result: Dict) -> None:
+        """
+        Store ``result`` for ``image``, evicting the namespace's older frames
+        and the least recently used entries.
+        """
+        if not self.enabled:
+            return
+
+        payload = json.dumps(result)
+        key = (namespace, image.hash)
+        with self._lock:
+            frames = self._namespaces.setdefault(namespace, deque())
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                frames.remove(image.hash)
+            else:
+                for table, band in zip(self._tables, self._band_values(image.hash)):
+                    table.setdefault((namespace, band), set()).add(image.hash)
+            self._entries[key] = (payload, image.thumbnail)
+            frames.append(image.hash)
+
+            while len(frames) > self.frames_per_namespace:
+                self._remove(namespace, frames[0])
+            while len(self._entries) > self.max_entries:
+                (old_namespace, old_hash), _ = next(iter(self._entries.items()))
+                self._remove(old_namespace, old_hash)
+                self.evictions += 1
+
+    def discard_namespace(self, namespace: str) -> None:
+        """Drop every entry of ``namespace`` (e.g. when its stream ends)."""
+        with self._lock:
+            for image_hash in list(self._namespaces.get(namespace, ())):
+                self._remove(namespace, image_hash)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._namespaces.clear()
+            for table in self._tables:
+                table.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "max_distance": self.max_distance,
+                "max_pixel_difference": self.max_pixel_difference,
+                "hits": self.hits,
+                "misses": self.misses,
+                "rejected": self.rejected,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def _band_values(self, image_hash: int) -> List[int]:
+        return [(image_hash >> offset) & ((1 << width) - 1) for offset, width in self._bands]
+
+    def _remove(self, namespace: str, image_hash: int) -> None:
+        del self._entries[(namespace, image_hash)]
+        frames = self._namespaces[namespace]
+        frames.remove(image_hash)
+        if not frames:
+            del self._namespaces[namespace]
+        for table, band in zip(self._tables, self._band_values(image_hash)):
+            bucket = table.get((namespace, band))
+            if bucket is None:
+                continue
+            bucket.discard(image_hash)
+            if not bucket:
+                del table[(namespace, band)]
@@ -0,0 +1,146 @@
+"""
+Preprocessing Service
+Related Jira Ticket: RSCI-10
+
+This module shrinks uploaded images before they are sent to a classification
+backend. Images are decoded (using JPEG draft mode to decode at a reduced
+scale where possible), downscaled so their longest edge fits the configured
+limit, and re-encoded as JPEG within a target quality and byte budget.
+The EXIF orientation is applied, so the classifier sees the image upright
+even though EXIF is not kept. Images that are already small enough (and
+stored upright) are passed through unchanged.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Dict
+
+from services.image_inspection import ImageInfo
+
+
+@dataclass
+class PreprocessedImage:
+    """
+    Image bytes ready for classification plus a record of what was done.
+    """
+
+    data: bytes
+    mime_type: str
+    metadata: Dict = field(default_factory=dict)
+
+
+class ImagePreprocessor:
+    """
+    Downscale and re-encode images to bound upstream payload size.
+    """
+
+    # Quality steps tried (from the configured quality down) to meet the byte budget
+    MIN_JPEG_QUALITY = 50
+    QUALITY_STEP = 10
+
+    def __init__(
+        self,
+        max_edge: int = 768,
+        jpeg_quality: int = 85,
+        max_bytes: int = 512 * 1024,
+        enabled: bool = True,
+    ):
+        self.max_edge = max_edge
+        self.jpeg_quality = jpeg_quality
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+    @classmethod
+    def from_env(cls) -> "ImagePreprocessor":
+        """Build a preprocessor configured from PREPROCESS_* environment variables."""
+        return cls(
+            max_edge=int(os.getenv("PREPROCESS_MAX_EDGE", "768")),
+            jpeg_quality=int(os.getenv("PREPROCESS_JPEG_QUALITY", "85")),
+            max_bytes=int(os.getenv("PREPROCESS_MAX_BYTES", str(512 * 1024))),
+            enabled=os.getenv("PREPROCESS_ENABLED", "true").lower() not in ("0", "false", "no"),
+        )
+
+    def preprocess(self, data: bytes, info: ImageInfo) -> PreprocessedImage:
+        """
+        Reduce an image to the configured edge size and byte budget.
+
+        Args:
+            data: Validated image file bytes
+            info: Header information from validate_image_content
+
+        Returns:
+            PreprocessedImage with the bytes to classify and size metadata
+        """
+        # Sizes are reported upright (as the client displays the image)
+        width, height = info.display_size
+        metadata = {
+            "original_bytes": len(data),
+            "original_width": width,
+            "original_height": height,
+            "bytes": len(data),
+            "width": width,
+            "height": height,
+            "resized": False,
+        }
+
+        fits_edge = max(width, height) <= self.max_edge
+        upright = info.orientation == 1
+        if not self.enabled or (fits_edge and upright and len(data) <= self.max_bytes):
+            return PreprocessedImage(data=data, mime_type=info.mime_type, metadata=metadata)
+
+        # Imported lazily: Pillow is only needed once an image has to be shrunk
+        from PIL import Image, ImageOps
+
+        with Image.open(BytesIO(data)) as image:
+            if image.format == "JPEG":
+                # Let libjpeg decode at 1/2, 1/4 or 1/8 scale when the target
+                # size allows it, instead of decoding every pixel.
+                image.draft("RGB", (self.max_edge, self.max_edge))
+            image = self._to_rgb(image)
+            # The re-encoded JPEG carries no EXIF, so rotate/mirror the pixels
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((self.max_edge, self.max_edge), Image.LANCZOS)
+            encoded = self._encode_jpeg(image)
+            width, height = image.size
+
+        if len(encoded) >= len(data) and fits_edge and upright:
+            # Re-encoding did not help; keep the original bytes
+            return PreprocessedImage(data=data, mime_type=info.mime_type, metadata=metadata)
+
+        metadata.update(
+            {"bytes": len(encoded), "width": width, "height": height, "resized": True}
+        )
+        return PreprocessedImage(data=encoded, mime_type="image/jpeg", metadata=metadata)
+
+    @staticmethod
+    def _to_rgb(image):
+        """Flatten alpha onto white and convert to RGB for JPEG encoding."""
+        if image.mode in ("RGB", "L"):
+            return image
+        if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            from PIL import Image
+
+            rgba = image.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            return background
+        return image.convert("RGB")
+
+    def _encode_jpeg(self, image) -> bytes:
+        """Encode as JPEG, lowering quality until the byte budget is met."""
+        quality = self.jpeg_quality
+        while True:
+            buffer = BytesIO()
+            image.save(buffer, format="JPEG", quality=quality, optimize=True)
+            encoded = buffer.getvalue()
+            if len(encoded) <= self.max_bytes or quality <= self.MIN_JPEG_QUALITY:
+                return encoded
+            quality = max(self.MIN_JPEG_QUALITY, quality - self.QUALITY_STEP)
+
+
+# Global instance
+image_preprocessor = ImagePreprocessor.from_env()
+
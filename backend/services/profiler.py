@@ -0,0 +1,479 @@
+"""
+Sampling Profiler
+Related Jira Ticket: RSCI-10
+
+This module finds where CPU time goes in a running server without
+redeploying it. ``SamplingProfiler`` runs a background thread that reads the
+Python stack of every other thread (``sys._current_frames``) a few hundred
+times per second, and counts identical stacks. The result is written in the
+collapsed-stack format (``frame;frame;frame count`` per line) read by
+flamegraph.pl, speedscope and similar tools.
+
+Nothing runs until a profile is requested, and sampling costs a fraction of
+a millisecond per sample, so it is safe to use on a loaded production
+worker. Samples of threads waiting idle (the event loop in ``select``,
+threadpool workers waiting for work) are counted but left out of the stacks.
+
+``ProfilingService`` (enabled by setting PROFILER_TOKEN) profiles:
+
+- this worker for N seconds,
+- all workers started by the same supervisor (see server.py). Siblings are
+  asked with SIGUSR2 and write their profiles to PROFILER_DIR, where they
+  are merged,
+- single requests that carry an ``X-Profile`` header (see
+  ``ProfilerMiddleware``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import json
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Leaf frames of threads that are waiting rather than running Python code
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("runners.py", "run"),
+}
+
+
+def _frame_label(code) -> str:
+    """``function (package/module.py:line)``, by the line the function starts on."""
+    path = code.co_filename.replace("\\", "/")
+    return f"{code.co_name} ({'/'.join(path.rsplit('/', 2)[-2:])}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Background-thread stack sampler producing collapsed stacks.
+    """
+
+    # Sampler threads never sample each other
+    _sampler_threads: set = set()
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.started: Optional[float] = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.started is not None:
+            self.duration = time.perf_counter() - self.started
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def collapsed(self) -> str:
+        """Profile in collapsed-stack format, most frequent stacks first."""
+        return collapsed_text(self.stacks)
+
+    def summary(self) -> Dict:
+        return {
+            "samples": self.samples,
+            "idle_samples": self.idle_samples,
+            "stacks": len(self.stacks),
+            "duration_seconds": round(self.duration, 3),
+            "interval_ms": round(self.interval * 1000, 2),
+        }
+
+    def _run(self) -> None:
+        ident = threading.get_ident()
+        SamplingProfiler._sampler_threads.add(ident)
+        try:
+            while not self._stop.wait(self.interval):
+                self._sample()
+        finally:
+            SamplingProfiler._sampler_threads.discard(ident)
+
+    def _sample(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident in SamplingProfiler._sampler_threads:
+                continue
+            self.samples += 1
+            leaf = frame.f_code
+            if (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_LEAVES:
+                self.idle_samples += 1
+                continue
+            stack: List[str] = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.stacks[";".join(reversed(stack))] += 1
+
+
+def _is_hex(value: str) -> bool:
+    return bool(value) and all(character in "0123456789abcdef" for character in value)
+
+
+def collapsed_text(stacks: Counter) -> str:
+    """Collapsed-stack text for stack counts, most frequent first."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def parse_collapsed(text: str) -> Counter:
+    """Read a collapsed-stack profile back into stack counts."""
+    stacks: Counter = Counter()
+    for line in text.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if stack and count.isdigit():
+            stacks[stack] += int(count)
+    return stacks
+
+
+class ProfilingService:
+    """
+    On-demand profiling of this worker, its sibling workers and single
+    requests. Disabled unless PROFILER_TOKEN is set.
+    """
+
+    # Per-request profiles kept in PROFILER_DIR for retrieval
+    MAX_REQUEST_PROFILES = 32
+    # Extra time given to sibling workers to write their profiles
+    COLLECT_GRACE_SECONDS = 2.0
+    # A profile request file older than this is ignored by SIGUSR2
+    REQUEST_MAX_AGE_SECONDS = 5.0
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        directory: Optional[str] = None,
+        interval: float = 0.005,
+        max_seconds: float = 60.0,
+        signal_seconds: float = 10.0,
+    ):
+        self.token = token
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "traffic-sign-profiles")
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.signal_seconds = signal_seconds
+        # (id, profiler) of the request being profiled, one at a time
+        self._request_profile: Optional[Tuple[str, SamplingProfiler]] = None
+        self._request_lock = threading.Lock()
+        self._registered = False
+
+    @classmethod
+    def from_env(cls) -> "ProfilingService":
+        """Build the service from PROFILER_* environment variables."""
+        return cls(
+            token=os.getenv("PROFILER_TOKEN") or None,
+            directory=os.getenv("PROFILER_DIR") or None,
+            interval=float(os.getenv("PROFILER_INTERVAL_MS", "5")) / 1000,
+            max_seconds=float(os.getenv("PROFILER_MAX_SECONDS", "60")),
+            signal_seconds=float(os.getenv("PROFILER_SIGNAL_SECONDS", "10")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token)
+
+    def authorised(self, token: Optional[str]) -> bool:
+        if not self.enabled or token is None:
+            return False
+        return hmac.compare_digest(token.encode("utf-8"), self.token.encode("utf-8"))
+
+    # Worker registration and signals
+
+    def install(self) -> None:
+        """
+        Register this worker for all-worker profiles and handle SIGUSR2
+        (application startup, main thread).
+        """
+        if not self.enabled or not hasattr(signal, "SIGUSR2"):
+            return
+        if threading.current_thread() is not threading.main_thread():
+            # Signal handlers can only be set from the main thread; without
+            # one a SIGUSR2 would terminate the worker, so stay unregistered
+            return
+        signal.signal(signal.SIGUSR2, self._handle_signal)
+        os.makedirs(self._workers_dir, exist_ok=True)
+        with open(os.path.join(self._workers_dir, str(os.getpid())), "w", encoding="utf-8") as f:
+            f.write(str(os.getppid()))
+        self._registered = True
+
+    def uninstall(self) -> None:
+        if not self._registered:
+            return
+        self._registered = False
+        try:
+            os.remove(os.path.join(self._workers_dir, str(os.getpid())))
+        except OSError:
+            pass
+
+    def sibling_pids(self) -> List[int]:
+        """Registered workers of the same supervisor, other than this one."""
+        try:
+            entries = os.listdir(self._workers_dir)
+        except OSError:
+            return []
+        siblings = []
+        for entry in entries:
+            if not entry.isdigit() or int(entry) == os.getpid():
+                continue
+            path = os.path.join(self._workers_dir, entry)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    parent = int(f.read().strip() or 0)
+            except (OSError, ValueError):
+                continue
+            if parent != os.getppid():
+                continue
+            try:
+                os.kill(int(entry), 0)
+            except ProcessLookupError:
+                # The worker exited without unregistering
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            except PermissionError:
+                continue
+            siblings.append(int(entry))
+        return siblings
+
+    def _handle_signal(self, signum, frame) -> None:
+        """Profile this worker in the background and write the result to a file."""
+        run_id, seconds = f"signal-{int(time.time())}", self.signal_seconds
+        try:
+            with open(self._request_path, encoding="utf-8") as f:
+                request = json.load(f)
+            if time.time() - request["created"] <= self.REQUEST_MAX_AGE_SECONDS:
+                run_id, seconds = request["run_id"], float(request["seconds"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+        profiler = SamplingProfiler(self.interval).start()
+
+        def finish():
+            profiler.stop()
+            self._write_profile(run_id, profiler)
+
+        timer = threading.Timer(seconds, finish)
+        timer.daemon = True
+        timer.start()
+
+    # Profiles
+
+    async def profile_worker(self, seconds: float) -> SamplingProfiler:
+        """Sample this worker for ``seconds`` without blocking the event loop."""
+        profiler = SamplingProfiler(self.interval).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+        return profiler
+
+    async def profile_all_workers(self, seconds: float) -> Optional[Dict]:
+        """
+        Sample every registered worker for ``seconds`` and merge the stacks.
+        Returns {"stacks", "workers", "missing"}, or None while another
+        all-worker profile is running on any worker (they share the request
+        file read by siblings).
+        """
+        if not self._claim_all_workers():
+            return None
+        try:
+            return await self._profile_all_workers(seconds)
+        finally:
+            try:
+                os.remove(self._all_workers_lock_path)
+            except OSError:
+                pass
+
+    async def _profile_all_workers(self, seconds: float) -> Dict:
+        run_id = uuid.uuid4().hex
+        siblings = self.sibling_pids()
+        if siblings:
+            os.makedirs(self.directory, exist_ok=True)
+            temporary = f"{self._request_path}.{os.getpid()}"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump({"run_id": run_id, "seconds": seconds, "created": time.time()}, f)
+            os.replace(temporary, self._request_path)
+            for pid in siblings:
+                try:
+                    os.kill(pid, signal.SIGUSR2)
+                except OSError:
+                    pass
+
+        own = await self.profile_worker(seconds)
+        stacks = Counter(own.stacks)
+        run_dir = os.path.join(self.directory, "runs", run_id)
+        pending = set(siblings)
+        deadline = time.monotonic() + self.COLLECT_GRACE_SECONDS
+        while pending and time.monotonic() < deadline:
+            for pid in list(pending):
+                path = os.path.join(run_dir, f"{pid}.folded")
+                if not os.path.exists(path):
+                    continue
+                with open(path, encoding="utf-8") as f:
+                    stacks.update(parse_collapsed(f.read()))
+                os.remove(path)
+                pending.discard(pid)
+            if pending:
+                await asyncio.sleep(0.1)
+        try:
+            os.rmdir(run_dir)
+        except OSError:
+            pass
+
+        return {"stacks": stacks, "workers": 1 + len(siblings) - len(pending), "missing": sorted(pending)}
+
+    def _claim_all_workers(self) -> bool:
+        """
+        Create the all-worker profile lock file, unless another worker holds
+        it. A lock left by a crashed worker expires after the longest run.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        for _ in range(2):
+            try:
+                os.close(os.open(self._all_workers_lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    age = time.time() - os.path.getmtime(self._all_workers_lock_path)
+                    if age < self.max_seconds + self.COLLECT_GRACE_SECONDS:
+                        return False
+                    os.remove(self._all_workers_lock_path)
+                except OSError:
+                    pass
+        return False
+
+    def start_request_profile(self) -> Optional[str]:
+        """Start profiling one request; None while another request is profiled."""
+        with self._request_lock:
+            if self._request_profile is not None:
+                return None
+            profile_id = uuid.uuid4().hex
+            self._request_profile = (profile_id, SamplingProfiler(self.interval).start())
+        return profile_id
+
+    def finish_request_profile(self, profile_id: str) -> None:
+        """
+        Stop a request profile and write it to PROFILER_DIR, so any worker
+        can return it. Only the newest MAX_REQUEST_PROFILES are kept.
+        """
+        with self._request_lock:
+            current, self._request_profile = self._request_profile, None
+        if current is None or current[0] != profile_id:
+            return
+        self._write_profile("requests", current[1].stop(), name=profile_id)
+
+        request_dir = os.path.join(self.directory, "runs", "requests")
+        try:
+            paths = [os.path.join(request_dir, entry) for entry in os.listdir(request_dir)]
+            paths.sort(key=os.path.getmtime)
+            for path in paths[: max(0, len(paths) - self.MAX_REQUEST_PROFILES)]:
+                os.remove(path)
+        except OSError:
+            pass
+
+    def request_profile(self, profile_id: str) -> Optional[str]:
+        """Collapsed stacks of a finished request profile, or None."""
+        if not _is_hex(profile_id):
+            return None
+        path = os.path.join(self.directory, "runs", "requests", f"{profile_id}.folded")
+        try:
+            with open(path, encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @property
+    def _workers_dir(self) -> str:
+        return os.path.join(self.directory, "workers")
+
+    @property
+    def _request_path(self) -> str:
+        return os.path.join(self.directory, "request.json")
+
+    @property
+    def _all_workers_lock_path(self) -> str:
+        return os.path.join(self.directory, "all-workers.lock")
+
+    def _write_profile(self, run_id: str, profiler: SamplingProfiler, name: Optional[str] = None) -> None:
+        run_dir = os.path.join(self.directory, "runs", run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        path = os.path.join(run_dir, f"{name or os.getpid()}.folded")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            f.write(profiler.collapsed())
+        # Renamed into place so collectors never read a partial file
+        os.replace(f"{path}.tmp", path)
+
+
+class ProfilerMiddleware:
+    """
+    ASGI middleware profiling single requests that send ``X-Profile: 1``
+    together with a valid ``X-Profiler-Token``. The response carries an
+    ``X-Profile-Id`` header; the profile is then available from
+    ``/debug/profile/{id}``.
+
+    The sampler sees every thread of the worker, so concurrent requests show
+    up in the profile too; profile on a quiet worker for a clean picture.
+    """
+
+    def __init__(self, app, service: Optional[ProfilingService] = None):
+        self.app = app
+        self.service = service
+
+    async def __call__(self, scope, receive, send):
+        service = self.service or profiling_service
+        if scope["type"] != "http" or not service.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or ())
+        if headers.get(b"x-profile", b"").lower() not in (b"1", b"true", b"yes"):
+            await self.app(scope, receive, send)
+            return
+        token = headers.get(b"x-profiler-token", b"").decode("latin-1")
+        profile_id = service.start_request_profile() if service.authorised(token) else None
+        if profile_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode("ascii"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            service.finish_request_profile(profile_id)
+
+
+# Global instance
+profiling_service = ProfilingService.from_env()
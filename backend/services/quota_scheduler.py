@@ -0,0 +1,325 @@
+"""
+Quota Scheduler
+Related Jira Ticket: RSCI-10
+
+This module keeps Gemini traffic within the upstream rate limits. Each
+(API key, model) pair is a lane with token buckets for requests per minute
+and tokens per minute. Work is admitted on the lane with the most headroom;
+when every lane is exhausted, callers wait for capacity up to a short
+deadline and are then shed with QuotaExceededError (answered as 429) instead
+of sending requests that the upstream would reject.
+
+Token usage is estimated before a call and corrected afterwards from the
+response's ``usageMetadata``; the reservation of a call that reports no
+usage (it failed, timed out or was cancelled) is refunded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+class QuotaExceededError(Exception):
+    """Raised when no key/model lane has quota left within the wait deadline."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Bucket holding up to ``per_minute`` tokens, refilled continuously.
+    A non-positive ``per_minute`` means unlimited.
+    """
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.unlimited = per_minute <= 0
+        self._rate = self.capacity / 60.0
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def available(self) -> float:
+        if self.unlimited:
+            return math.inf
+        self._refill()
+        return self._tokens
+
+    def headroom(self) -> float:
+        """Fraction of the bucket currently available (1.0 when unlimited)."""
+        if self.unlimited:
+            return 1.0
+        return max(0.0, self.available()) / self.capacity
+
+    def seconds_until(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 if they already are)."""
+        if self.unlimited:
+            return 0.0
+        missing = min(amount, self.capacity) - self.available()
+        return max(0.0, missing / self._rate)
+
+    def take(self, amount: float) -> None:
+        """Remove ``amount`` tokens; the balance may go negative (debt)."""
+        if not self.unlimited:
+            self._refill()
+            self._tokens -= amount
+
+    def give(self, amount: float) -> None:
+        """Return tokens (e.g. when a reservation was larger than the real usage)."""
+        if not self.unlimited:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def drain(self) -> None:
+        """Empty the bucket (the upstream reported the limit as reached)."""
+        if not self.unlimited:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+
+class QuotaLane:
+    """
+    Quota state of one (API key, model) pair.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        tokens_per_image: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.requests = TokenBucket(requests_per_minute, clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock)
+        self.tokens_per_image = tokens_per_image
+        self._clock = clock
+        self.blocked_until = 0.0
+        self.admitted = 0
+        self.tokens_used = 0
+        self.rate_limited = 0
+
+    @property
+    def name(self) -> str:
+        # Never expose the full key in stats or logs
+        return f"...{self.api_key[-4:]}:{self.model}"
+
+    def estimate(self, images: int) -> float:
+        return self.tokens_per_image * max(1, images)
+
+    def seconds_until_ready(self, tokens: float) -> float:
+        blocked = max(0.0, self.blocked_until - self._clock())
+        return max(blocked, self.requests.seconds_until(1), self.tokens.seconds_until(tokens))
+
+    def headroom(self) -> float:
+        return min(self.requests.headroom(), self.tokens.headroom())
+
+    def stats(self) -> Dict:
+        return {
+            "lane": self.name,
+            "requests_available": _rounded(self.requests.available()),
+            "tokens_available": _rounded(self.tokens.available()),
+            "admitted": self.admitted,
+            "tokens_used": self.tokens_used,
+            "rate_limited": self.rate_limited,
+            "tokens_per_image_estimate": round(self.tokens_per_image, 1),
+        }
+
+
+class QuotaLease:
+    """
+    Admission of one upstream request on a lane. Report the outcome with
+    ``complete`` (actual token usage) or ``rate_limited`` (upstream 429),
+    and always ``release`` it once the call is over.
+    """
+
+    def __init__(self, scheduler: "QuotaScheduler", lane: QuotaLane, images: int, reserved: float):
+        self._scheduler = scheduler
+        self.lane = lane
+        self.images = images
+        self.reserved = reserved
+        self.settled = False
+
+    @property
+    def api_key(self) -> str:
+        return self.lane.api_key
+
+    @property
+    def model(self) -> str:
+        return self.lane.model
+
+    def complete(self, usage: Optional[Dict]) -> None:
+        """Correct the token reservation with the response's usageMetadata."""
+        self.settled = True
+        total = (usage or {}).get("totalTokenCount")
+        if total is None:
+            # Keep the estimate; the call did use tokens
+            return
+        self._scheduler._settle(self, float(total))
+
+    def release(self) -> None:
+        """Refund the token reservation unless ``complete`` settled it."""
+        if not self.settled:
+            self.settled = True
+            self._scheduler._refund(self)
+
+    def rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """Mark the lane as exhausted after the upstream answered 429."""
+        self._scheduler._block(self.lane, retry_after)
+
+
+class QuotaScheduler:
+    """
+    Admission control across a pool of (API key, model) lanes.
+    """
+
+    # Weight of the newest observation in the tokens-per-image estimate
+    ESTIMATE_SMOOTHING = 0.2
+
+    def __init__(
+        self,
+        lanes: Sequence[QuotaLane],
+        max_wait_seconds: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], object] = asyncio.sleep,
+    ):
+        if not lanes:
+            raise ValueError("QuotaScheduler needs at least one lane")
+        self.lanes: List[QuotaLane] = list(lanes)
+        self.max_wait_seconds = max_wait_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.waited = 0
+        self.shed = 0
+
+    @classmethod
+    def from_env(cls, api_key: str, model: str) -> "QuotaScheduler":
+        """
+        Build the lane pool from GEMINI_API_KEYS and GEMINI_MODELS (comma
+        separated; default to the given key and model). Limits apply per
+        lane: GEMINI_RPM and GEMINI_TPM (0 or unset means unlimited). Each
+        server worker process keeps its own lanes, so the limits are divided
+        by the worker count (WEB_CONCURRENCY, default 1).
+        """
+        keys = _split(os.getenv("GEMINI_API_KEYS")) or [api_key]
+        models = _split(os.getenv("GEMINI_MODELS")) or [model]
+        workers = max(1, int(os.getenv("WEB_CONCURRENCY") or 1))
+        rpm = float(os.getenv("GEMINI_RPM", "0")) / workers
+        tpm = float(os.getenv("GEMINI_TPM", "0")) / workers
+        tokens_per_image = float(os.getenv("GEMINI_TOKENS_PER_IMAGE", "500"))
+        lanes = [
+            QuotaLane(key, lane_model, rpm, tpm, tokens_per_image)
+            for key in keys
+            for lane_model in models
+        ]
+        return cls(lanes, max_wait_seconds=float(os.getenv("GEMINI_QUOTA_MAX_WAIT_SECONDS", "2")))
+
+    async def acquire(self, images: int = 1, model: Optional[str] = None) -> QuotaLease:
+        """
+        Admit one request for ``images`` images on the lane with the most
+        headroom, waiting up to ``max_wait_seconds`` for capacity. With
+        ``model``, only that model's lanes are used (all lanes if the pool
+        has none for it).
+
+        Raises:
+            QuotaExceededError: If no lane has capacity within the deadline
+        """
+        deadline = self._clock() + self.max_wait_seconds
+        waited = False
+        while True:
+            with self._lock:
+                lease, wait = self._try_admit(images, model)
+            if lease is not None:
+                if waited:
+                    self.waited += 1
+                return lease
+
+            now = self._clock()
+            if now + wait > deadline:
+                self.shed += 1
+                raise QuotaExceededError(
+                    f"Gemini quota exhausted on all {len(self.lanes)} key/model lanes",
+                    retry_after=wait,
+                )
+            waited = True
+            await self._sleep(wait)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "admitted": self.admitted,
+                "waited": self.waited,
+                "shed": self.shed,
+                "lanes": [lane.stats() for lane in self.lanes],
+            }
+
+    def _try_admit(self, images: int, model: Optional[str] = None):
+        best: Optional[QuotaLane] = None
+        shortest_wait = math.inf
+        lanes = [lane for lane in self.lanes if lane.model == model] if model else []
+        for lane in lanes or self.lanes:
+            wait = lane.seconds_until_ready(lane.estimate(images))
+            if wait <= 0:
+                if best is None or lane.headroom() > best.headroom():
+                    best = lane
+            else:
+                shortest_wait = min(shortest_wait, wait)
+
+        if best is None:
+            return None, shortest_wait
+
+        reserved = best.estimate(images)
+        best.requests.take(1)
+        best.tokens.take(reserved)
+        best.admitted += 1
+        self.admitted += 1
+        return QuotaLease(self, best, images, reserved), 0.0
+
+    def _settle(self, lease: QuotaLease, used: float) -> None:
+        lane = lease.lane
+        with self._lock:
+            if used > lease.reserved:
+                lane.tokens.take(used - lease.reserved)
+            else:
+                lane.tokens.give(lease.reserved - used)
+            lane.tokens_used += int(used)
+            per_image = used / max(1, lease.images)
+            lane.tokens_per_image += self.ESTIMATE_SMOOTHING * (per_image - lane.tokens_per_image)
+
+    def _refund(self, lease: QuotaLease) -> None:
+        with self._lock:
+            lease.lane.tokens.give(lease.reserved)
+
+    def _block(self, lane: QuotaLane, retry_after: Optional[float]) -> None:
+        with self._lock:
+            lane.rate_limited += 1
+            # The upstream counts differently from us; start the lane's
+            # minute over, and honour an explicit Retry-After
+            lane.requests.drain()
+            if retry_after is not None:
+                lane.blocked_until = max(lane.blocked_until, self._clock() + retry_after)
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def _rounded(value: float):
+    return None if value == math.inf else round(value, 1)
@@ -0,0 +1,145 @@
+"""
+Streaming Request Body
+Related Jira Ticket: RSCI-10
+
+This module serialises upstream JSON request bodies as a stream of chunks
+instead of one string. Image bytes are wrapped in ``InlineData`` and
+base64-encoded incrementally from a ``memoryview`` while the body is sent,
+so a request never holds the base64 text, a decoded ``str`` copy and a
+serialised JSON copy of the image at the same time; peak memory stays close
+to the size of the image itself.
+
+The body length is computed up front (base64 output size is known from the
+input size), so requests carry an exact Content-Length rather than chunked
+transfer encoding. A ``JsonStreamBody`` can be iterated more than once, which
+lets retries resend it. The time spent base64-encoding is accumulated in
+``encode_seconds``, as it happens during the upload rather than up front.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import time
+from typing import Any, AsyncIterator, Iterator, List, Union
+
+# Raw bytes encoded per chunk; a multiple of 3 so chunks concatenate into
+# valid base64 without padding in the middle
+CHUNK_SIZE = 48 * 1024
+
+_separators = (",", ":")
+
+
+class InlineData:
+    """
+    Image bytes for a Gemini ``inlineData`` part, serialised as
+    ``{"mimeType": ..., "data": <base64>}`` without materialising the base64.
+    """
+
+    __slots__ = ("data", "mime_type")
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview], mime_type: str):
+        self.data = memoryview(data).cast("B")
+        self.mime_type = mime_type
+
+    @property
+    def encoded_length(self) -> int:
+        return 4 * ((len(self.data) + 2) // 3)
+
+    def prefix(self) -> bytes:
+        return b'{"mimeType":' + _dumps(self.mime_type) + b',"data":"'
+
+    def chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        for start in range(0, len(self.data), chunk_size):
+            yield base64.b64encode(self.data[start:start + chunk_size])
+
+    def to_json(self) -> dict:
+        """Plain dict form (materialises the base64; for tests and debugging)."""
+        return {"mimeType": self.mime_type, "data": base64.b64encode(self.data).decode("ascii")}
+
+
+class JsonStreamBody:
+    """
+    JSON request body that may contain ``InlineData`` values, produced as a
+    sequence of byte chunks. Usable as ``httpx.AsyncClient`` request
+    ``content`` (it is deliberately only async-iterable: httpx treats sync
+    iterables as bodies for the sync client).
+    """
+
+    def __init__(self, payload: Any, chunk_size: int = CHUNK_SIZE):
+        if chunk_size <= 0 or chunk_size % 3:
+            raise ValueError("chunk_size must be a positive multiple of 3")
+        self.chunk_size = chunk_size
+        # Base64 encoding time over every iteration of the body
+        self.encode_seconds = 0.0
+        # Flatten the envelope once: small JSON fragments and InlineData
+        # placeholders, in order
+        self._segments: List[Union[bytes, InlineData]] = []
+        self._flatten(payload)
+        self._length = sum(
+            len(segment.prefix()) + segment.encoded_length + 2
+            if isinstance(segment, InlineData)
+            else len(segment)
+            for segment in self._segments
+        )
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def headers(self) -> dict:
+        return {"Content-Type": "application/json", "Content-Length": str(self._length)}
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        for segment in self._segments:
+            if isinstance(segment, InlineData):
+                yield segment.prefix()
+                chunks = segment.chunks(self.chunk_size)
+                while True:
+                    started = time.perf_counter()
+                    chunk = next(chunks, None)
+                    self.encode_seconds += time.perf_counter() - started
+                    if chunk is None:
+                        break
+                    yield chunk
+                yield b'"}'
+            else:
+                yield segment
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self.iter_chunks():
+            yield chunk
+
+    def to_bytes(self) -> bytes:
+        """Join the whole body (for tests and debugging)."""
+        return b"".join(self.iter_chunks())
+
+    def _flatten(self, value: Any) -> None:
+        if isinstance(value, InlineData):
+            self._segments.append(value)
+        elif isinstance(value, dict):
+            self._append(b"{")
+            for index, (key, item) in enumerate(value.items()):
+                self._append((b"," if index else b"") + _dumps(str(key)) + b":")
+                self._flatten(item)
+            self._append(b"}")
+        elif isinstance(value, (list, tuple)):
+            self._append(b"[")
+            for index, item in enumerate(value):
+                if index:
+                    self._append(b",")
+                self._flatten(item)
+            self._append(b"]")
+        else:
+            self._append(_dumps(value))
+
+    def _append(self, fragment: bytes) -> None:
+        # Merge adjacent fragments so iteration yields few, larger chunks
+        if self._segments and isinstance(self._segments[-1], bytes):
+            self._segments[-1] += fragment
+        else:
+            self._segments.append(fragment)
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=_separators).encode("utf-8")
@@ -0,0 +1,303 @@
+"""
+Resilience Helpers
+Related Jira Ticket: RSCI-10
+
+This module protects the API from a slow or failing upstream model:
+
+- CircuitBreaker: stops calling the upstream after too many failed or slow
+  calls, so degraded mode answers immediately, then probes for recovery.
+- RetryBudget: allows retries on transient errors only while they stay a
+  small fraction of overall traffic, so retries cannot amplify an outage.
+- LatencyTracker / AdaptiveTimeout: derive the request timeout from the
+  observed latency distribution instead of a fixed constant.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+
+class LatencyTracker:
+    """
+    Sliding window of recent call latencies (seconds).
+    """
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    @property
+    def count(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """
+        Return the given percentile (0-100) of recent latencies, or None
+        when nothing has been recorded yet.
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = max(0, math.ceil(percentile / 100 * len(samples)) - 1)
+        return samples[rank]
+
+
+class AdaptiveTimeout:
+    """
+    Request timeout derived from observed p99 latency.
+
+    Until ``min_samples`` latencies have been observed the maximum timeout is
+    used; afterwards the timeout is ``p99 * multiplier`` clamped to
+    ``[min_seconds, max_seconds]``.
+    """
+
+    def __init__(
+        self,
+        tracker: LatencyTracker,
+        min_seconds: float = 5.0,
+        max_seconds: float = 45.0,
+        multiplier: float = 2.0,
+        percentile: float = 99.0,
+        min_samples: int = 20,
+    ):
+        self.tracker = tracker
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.multiplier = multiplier
+        self.percentile = percentile
+        self.min_samples = min_samples
+
+    @property
+    def seconds(self) -> float:
+        if self.tracker.count < self.min_samples:
+            return self.max_seconds
+        observed = self.tracker.percentile(self.percentile) or self.max_seconds
+        return min(self.max_seconds, max(self.min_seconds, observed * self.multiplier))
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of requests.
+
+    Every request deposits ``ratio`` tokens and every retry spends one, with
+    a small per-second allowance so low-traffic periods can still retry.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_per_second: float = 0.5,
+        max_tokens: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._clock = clock
+        self._tokens = max_tokens
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.exhausted = 0
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """Spend one retry token; returns False when the budget is exhausted."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self.retries += 1
+                return True
+            self.exhausted += 1
+            return False
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._refill()
+            return {
+                "tokens": round(self._tokens, 2),
+                "retries": self.retries,
+                "exhausted": self.exhausted,
+            }
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.max_tokens, self._tokens + elapsed * self.min_per_second)
+
+
+def backoff_delay(attempt: int, base: float = 0.25, cap: float = 4.0) -> float:
+    """
+    Full-jitter exponential backoff delay for retry ``attempt`` (0-based).
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker with closed, open and half-open states.
+
+    While closed, the outcome of the last ``window_size`` calls is tracked.
+    Once at least ``min_calls`` have been seen, the breaker opens if the
+    failure rate or the slow-call rate (calls slower than
+    ``slow_call_seconds``) reaches its threshold. After ``open_seconds`` it
+    becomes half-open and lets ``half_open_max_calls`` probes through: a
+    successful probe closes it, a failed one opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate_threshold: float = 0.8,
+        window_size: int = 20,
+        min_calls: int = 10,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+        self.times_opened = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreaker":
+        """Build a breaker configured from CIRCUIT_BREAKER_* environment variables."""
+        return cls(
+            failure_rate_threshold=float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5")),
+            slow_call_seconds=float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_SECONDS", "10")),
+            slow_call_rate_threshold=float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_RATE", "0.8")),
+            window_size=int(os.getenv("CIRCUIT_BREAKER_WINDOW", "20")),
+            min_calls=int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "10")),
+            open_seconds=float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "30")),
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow_request(self) -> bool:
+        """
+        Return True if a call may proceed. In half-open state only a limited
+        number of probe calls are allowed.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                self._probe_started = self._clock()
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, seconds: float) -> None:
+        self._record(failed=False, seconds=seconds)
+
+    def record_failure(self, seconds: float) -> None:
+        self._record(failed=True, seconds=seconds)
+
+    def snapshot(self) -> Dict:
+        """Current state and counters, for health and stats endpoints."""
+        with self._lock:
+            state = self._current_state()
+            calls = len(self._outcomes)
+            failures = sum(1 for failed, _ in self._outcomes if failed)
+            slow = sum(1 for _, is_slow in self._outcomes if is_slow)
+            snapshot = {
+                "state": state,
+                "window_calls": calls,
+                "failure_rate": round(failures / calls, 3) if calls else 0.0,
+                "slow_call_rate": round(slow / calls, 3) if calls else 0.0,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+            if state == self.OPEN:
+                remaining = self._opened_at + self.open_seconds - self._clock()
+                snapshot["retry_in_seconds"] = round(max(0.0, remaining), 1)
+            return snapshot
+
+    def _current_state(self) -> str:
+        now = self._clock()
+        if self._state == self.OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+        elif (
+            self._state == self.HALF_OPEN
+            and self._half_open_calls >= self.half_open_max_calls
+            and now - self._probe_started >= self.open_seconds
+        ):
+            # The probe never reported back (e.g. it was cancelled); allow another
+            self._half_open_calls = 0
+        return self._state
+
+    def _record(self, failed: bool, seconds: float) -> None:
+        slow = seconds >= self.slow_call_seconds
+        with self._lock:
+            state = self._current_state()
+            if state == self.HALF_OPEN:
+                if failed or slow:
+                    self._open()
+                else:
+                    self._state = self.CLOSED
+                    self._outcomes.clear()
+                return
+            if state == self.OPEN:
+                return
+
+            self._outcomes.append((failed, slow))
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failure_rate = sum(1 for outcome, _ in self._outcomes if outcome) / calls
+            slow_rate = sum(1 for _, is_slow in self._outcomes if is_slow) / calls
+            if (
+                failure_rate >= self.failure_rate_threshold
+                or slow_rate >= self.slow_call_rate_threshold
+            ):
+                self._open()
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self.times_opened += 1
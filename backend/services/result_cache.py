@@ -0,0 +1,142 @@
+"""
+Result Cache
+Related Jira Ticket: RSCI-10
+
+This module provides a content-addressed cache for classification results.
+Entries are keyed by a hash of the image bytes together with the backend and
+model that produced the result, and are evicted least-recently-used first
+when the entry or byte budget is exceeded, or once their TTL expires.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+
+class ResultCache:
+    """
+    LRU/TTL cache of classification results.
+
+    Results are stored as serialised JSON so that every lookup hands out an
+    independent copy and the byte budget reflects the real entry size.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 16 * 1024 * 1024,
+        ttl_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    @staticmethod
+    def make_key(image_data: bytes, backend: str, model: str) -> str:
+        """
+        Build a cache key from the image content and the producing backend.
+
+        Args:
+            image_data: Image file bytes
+            backend: Backend name (e.g. "gemini")
+            model: Model name used by the backend
+
+        Returns:
+            str: Cache key
+        """
+        digest = hashlib.sha256(image_data).hexdigest()
+        return f"{backend}:{model}:{digest}"
+
+    def get(self, key: str, count_miss: bool = True) -> Optional[Dict]:
+        """
+        Return a copy of the cached result for ``key``, or None on a miss.
+        Pass ``count_miss=False`` for a lookup that is followed by another
+        one for the same request, so the request counts a single miss.
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += count_miss
+                return None
+
+            expires_at, payload = entry
+            if self._clock() >= expires_at:
+                self._remove(key)
+                self.misses += count_miss
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return json.loads(payload)
+
+    def put(self, key: str, result: Dict) -> None:
+        """
+        Store ``result`` under ``key``, evicting old entries as needed.
+        Results larger than the whole byte budget are not cached.
+        """
+        if not self.enabled:
+            return
+
+        payload = json.dumps(result, separators=(",", ":"))
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (self._clock() + self.ttl_seconds, payload)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        """Return cache counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    def _remove(self, key: str) -> None:
+        _, payload = self._entries.pop(key)
+        self._bytes -= len(payload)
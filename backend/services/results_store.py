@@ -0,0 +1,398 @@
+"""
+Results Store
+Related Jira Tickets: RSCI-12, RSCI-14
+
+This module persists classification results in an embedded SQLite database
+(WAL mode). Writes are queued and committed in batches by a background
+thread, so recording a result never blocks a request. Lookups by image id
+and history pages use indexes, with keyset pagination for history.
+
+The store also keeps the state of queued classification jobs, so that a
+status poll answered by a different server worker than the one running the
+job still sees it.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS classifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    image_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    label TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    filename TEXT,
+    all_classes TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_classifications_image_id
+    ON classifications (image_id);
+CREATE INDEX IF NOT EXISTS idx_classifications_created_at
+    ON classifications (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_classifications_label
+    ON classifications (label, id);
+CREATE TABLE IF NOT EXISTS jobs (
+    image_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+INSERT_SQL = """
+INSERT OR REPLACE INTO classifications
+    (image_id, created_at, label, confidence, filename, all_classes)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# A job that already started never goes back to "queued"
+UPSERT_JOB_SQL = """
+INSERT INTO jobs (image_id, status, error, updated_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (image_id) DO UPDATE
+    SET status = excluded.status, error = excluded.error, updated_at = excluded.updated_at
+    WHERE excluded.status != 'queued'
+"""
+
+DELETE_JOB_SQL = "DELETE FROM jobs WHERE image_id = ?"
+
+SELECT_COLUMNS = "id, image_id, created_at, label, confidence, filename, all_classes"
+
+JOB_COMPLETED = "completed"
+
+
+@dataclass
+class JobState:
+    """Status of a queued classification job, as shared between workers."""
+
+    image_id: str
+    status: str
+    error: Optional[str] = None
+    updated_at: float = 0.0
+
+    def to_dict(self) -> Dict:
+        summary = {"image_id": self.image_id, "status": self.status}
+        if self.error is not None:
+            summary["error"] = self.error
+        return summary
+
+
+def default_db_path() -> str:
+    """
+    Location of the results database (RESULTS_DB_PATH, or a local default).
+    Serverless deployments only have a writable temp directory.
+    """
+    configured = os.getenv("RESULTS_DB_PATH")
+    if configured:
+        return configured
+    if os.getenv("VERCEL") or os.getenv("VERCEL_ENV"):
+        return os.path.join(tempfile.gettempdir(), "results.db")
+    return os.path.join(BACKEND_DIR, "data", "results.db")
+
+
+class ResultsStore:
+    """
+    SQLite-backed store of classification results.
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: str, batch_size: int = 256, flush_interval: float = 0.05):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue()
+        # Results queued but not yet committed, so reads see their own writes
+        self._pending: Dict[str, Dict] = {}
+        self._pending_jobs: Dict[str, JobState] = {}
+        self._pending_lock = threading.Lock()
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialised = False
+        self._writer: Optional[threading.Thread] = None
+        self.writes = 0
+        self.write_batches = 0
+
+    def record(self, image_id: str, result: Dict, filename: Optional[str] = None) -> Dict:
+        """
+        Queue a classification result for storage and return the stored entry.
+        """
+        entry = {
+            "image_id": image_id,
+            "created_at": time.time(),
+            "classification": result["classification"],
+            "confidence": result["confidence"],
+            "all_classes": result["all_classes"],
+            "filename": filename,
+        }
+        with self._pending_lock:
+            self._pending[image_id] = entry
+        self._ensure_writer()
+        self._queue.put(entry)
+        return entry
+
+    def get(self, image_id: str) -> Optional[Dict]:
+        """
+        Look up the result stored for ``image_id`` (unique index lookup).
+        """
+        with self._pending_lock:
+            pending = self._pending.get(image_id)
+        if pending is not None:
+            return dict(pending)
+
+        row = self._connection().execute(
+            f"SELECT {SELECT_COLUMNS} FROM classifications WHERE image_id = ?",
+            (image_id,),
+        ).fetchone()
+        return self._to_entry(row) if row else None
+
+    def save_job(self, image_id: str, status: str, error: Optional[str] = None) -> None:
+        """
+        Commit a job's state immediately on the calling thread, so it is
+        visible to other workers on return. Call it off the event loop.
+        """
+        state = JobState(image_id, status, error, time.time())
+        connection = self._connection()
+        with connection:
+            self._write_job(connection, state)
+
+    def record_job(self, image_id: str, status: str, error: Optional[str] = None) -> None:
+        """
+        Queue a job state change; it is committed in order with queued results.
+        Completed jobs are removed, as their result is stored instead.
+        """
+        state = JobState(image_id, status, error, time.time())
+        with self._pending_lock:
+            self._pending_jobs[image_id] = state
+        self._ensure_writer()
+        self._queue.put(state)
+
+    def get_job(self, image_id: str) -> Optional[JobState]:
+        """Look up the last recorded state of the job ``image_id``."""
+        with self._pending_lock:
+            pending = self._pending_jobs.get(image_id)
+        if pending is not None:
+            return pending
+
+        row = self._connection().execute(
+            "SELECT image_id, status, error, updated_at FROM jobs WHERE image_id = ?",
+            (image_id,),
+        ).fetchone()
+        return JobState(*row) if row else None
+
+    def history(
+        self,
+        limit: int = 20,
+        cursor: Optional[int] = None,
+        label: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Return one page of results, newest first, and the cursor of the next page.
+
+        Args:
+            limit: Maximum number of results
+            cursor: Cursor returned by the previous page (None for the first page)
+            label: Only return results with this top classification
+            since: Only return results created at or after this Unix time
+            until: Only return results created before this Unix time
+
+        Returns:
+            Tuple of (entries, next_cursor); next_cursor is None on the last page
+        """
+        clauses = []
+        params: List = []
+        if cursor is not None:
+            clauses.append("id < ?")
+            params.append(cursor)
+        if label is not None:
+            clauses.append("label = ?")
+            params.append(label)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connection().execute(
+            f"SELECT {SELECT_COLUMNS} FROM classifications {where} ORDER BY id DESC LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        return [self._to_entry(row) for row in rows[:limit]], next_cursor
+
+    def latest_id(self) -> int:
+        """
+        Row id of the newest committed result (0 when empty). Rows are only
+        ever added or replaced, and AUTOINCREMENT ids never decrease, so any
+        change to the stored history changes this value.
+        """
+        row = self._connection().execute("SELECT MAX(id) FROM classifications").fetchone()
+        return row[0] or 0
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until every queued result has been committed."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._pending_lock:
+                if not self._pending and not self._pending_jobs:
+                    return
+            time.sleep(0.005)
+
+    def close(self) -> None:
+        """Commit queued results and stop the writer thread."""
+        writer = self._writer
+        if writer is not None and writer.is_alive():
+            self._queue.put(self._STOP)
+            writer.join(timeout=10)
+        self._writer = None
+
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def stats(self) -> Dict:
+        """Return write counters."""
+        with self._pending_lock:
+            pending = len(self._pending) + len(self._pending_jobs)
+        return {"writes": self.writes, "write_batches": self.write_batches, "pending": pending}
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection (SQLite connections must not be shared across threads)."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self._initialise()
+            connection = sqlite3.connect(self.path)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _initialise(self) -> None:
+        with self._init_lock:
+            if self._initialised:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path)
+            try:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(SCHEMA)
+                connection.commit()
+            finally:
+                connection.close()
+            self._initialised = True
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._init_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="results-store-writer", daemon=True
+                )
+                self._writer.start()
+
+    def _write_loop(self) -> None:
+        connection = self._connection()
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = []
+            item = first
+            while True:
+                if item is self._STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write_batch(connection, batch)
+
+        connection.close()
+        self._local.connection = None
+
+    def _write_batch(self, connection: sqlite3.Connection, batch: List) -> None:
+        entries = [entry for entry in batch if not isinstance(entry, JobState)]
+        jobs = [entry for entry in batch if isinstance(entry, JobState)]
+        rows = [
+            (
+                entry["image_id"],
+                entry["created_at"],
+                entry["classification"],
+                entry["confidence"],
+                entry["filename"],
+                json.dumps(entry["all_classes"], separators=(",", ":")),
+            )
+            for entry in entries
+        ]
+        try:
+            with connection:
+                connection.executemany(INSERT_SQL, rows)
+                for state in jobs:
+                    self._write_job(connection, state)
+            self.writes += len(rows)
+            self.write_batches += 1
+        except sqlite3.Error as exc:
+            logger.error("Failed to store %d classification results: %s", len(rows), exc)
+        finally:
+            with self._pending_lock:
+                for entry in entries:
+                    if self._pending.get(entry["image_id"]) is entry:
+                        del self._pending[entry["image_id"]]
+                for state in jobs:
+                    if self._pending_jobs.get(state.image_id) is state:
+                        del self._pending_jobs[state.image_id]
+
+    @staticmethod
+    def _write_job(connection: sqlite3.Connection, state: JobState) -> None:
+        if state.status == JOB_COMPLETED:
+            connection.execute(DELETE_JOB_SQL, (state.image_id,))
+        else:
+            connection.execute(
+                UPSERT_JOB_SQL, (state.image_id, state.status, state.error, state.updated_at)
+            )
+
+    @staticmethod
+    def _to_entry(row: Tuple) -> Dict:
+        _, image_id, created_at, label, confidence, filename, all_classes = row
+        return {
+            "image_id": image_id,
+            "created_at": created_at,
+            "classification": label,
+            "confidence": confidence,
+            "all_classes": json.loads(all_classes),
+            "filename": filename,
+        }
+
+
+# Global instance
+results_store = ResultsStore(default_db_path())
@@ -0,0 +1,281 @@
+"""
+Sign Detection
+Related Jira Ticket: RSCI-10
+
+This module proposes candidate road-sign regions in street-scene images, so
+that each sign is classified on its own crop instead of sending the whole
+frame (mostly sky and road) as one image.
+
+Detection is a single vectorized NumPy pass over a downscaled copy of the
+image:
+
+1. The image is converted to HSV and thresholded into red, blue and yellow
+   masks (the colours road signs are printed in).
+2. Each mask is dilated by one pixel (to close thin sign rings) and split
+   into connected components, using runs of set pixels per row joined with a
+   union-find over overlapping runs.
+3. Components are kept when their shape looks like a sign: a minimum size,
+   a roughly square bounding box and a minimum fill ratio. Overlapping
+   candidates are suppressed, keeping the largest.
+
+The surviving regions are cropped from the full-resolution image with some
+padding, letterboxed to a square of ``crop_size`` pixels and JPEG-encoded.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Dict, List, Tuple
+
+# HSV ranges on Pillow's 0-255 scale: (hue ranges, min saturation, min value)
+SIGN_COLORS = {
+    "red": (((0, 10), (240, 255)), 110, 60),
+    "yellow": (((25, 45),), 120, 100),
+    "blue": (((140, 175),), 120, 50),
+}
+
+
+@dataclass
+class SignRegion:
+    """
+    A candidate sign: bounding box in original image pixels and its crop.
+    """
+
+    x: int
+    y: int
+    width: int
+    height: int
+    color: str
+    crop: bytes
+    mime_type: str = "image/jpeg"
+
+    @property
+    def bbox(self) -> Dict[str, int]:
+        return {"x": self.x, "y": self.y, "width": self.width, "height": self.height}
+
+
+class SignDetector:
+    """
+    Colour-segmentation sign region proposer.
+    """
+
+    # Shape filters, on the analysis-scale mask
+    MIN_SIDE_PIXELS = 8
+    MAX_AREA_FRACTION = 0.5
+    MAX_ASPECT_RATIO = 2.0
+    MIN_FILL_RATIO = 0.2
+    # Candidates overlapping a larger kept one by more than this are dropped
+    MAX_OVERLAP = 0.5
+    CROP_PADDING = 0.15
+
+    def __init__(self, analysis_edge: int = 320, crop_size: int = 224, max_regions: int = 8):
+        self.analysis_edge = analysis_edge
+        self.crop_size = crop_size
+        self.max_regions = max_regions
+
+    @classmethod
+    def from_env(cls) -> "SignDetector":
+        """Build a detector configured from SCENE_* environment variables."""
+        return cls(
+            analysis_edge=int(os.getenv("SCENE_ANALYSIS_EDGE", "320")),
+            crop_size=int(os.getenv("SCENE_CROP_SIZE", "224")),
+            max_regions=int(os.getenv("SCENE_MAX_REGIONS", "8")),
+        )
+
+    def detect(self, data: bytes, original_size: Tuple[int, int]) -> List[SignRegion]:
+        """
+        Propose sign regions in an image (blocking; run it in a thread).
+
+        Args:
+            data: Validated image file bytes
+            original_size: upright (width, height) of the image (see
+                ``ImageInfo.display_size``), used to report boxes in original pixels
+
+        Returns:
+            Regions ordered from largest to smallest (at most ``max_regions``)
+        """
+        from PIL import Image, ImageOps
+
+        with Image.open(BytesIO(data)) as source:
+            if source.format == "JPEG":
+                # Crops rarely need more than ~4x the analysis resolution
+                source.draft("RGB", (self.analysis_edge * 4, self.analysis_edge * 4))
+            # Boxes are reported in the frame the client displays
+            image = ImageOps.exif_transpose(source.convert("RGB"))
+
+        analysis = image.copy()
+        analysis.thumbnail((self.analysis_edge, self.analysis_edge), Image.BILINEAR)
+        boxes = self.propose(analysis)
+
+        # Analysis pixels -> decoded pixels -> original pixels
+        to_image = image.width / analysis.width
+        to_original = original_size[0] / image.width
+        regions = []
+        for color, (left, top, right, bottom) in boxes:
+            box = (left * to_image, top * to_image, right * to_image, bottom * to_image)
+            crop = self._crop(image, box)
+            regions.append(
+                SignRegion(
+                    x=int(box[0] * to_original),
+                    y=int(box[1] * to_original),
+                    width=max(1, int((box[2] - box[0]) * to_original)),
+                    height=max(1, int((box[3] - box[1]) * to_original)),
+                    color=color,
+                    crop=crop,
+                )
+            )
+        return regions
+
+    def propose(self, image) -> List[Tuple[str, Tuple[int, int, int, int]]]:
+        """
+        Candidate (colour, (left, top, right, bottom)) boxes in ``image``
+        pixels (right/bottom exclusive), largest first.
+        """
+        import numpy as np
+
+        hsv = np.asarray(image.convert("HSV"))
+        hue, saturation, value = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+        image_area = hsv.shape[0] * hsv.shape[1]
+
+        candidates = []
+        for color, (hue_ranges, min_saturation, min_value) in SIGN_COLORS.items():
+            hue_mask = np.zeros(hue.shape, dtype=bool)
+            for low, high in hue_ranges:
+                hue_mask |= (hue >= low) & (hue <= high)
+            mask = _dilate(hue_mask & (saturation >= min_saturation) & (value >= min_value))
+
+            for top, left, bottom, right, pixels in _components(mask):
+                width, height = right - left, bottom - top
+                area = width * height
+                if min(width, height) < self.MIN_SIDE_PIXELS:
+                    continue
+                if area > self.MAX_AREA_FRACTION * image_area:
+                    continue
+                if max(width, height) > self.MAX_ASPECT_RATIO * min(width, height):
+                    continue
+                if pixels < self.MIN_FILL_RATIO * area:
+                    continue
+                candidates.append((area, color, (left, top, right, bottom)))
+
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        kept: List[Tuple[str, Tuple[int, int, int, int]]] = []
+        for area, color, box in candidates:
+            if any(_overlap(box, other) > self.MAX_OVERLAP * area for _, other in kept):
+                continue
+            kept.append((color, box))
+            if len(kept) >= self.max_regions:
+                break
+        return kept
+
+    def _crop(self, image, box) -> bytes:
+        """Padded crop letterboxed onto a ``crop_size`` square, as JPEG."""
+        from PIL import Image
+
+        left, top, right, bottom = box
+        pad = self.CROP_PADDING * max(right - left, bottom - top)
+        region = image.crop(
+            (
+                max(0, int(left - pad)),
+                max(0, int(top - pad)),
+                min(image.width, int(right + pad + 1)),
+                min(image.height, int(bottom + pad + 1)),
+            )
+        )
+        region.thumbnail((self.crop_size, self.crop_size), Image.LANCZOS)
+        canvas = Image.new("RGB", (self.crop_size, self.crop_size), (128, 128, 128))
+        canvas.paste(
+            region,
+            ((self.crop_size - region.width) // 2, (self.crop_size - region.height) // 2),
+        )
+        buffer = BytesIO()
+        canvas.save(buffer, format="JPEG", quality=90)
+        return buffer.getvalue()
+
+
+def _dilate(mask):
+    """Grow a boolean mask by one pixel in each direction (8-neighbourhood)."""
+    import numpy as np
+
+    grown = mask.copy()
+    grown[1:, :] |= mask[:-1, :]
+    grown[:-1, :] |= mask[1:, :]
+    rows = grown.copy()
+    grown[:, 1:] |= rows[:, :-1]
+    grown[:, :-1] |= rows[:, 1:]
+    return grown
+
+
+def _components(mask) -> List[Tuple[int, int, int, int, int]]:
+    """
+    8-connected components of a boolean mask as
+    (top, left, bottom, right, pixel count), bottom/right exclusive.
+    """
+    import numpy as np
+
+    if not mask.any():
+        return []
+
+    # Runs of set pixels per row, found for the whole mask at once
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    run_rows, run_starts = np.nonzero(edges == 1)
+    _, run_ends = np.nonzero(edges == -1)
+
+    # Union runs that touch a run in the previous row (including diagonally)
+    parent = list(range(len(run_rows)))
+
+    def find(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    row_bounds = np.searchsorted(run_rows, np.arange(mask.shape[0] + 1))
+    for row in range(1, mask.shape[0]):
+        previous = range(row_bounds[row - 1], row_bounds[row])
+        current = range(row_bounds[row], row_bounds[row + 1])
+        if not previous or not current:
+            continue
+        other = previous.start
+        for index in current:
+            # Skip previous-row runs that end before this run starts
+            while other < previous.stop and run_ends[other] < run_starts[index]:
+                other += 1
+            probe = other
+            while probe < previous.stop and run_starts[probe] <= run_ends[index]:
+                root_a, root_b = find(index), find(probe)
+                if root_a != root_b:
+                    parent[root_b] = root_a
+                probe += 1
+
+    roots = np.array([find(index) for index in range(len(parent))])
+    labels, inverse = np.unique(roots, return_inverse=True)
+    count = len(labels)
+    top = np.full(count, mask.shape[0])
+    bottom = np.zeros(count, dtype=np.int64)
+    left = np.full(count, mask.shape[1])
+    right = np.zeros(count, dtype=np.int64)
+    pixels = np.zeros(count, dtype=np.int64)
+    np.minimum.at(top, inverse, run_rows)
+    np.maximum.at(bottom, inverse, run_rows + 1)
+    np.minimum.at(left, inverse, run_starts)
+    np.maximum.at(right, inverse, run_ends)
+    np.add.at(pixels, inverse, run_ends - run_starts)
+    return [
+        (int(top[i]), int(left[i]), int(bottom[i]), int(right[i]), int(pixels[i]))
+        for i in range(count)
+    ]
+
+
+def _overlap(first: Tuple[int, int, int, int], second: Tuple[int, int, int, int]) -> int:
+    """Intersection area of two (left, top, right, bottom) boxes."""
+    width = min(first[2], second[2]) - max(first[0], second[0])
+    height = min(first[3], second[3]) - max(first[1], second[1])
+    return max(0, width) * max(0, height)
+
+
+# Global instance
+sign_detector = SignDetector.from_env()
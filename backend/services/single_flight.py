@@ -0,0 +1,73 @@
+"""
+Single Flight
+Related Jira Ticket: RSCI-10
+
+This module deduplicates identical in-flight work. The first caller for a
+key starts the work; concurrent callers with the same key wait on the same
+task and receive the same result or the same error. Once the work finishes
+the key is released, so later calls start fresh (completed results are the
+result cache's job).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, work: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``work`` for ``key``, or join the execution already in flight.
+
+        The work runs in its own task, so a caller being cancelled does not
+        cancel the execution other callers are waiting on.
+        """
+        return await asyncio.shield(self.start(key, work))
+
+    def start(self, key: str, work: Callable[[], Awaitable[T]]) -> "asyncio.Future[T]":
+        """
+        Like ``do``, but return the execution's task without waiting for it,
+        so several keys can be registered before any of them runs.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(work())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._release(key, task))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        return task
+
+    def running(self, key: str) -> bool:
+        """Whether work for ``key`` is in flight."""
+        return key in self._inflight
+
+    def stats(self) -> Dict:
+        """Return execution and coalescing counters."""
+        calls = self.executions + self.coalesced
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / calls, 4) if calls else 0.0,
+            "in_flight": len(self._inflight),
+        }
+
+    def _release(self, key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every caller has gone away
+            task.exception()
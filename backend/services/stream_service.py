@@ -0,0 +1,188 @@
+"""
+Stream Service
+Related Jira Ticket: RSCI-10
+
+This module runs frame-stream classification sessions (the
+``/api/classification/stream`` WebSocket). Frames are received as fast as the
+client sends them, but only one is classified at a time and at most one waits
+behind it: a newer frame replaces the waiting one (``LatestFrameSlot``), so a
+slow backend drops stale frames instead of building a queue, and the result
+latency stays bounded by roughly two classification times.
+
+Results are smoothed over a sliding window of recent frames
+(``TemporalSmoother``) so the reported label does not flicker between
+frames of the same sign.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from services.metrics import stream_frames
+
+# (sequence number, frame bytes, time received)
+Frame = Tuple[int, bytes, float]
+
+
+class LatestFrameSlot:
+    """
+    Single-slot mailbox: ``put`` replaces a frame that has not been taken yet.
+    """
+
+    def __init__(self):
+        self._frame: Optional[Frame] = None
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, frame: Frame) -> None:
+        if self._frame is not None:
+            self.dropped += 1
+            stream_frames.inc(outcome="dropped")
+        self._frame = frame
+        self._ready.set()
+
+    def close(self) -> None:
+        self._closed = True
+        self._ready.set()
+
+    async def get(self) -> Optional[Frame]:
+        """Wait for the latest frame; None once the slot is closed and empty."""
+        while self._frame is None:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        frame, self._frame = self._frame, None
+        return frame
+
+
+class TemporalSmoother:
+    """
+    Confidence-weighted vote over the last ``window`` results.
+    """
+
+    def __init__(self, window: int = 5):
+        self.window = max(1, window)
+        self._recent: Deque[Dict[str, float]] = deque(maxlen=self.window)
+
+    def update(self, result: Dict) -> Dict:
+        """Add a frame's result and return the smoothed label and confidence."""
+        scores: Dict[str, float] = {}
+        for item in result.get("all_classes") or [
+            {"label": result["classification"], "confidence": result["confidence"]}
+        ]:
+            label = item.get("label") or item.get("sign")
+            if label is not None:
+                scores[label] = scores.get(label, 0.0) + float(item.get("confidence", 0.0))
+        self._recent.append(scores)
+
+        totals: Dict[str, float] = {}
+        for frame_scores in self._recent:
+            for label, score in frame_scores.items():
+                totals[label] = totals.get(label, 0.0) + score
+        label = max(totals, key=totals.get)
+        return {
+            "classification": label,
+            "confidence": round(totals[label] / len(self._recent), 3),
+            "frames": len(self._recent),
+        }
+
+
+class FrameStreamSession:
+    """
+    One client's frame stream: receives frames, classifies the latest one
+    whenever the previous classification finishes, and sends smoothed
+    results back.
+
+    ``classify`` takes frame bytes and returns a classification result (or
+    raises); ``describe_error`` turns its exceptions into the fields of an
+    error message for the client, after which the stream continues. All
+    messages, including the reader's, go through ``send`` so that writes to
+    the socket never interleave.
+    """
+
+    def __init__(
+        self,
+        classify: Callable[[bytes], Awaitable[Dict]],
+        send: Callable[[Dict], Awaitable[None]],
+        describe_error: Callable[[Exception], Dict],
+        window: int = 5,
+    ):
+        self._classify = classify
+        self._send = send
+        self._send_lock = asyncio.Lock()
+        self._describe_error = describe_error
+        self.slot = LatestFrameSlot()
+        self.smoother = TemporalSmoother(window)
+        self.received = 0
+        self.classified = 0
+
+    async def run(self, receive: Callable[[], Awaitable[Optional[bytes]]]) -> None:
+        """
+        Read frames with ``receive`` (None when the client disconnects)
+        until the stream ends.
+        """
+        worker = asyncio.ensure_future(self._work())
+        try:
+            while True:
+                receiving = asyncio.ensure_future(receive())
+                # Stop reading if the worker fails (e.g. the socket closed)
+                await asyncio.wait({receiving, worker}, return_when=asyncio.FIRST_COMPLETED)
+                if worker.done():
+                    receiving.cancel()
+                    break
+                data = receiving.result()
+                if data is None:
+                    break
+                self.received += 1
+                stream_frames.inc(outcome="received")
+                self.slot.put((self.received, data, time.perf_counter()))
+        finally:
+            self.slot.close()
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+
+    async def send(self, message: Dict) -> None:
+        """Send one message to the client, one writer at a time."""
+        async with self._send_lock:
+            await self._send(message)
+
+    async def _work(self) -> None:
+        while True:
+            frame = await self.slot.get()
+            if frame is None:
+                return
+            sequence, data, received_at = frame
+            try:
+                result = await self._classify(data)
+            except Exception as exc:  # reported to the client, stream continues
+                stream_frames.inc(outcome="rejected")
+                await self.send({"type": "error", "frame": sequence, **self._describe_error(exc)})
+                continue
+
+            self.classified += 1
+            stream_frames.inc(outcome="classified")
+            smoothed = self.smoother.update(result)
+            await self.send(
+                {
+                    "type": "result",
+                    "frame": sequence,
+                    **smoothed,
+                    "frame_classification": result["classification"],
+                    "frame_confidence": result["confidence"],
+                    "near_duplicate": result.get("near_duplicate", False),
+                    "latency_ms": round((time.perf_counter() - received_at) * 1000, 1),
+                    "dropped": self.slot.dropped,
+                }
+            )
+
+    def stats(self) -> Dict:
+        return {
+            "received": self.received,
+            "classified": self.classified,
+            "dropped": self.slot.dropped,
+        }
@@ -7,9 +7,11 @@ TODO: Implement validation logic per Jira tickets
 """
 
 from fastapi import UploadFile, HTTPException
-from typing import Tuple
+from typing import Optional, Tuple
+import io
 import os
 from services.error_messages import get_error_message, ERROR_MESSAGES
+from services.image_inspection import ImageInfo, ImageInspectionError, inspect_image
 
 # Allowed file extensions for RSCI-6: JPG and PNG only
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png"}
@@ -17,6 +19,25 @@ ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png"}
 # Allowed MIME types for RSCI-6: JPG and PNG only
 ALLOWED_MIME_TYPES = {"image/jpeg", "image/png"}
 
+# Size limits for RSCI-7 (max 10 MB) and RSCI-9 (reject empty files)
+MAX_SIZE_BYTES = 10 * 1024 * 1024  # 10 MB
+MIN_SIZE_BYTES = 1  # Minimum 1 byte (to detect empty files)
+
+# Chunk size used when an upload has to be read to find its size
+READ_CHUNK_SIZE = 64 * 1024
+
+# Largest image (in pixels) accepted for decoding by later stages
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", str(50_000_000)))
+
+# Declared file types (extension or MIME type) mapped to sniffed formats
+DECLARED_FORMATS = {
+    ".jpg": "jpeg",
+    ".jpeg": "jpeg",
+    ".png": "png",
+    "image/jpeg": "jpeg",
+    "image/png": "png",
+}
+
 
 def validate_file_type(file: UploadFile) -> bool:
     """
@@ -59,11 +80,58 @@ def validate_file_type(file: UploadFile) -> bool:
     return True
 
 
+def _get_upload_size(file: UploadFile) -> Optional[int]:
+    """
+    Determine the upload size without reading its content.
+
+    Uses the size recorded by the multipart parser when available, and
+    otherwise seeks to the end of the spooled file. Returns None when the
+    underlying file object is not seekable.
+    """
+    if file.size is not None:
+        return file.size
+
+    try:
+        position = file.file.tell()
+        file.file.seek(0, os.SEEK_END)
+        size = file.file.tell()
+        file.file.seek(position)
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+    return size
+
+
+def _check_size_limits(file_size: int) -> None:
+    """
+    Raise the RSCI-7/RSCI-9 errors for empty or oversized files.
+    """
+    # RSCI-9: Check for empty files
+    if file_size < MIN_SIZE_BYTES:
+        error_msg = get_error_message("EMPTY_FILE")
+        raise HTTPException(
+            status_code=400,
+            detail=error_msg
+        )
+
+    # Check if size is less than 10 MB
+    if file_size > MAX_SIZE_BYTES:
+        file_size_mb = file_size / (1024 * 1024)
+        error_msg = get_error_message("FILE_TOO_LARGE", {"file_size_mb": file_size_mb})
+        raise HTTPException(
+            status_code=413,
+            detail=error_msg
+        )
+
+
 def validate_file_size(file: UploadFile) -> bool:
     """
     Validate file size - reject if larger than 10 MB or empty.
     Jira Ticket: RSCI-7, RSCI-9
     
+    The size is taken from the upload metadata when possible, so the file
+    content is not read. Non-seekable uploads are counted in chunks and
+    rejected as soon as the limit is crossed.
+    
     Args:
         file: Uploaded file
         
@@ -73,40 +141,148 @@ def validate_file_size(file: UploadFile) -> bool:
     Raises:
         HTTPException: If file size exceeds 10MB or is empty
     """
-    MAX_SIZE_BYTES = 10 * 1024 * 1024  # 10 MB
-    MIN_SIZE_BYTES = 1  # Minimum 1 byte (to detect empty files)
+    file_size = _get_upload_size(file)
+
+    if file_size is None:
+        file_size = 0
+        while file_size <= MAX_SIZE_BYTES:
+            chunk = file.file.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            file_size += len(chunk)
+
+    # Reset file pointer for potential future reads
+    file.file.seek(0)
+
+    _check_size_limits(file_size)
+    return True
+
+
+def read_validated_upload(file: UploadFile) -> bytes:
+    """
+    Validate the upload size and return its content in a single pass.
+    Jira Ticket: RSCI-7, RSCI-9
     
-    # Read file content to get size
-    content = file.file.read()
-    file_size = len(content)
+    Oversized and empty files are rejected before any content is read when
+    the size is known up front. Otherwise the file is read in chunks and
+    rejected as soon as it crosses the 10 MB limit, so at most one copy of an
+    acceptable image is held in memory.
     
-    # Reset file pointer for potential future reads
+    Args:
+        file: Uploaded file
+        
+    Returns:
+        bytes: The file content
+        
+    Raises:
+        HTTPException: If file size exceeds 10MB or is empty
+    """
+    file_size = _get_upload_size(file)
+    if file_size is not None:
+        _check_size_limits(file_size)
+
     file.file.seek(0)
+
+    # With a known size, one bounded read returns the whole file without
+    # building it up from chunks.
+    chunk_size = file_size + 1 if file_size is not None else READ_CHUNK_SIZE
+    chunks = []
+    bytes_read = 0
+    while True:
+        chunk = file.file.read(chunk_size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        bytes_read += len(chunk)
+        if bytes_read > MAX_SIZE_BYTES:
+            file.file.seek(0)
+            _check_size_limits(bytes_read)
+
+    file.file.seek(0)
+    _check_size_limits(bytes_read)
+
+    return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+
+def validate_image_content(file: UploadFile, content: bytes) -> ImageInfo:
+    """
+    Validate that the upload content is a well-formed JPEG or PNG that
+    matches its declared type, using only the image headers.
+    Jira Ticket: RSCI-6, RSCI-9
     
-    # RSCI-9: Check for empty files
-    if file_size < MIN_SIZE_BYTES:
-        error_msg = get_error_message("EMPTY_FILE")
+    Args:
+        file: Uploaded file (its filename and content type are checked)
+        content: File bytes, as returned by read_validated_upload
+        
+    Returns:
+        ImageInfo: Format, dimensions and color type of the image
+        
+    Raises:
+        HTTPException: If the content is not an image, is truncated,
+            does not match its declared type or is too large to decode
+    """
+    try:
+        info = inspect_image(content)
+    except ImageInspectionError as e:
+        error_key = "INVALID_IMAGE_CONTENT" if e.reason == "unsupported" else "CORRUPTED_FILE"
         raise HTTPException(
             status_code=400,
-            detail=error_msg
+            detail=get_error_message(error_key)
         )
-    
-    # Check if size is less than 10 MB
-    if file_size > MAX_SIZE_BYTES:
-        file_size_mb = file_size / (1024 * 1024)
-        error_msg = get_error_message("FILE_TOO_LARGE", {"file_size_mb": file_size_mb})
+
+    declared = [os.path.splitext(file.filename or "")[1].lower(), file.content_type]
+    for declared_type in declared:
+        declared_format = DECLARED_FORMATS.get(declared_type)
+        if declared_format and declared_format != info.format:
+            error_msg = get_error_message("MISMATCHED_FILE_TYPE", {"file_type": info.mime_type})
+            raise HTTPException(
+                status_code=400,
+                detail=error_msg
+            )
+
+    if info.pixels > MAX_IMAGE_PIXELS:
         raise HTTPException(
-            status_code=413,
-            detail=error_msg
+            status_code=400,
+            detail=get_error_message("IMAGE_DIMENSIONS_TOO_LARGE")
         )
-    
-    return True
+
+    return info
+
+
+def validate_frame(content: bytes) -> ImageInfo:
+    """
+    Validate one frame of a classification stream (raw image bytes without
+    a filename or declared type): size limits, image headers and dimensions.
+
+    Returns:
+        ImageInfo: Format, dimensions and color type of the frame
+
+    Raises:
+        HTTPException: With the same error messages as file uploads
+    """
+    _check_size_limits(len(content))
+    try:
+        info = inspect_image(content)
+    except ImageInspectionError as e:
+        error_key = "INVALID_IMAGE_CONTENT" if e.reason == "unsupported" else "CORRUPTED_FILE"
+        raise HTTPException(
+            status_code=400,
+            detail=get_error_message(error_key)
+        )
+
+    if info.pixels > MAX_IMAGE_PIXELS:
+        raise HTTPException(
+            status_code=400,
+            detail=get_error_message("IMAGE_DIMENSIONS_TOO_LARGE")
+        )
+
+    return info
 
 
 def validate_image(file: UploadFile) -> Tuple[bool, str]:
     """
     Comprehensive image validation.
-    Combines file type and size validation.
+    Combines file type, size and image header validation.
     RSCI-9: Includes validation for empty and corrupted files
     
     Args:
@@ -117,16 +293,10 @@ def validate_image(file: UploadFile) -> Tuple[bool, str]:
     """
     try:
         validate_file_type(file)
-        validate_file_size(file)
+        content = read_validated_upload(file)
         
-        # RSCI-9: Basic corruption check - verify file is readable
-        # This is a simple check - more sophisticated validation can be added
-        content = file.file.read(1024)  # Read first 1KB
-        file.file.seek(0)  # Reset pointer
-        
-        if not content or len(content) == 0:
-            error_msg = get_error_message("CORRUPTED_FILE")
-            return False, error_msg
+        # RSCI-9: Corruption check - verify the JPEG/PNG headers are intact
+        validate_image_content(file, content)
             
         return True, ""
     except HTTPException as e:
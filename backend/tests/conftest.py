@@ -5,6 +5,7 @@ Sets up Python path for imports
 import sys
 from pathlib import Path
 import os
+import tempfile
 
 # Add the backend directory to Python path (absolute path)
 backend_dir = Path(__file__).parent.parent.resolve()
@@ -14,3 +15,6 @@ if str(backend_dir) not in sys.path:
 # Also set PYTHONPATH environment variable as backup
 os.environ['PYTHONPATH'] = str(backend_dir) + os.pathsep + os.environ.get('PYTHONPATH', '')
 
+
+# Keep the results database out of the source tree during tests
+os.environ.setdefault("RESULTS_DB_PATH", str(Path(tempfile.mkdtemp()) / "results.db"))
@@ -0,0 +1,85 @@
+"""
+Tests for the Benchmark Suite
+Related Jira Ticket: RSCI-10
+"""
+
+import asyncio
+
+import pytest
+from benchmarks.common import percentile, summarize_latencies
+from benchmarks.compare import compare
+from benchmarks.fake_gemini import parse_latency, run_fake_gemini
+from benchmarks.request_memory import json_body, measure_peak, streamed_body
+from services.classification_service import GeminiClassificationService
+
+
+def test_gemini_service_can_target_the_fake_server(monkeypatch):
+    """Test that GEMINI_API_BASE points the Gemini client at the fake server"""
+    with run_fake_gemini(latency="fixed:0") as server:
+        monkeypatch.setenv("GEMINI_API_BASE", server.base_url)
+        service = GeminiClassificationService(api_key="benchmark-key")
+
+        async def classify():
+            try:
+                return await service.classify(b"image-bytes", "image/jpeg")
+            finally:
+                await service.aclose()
+
+        result = asyncio.run(classify())
+
+    assert result["classification"] == "Stop"
+    assert server.requests == 1
+
+
+def test_fake_server_injects_errors():
+    """Test that the configured error rate is applied to requests"""
+    with run_fake_gemini(latency="fixed:0", error_rate=1.0) as server:
+        assert server.next_outcome() is True
+        assert server.errors == 1
+
+
+def test_latency_specs_are_parsed():
+    """Test the supported latency distributions"""
+    assert parse_latency("fixed:0.2")() == 0.2
+    assert 0.1 <= parse_latency("uniform:0.1:0.3")() <= 0.3
+    assert parse_latency("lognormal:0.3:0.5")() > 0
+    assert parse_latency("stall:0.3:0.5:1:20")() == 20
+    with pytest.raises(ValueError):
+        parse_latency("gaussian:1")
+
+
+def test_latency_summary_uses_nearest_rank_percentiles():
+    """Test percentile calculation on a known sample"""
+    samples = [index / 1000 for index in range(1, 101)]
+
+    assert percentile(samples, 50) == 0.05
+    summary = summarize_latencies(samples)
+    assert summary["p99_ms"] == 99.0
+    assert summary["count"] == 100
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    """Test that slower candidates are reported as regressions"""
+    def report(rps, p99):
+        return {"results": [{
+            "endpoint": "classify", "image_edge": 640, "concurrency": 8,
+            "requests_per_second": rps,
+            "latency": {"p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": p99},
+        }]}
+
+    _, regressed = compare(report(100, 30.0), report(98, 31.0), threshold=0.1)
+    assert regressed is False
+
+    _, regressed = compare(report(100, 30.0), report(70, 31.0), threshold=0.1)
+    assert regressed is True
+
+
+def test_streamed_request_body_peak_memory_stays_below_image_size():
+    """Test that streaming a 2 MB image needs far less memory than the image"""
+    image = bytes(2 * 1024 * 1024)
+
+    streamed = measure_peak(streamed_body, image)
+    serialised = measure_peak(json_body, image)
+
+    assert streamed["peak_ratio"] < 0.25
+    assert serialised["peak_ratio"] > 3
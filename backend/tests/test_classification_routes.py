@@ -0,0 +1,220 @@
+"""
+Tests for Classification Routes
+Related Jira Ticket: RSCI-10
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from io import BytesIO
+from PIL import Image
+from app import app
+from routes import classification_routes
+from services.results_store import results_store
+
+client = TestClient(app)
+
+
+def create_test_image(filename: str, image_format: str = "JPEG", size: tuple = (32, 32)) -> tuple:
+    """Helper function to create a small, valid image upload"""
+    buffer = BytesIO()
+    Image.new("RGB", size, color=(200, 30, 30)).save(buffer, format=image_format)
+    content_type = "image/png" if image_format == "PNG" else "image/jpeg"
+    return (filename, BytesIO(buffer.getvalue()), content_type)
+
+
+def test_classify_returns_prediction():
+    """Test that a single valid image is classified"""
+    response = client.post(
+        "/api/classification/classify",
+        files={"file": create_test_image("sign.jpg")}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["filename"] == "sign.jpg"
+    assert 0 <= body["confidence"] <= 1
+    assert body["all_classes"]
+    assert body["preprocessing"]["original_width"] == 32
+
+
+def test_classify_rejects_non_image_content():
+    """Test that files that are not images are rejected before classification"""
+    response = client.post(
+        "/api/classification/classify",
+        files={"file": ("fake.jpg", BytesIO(b"x" * 2048), "image/jpeg")}
+    )
+
+    assert response.status_code == 400
+    assert "not a valid image" in response.json()["detail"]
+
+
+def test_classify_batch_preserves_input_order_and_reports_errors():
+    """Test that batch results come back in upload order with per-file errors"""
+    files = [
+        ("files", create_test_image("first.jpg")),
+        ("files", ("notes.txt", BytesIO(b"not an image"), "text/plain")),
+        ("files", create_test_image("third.png", image_format="PNG")),
+    ]
+
+    response = client.post("/api/classification/classify/batch", files=files)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 3
+    assert body["succeeded"] == 2
+    assert body["failed"] == 1
+
+    results = body["results"]
+    assert [entry["index"] for entry in results] == [0, 1, 2]
+    assert [entry["filename"] for entry in results] == ["first.jpg", "notes.txt", "third.png"]
+    assert results[0]["status"] == "ok"
+    assert "classification" in results[0]
+    assert results[1]["status"] == "error"
+    assert results[1]["status_code"] == 400
+    assert results[2]["status"] == "ok"
+
+
+def test_classification_results_can_be_retrieved_by_image_id():
+    """Test that classified images are stored and retrievable (RSCI-12)"""
+    response = client.post(
+        "/api/classification/classify",
+        files={"file": create_test_image("stored.jpg")}
+    )
+    body = response.json()
+
+    result = client.get(f"/api/classification/results/{body['image_id']}")
+
+    assert result.status_code == 200
+    assert result.json()["classification"] == body["classification"]
+    assert result.json()["filename"] == "stored.jpg"
+    assert result.json()["status"] == "completed"
+
+
+def test_unknown_result_returns_404():
+    """Test that unknown image ids are reported as not found"""
+    response = client.get("/api/classification/results/does-not-exist")
+
+    assert response.status_code == 404
+
+
+def test_history_lists_stored_classifications():
+    """Test that history returns stored results newest first (RSCI-14)"""
+    image_ids = []
+    for index in range(3):
+        response = client.post(
+            "/api/classification/classify",
+            files={"file": create_test_image(f"history{index}.jpg")}
+        )
+        image_ids.append(response.json()["image_id"])
+    results_store.flush()
+
+    response = client.get("/api/classification/history", params={"limit": 2})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [entry["image_id"] for entry in body["history"]] == image_ids[::-1][:2]
+    assert body["next_cursor"] is not None
+
+
+def test_classify_batch_rejects_too_many_files(monkeypatch):
+    """Test that batches over the configured limit are rejected"""
+    monkeypatch.setattr(classification_routes, "BATCH_MAX_FILES", 2)
+    files = [("files", create_test_image(f"sign{i}.jpg")) for i in range(3)]
+
+    response = client.post("/api/classification/classify/batch", files=files)
+
+    assert response.status_code == 400
+    assert "Too many files" in response.json()["detail"]
+
+
+def test_async_mode_queues_and_completes_classification():
+    """Test that mode=async returns a job id whose result can be long-polled"""
+    with TestClient(app) as lifespan_client:
+        response = lifespan_client.post(
+            "/api/classification/classify",
+            params={"mode": "async"},
+            files={"file": create_test_image("queued.jpg")}
+        )
+
+        assert response.status_code == 202
+        body = response.json()
+        assert body["status"] == "queued"
+        assert body["status_url"] == f"/api/classification/results/{body['image_id']}"
+
+        result = lifespan_client.get(body["status_url"], params={"wait": 5})
+
+    assert result.status_code == 200
+    assert result.json()["status"] == "completed"
+    assert result.json()["filename"] == "queued.jpg"
+    assert "classification" in result.json()
+
+
+def test_result_poll_reports_jobs_queued_on_another_worker():
+    """Test that a poll answered by a worker without the job reads its shared state"""
+    results_store.save_job("other-worker-running", "running")
+    results_store.save_job("other-worker-failed", "failed", "upstream exploded")
+
+    running = client.get("/api/classification/results/other-worker-running")
+    assert running.status_code == 202
+    assert running.json() == {"image_id": "other-worker-running", "status": "running"}
+    assert running.headers["cache-control"] == "no-store"
+
+    failed = client.get("/api/classification/results/other-worker-failed")
+    assert failed.status_code == 200
+    assert failed.json()["error"] == "upstream exploded"
+
+
+def test_async_mode_returns_429_when_queue_is_full(monkeypatch):
+    """Test backpressure when the job queue is at its maximum depth"""
+    from services.job_queue import QueueFullError, job_queue
+
+    async def reject(*args, **kwargs):
+        raise QueueFullError("full")
+
+    monkeypatch.setattr(job_queue, "submit", reject)
+
+    response = client.post(
+        "/api/classification/classify",
+        params={"mode": "async"},
+        files={"file": create_test_image("rejected.jpg")}
+    )
+
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+
+def test_async_mode_still_validates_upload():
+    """Test that invalid uploads are rejected before being queued"""
+    response = client.post(
+        "/api/classification/classify",
+        params={"mode": "async"},
+        files={"file": ("fake.jpg", BytesIO(b"x" * 2048), "image/jpeg")}
+    )
+
+    assert response.status_code == 400
+
+
+def test_health_reports_classification_state():
+    """Test that health endpoints expose the classification backend state"""
+    for path in ("/health", "/api/health"):
+        response = client.get(path)
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ok"
+        assert "degraded" in response.json()["classification"]
+
+
+def test_metrics_endpoint_reports_stage_timings():
+    """Test that /metrics exposes per-stage histograms and backend counters"""
+    client.post("/api/classification/classify", files={"file": create_test_image("sign.jpg")})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    for stage in ("parse", "validate", "preprocess", "stub", "store"):
+        assert f'classification_stage_duration_seconds_count{{stage="{stage}"}}' in body
+    assert 'classification_backend_requests_total{backend="stub"}' in body
+    assert 'classification_payload_bytes_count{stage="upload"}' in body
+    assert 'http_requests_total{handler="classify_image",status="200"}' in body
@@ -0,0 +1,345 @@
+"""
+Tests for Classification Service
+Related Jira Ticket: RSCI-10
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from services.classification_service import (
+    GeminiClassificationService,
+    UnifiedClassificationService,
+)
+
+
+def gemini_response(predictions: list) -> dict:
+    """Helper function to build a Gemini generateContent response body"""
+    return {
+        "candidates": [
+            {"content": {"parts": [{"text": json.dumps({"predictions": predictions})}]}}
+        ],
+        "usageMetadata": {"candidatesTokenCount": 12},
+    }
+
+
+def create_gemini_service(handler) -> GeminiClassificationService:
+    """Helper function to build a Gemini service backed by a mock transport"""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return GeminiClassificationService(api_key="test-key", client=client)
+
+
+def create_unified_service(monkeypatch, gemini=None) -> UnifiedClassificationService:
+    """Helper function to build a unified service with an optional Gemini backend"""
+    monkeypatch.delenv("GEMINI_API", raising=False)
+    service = UnifiedClassificationService()
+    service.gemini = gemini
+    return service
+
+
+def test_gemini_classify_parses_sorted_predictions():
+    """Test that Gemini predictions are parsed and sorted by confidence"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.params["key"] == "test-key"
+        return httpx.Response(200, json=gemini_response([
+            {"label": "Yield", "confidence": 0.1},
+            {"label": "Stop", "confidence": 0.9},
+        ]))
+
+    service = create_gemini_service(handler)
+    result = asyncio.run(service.classify(b"image-bytes", "image/png"))
+
+    assert result["classification"] == "Stop"
+    assert result["confidence"] == 0.9
+    assert [item["label"] for item in result["all_classes"]] == ["Stop", "Yield"]
+
+
+def test_gemini_requests_overlap_on_shared_client():
+    """Test that concurrent Gemini calls wait on the upstream concurrently"""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, json=gemini_response([{"label": "Stop", "confidence": 0.9}]))
+
+    service = create_gemini_service(handler)
+
+    async def run_concurrently():
+        started = time.perf_counter()
+        await asyncio.gather(*(service.classify(b"image-bytes", None) for _ in range(5)))
+        elapsed = time.perf_counter() - started
+        await service.aclose()
+        return elapsed
+
+    assert asyncio.run(run_concurrently()) < 0.6
+
+
+def test_unified_falls_back_to_stub_on_gemini_error(monkeypatch):
+    """Test that upstream failures fall back to stubbed predictions"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503, json={"error": "unavailable"})
+
+    service = create_unified_service(monkeypatch, gemini=create_gemini_service(handler))
+    result = asyncio.run(service.classify(b"image-bytes", "image/jpeg"))
+
+    assert result["classification"] in service.stub.TRAFFIC_SIGNS
+
+
+def test_unified_startup_and_shutdown_manage_client(monkeypatch):
+    """Test that the pooled client is opened on startup and closed on shutdown"""
+    monkeypatch.setenv("GEMINI_API", "test-key")
+    service = UnifiedClassificationService()
+
+    async def lifecycle():
+        await service.startup()
+        client = service.gemini.client
+        assert not client.is_closed
+        await service.shutdown()
+        return client
+
+    assert asyncio.run(lifecycle()).is_closed
+
+
+def test_unified_caches_gemini_results_by_content(monkeypatch):
+    """Test that repeated images are served from the result cache"""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json=gemini_response([{"label": "Stop", "confidence": 0.9}]))
+
+    service = create_unified_service(monkeypatch, gemini=create_gemini_service(handler))
+
+    async def classify_twice():
+        first = await service.classify(b"same-bytes", "image/jpeg")
+        second = await service.classify(b"same-bytes", "image/jpeg")
+        return first, second
+
+    first, second = asyncio.run(classify_twice())
+
+    assert first == second
+    assert len(calls) == 1
+    assert service.get_stats()["cache"]["hits"] == 1
+
+
+def test_unified_caches_results_under_raw_upload_bytes(monkeypatch):
+    """Test that an exact repeat upload is answered without preprocessing it again"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=gemini_response([{"label": "Stop", "confidence": 0.9}]))
+
+    service = create_unified_service(monkeypatch, gemini=create_gemini_service(handler))
+    assert service.cached_upload(b"raw-upload") is None
+
+    result = asyncio.run(service.classify(
+        b"prepared-bytes", "image/jpeg", upload=b"raw-upload", preprocessing={"resized": True}
+    ))
+
+    cached = service.cached_upload(b"raw-upload")
+    assert cached == {"result": result, "preprocessing": {"resized": True}}
+
+    # The first upload counts one miss, its repeat one hit
+    stats = service.get_stats()["cache"]
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+def test_unified_does_not_cache_stub_fallbacks(monkeypatch):
+    """Test that stubbed fallback results are never cached"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(500)
+
+    service = create_unified_service(monkeypatch, gemini=create_gemini_service(handler))
+
+    async def classify_twice():
+        await service.classify(b"same-bytes", "image/jpeg", upload=b"raw-upload")
+        await service.classify(b"same-bytes", "image/jpeg", upload=b"raw-upload")
+
+    asyncio.run(classify_twice())
+
+    assert service.cached_upload(b"raw-upload") is None
+    assert service.get_stats()["cache"]["entries"] == 0
+    assert service.get_stats()["cache"]["hits"] == 0
+
+
+def test_unified_coalesces_identical_in_flight_images(monkeypatch):
+    """Test that concurrent requests for the same image make one upstream call"""
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, json=gemini_response([{"label": "Stop", "confidence": 0.9}]))
+
+    service = create_unified_service(monkeypatch, gemini=create_gemini_service(handler))
+
+    async def classify_concurrently():
+        return await asyncio.gather(
+            *(service.classify(b"same-bytes", "image/jpeg") for _ in range(4)),
+            service.classify(b"other-bytes", "image/jpeg"),
+        )
+
+    results = asyncio.run(classify_concurrently())
+
+    assert len(calls) == 2
+    assert all(result["classification"] == "Stop" for result in results)
+    assert service.get_stats()["coalescing"]["coalesced"] == 3
+
+
+def test_gemini_warm_up_opens_a_connection_without_generating():
+    """Test that warm-up fetches model metadata instead of calling generateContent"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"name": "models/gemini-2.0-flash"})
+
+    service = create_gemini_service(handler)
+
+    assert asyncio.run(service.warm_up()) is True
+    assert requests[0].method == "GET"
+    assert requests[0].url.path.endswith("/models/gemini-2.0-flash")
+
+
+def test_gemini_warm_up_failures_are_ignored():
+    """Test that a failing warm-up is reported but does not raise"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("DNS failure", request=request)
+
+    service = create_gemini_service(handler)
+
+    assert asyncio.run(service.warm_up()) is False
+
+
+def packed_response(entries: list) -> dict:
+    """Helper function to build a packed (multi-image) Gemini response body"""
+    return {"candidates": [{"content": {"parts": [{"text": json.dumps(entries)}]}}]}
+
+
+def test_gemini_classify_many_packs_images_into_one_request():
+    """Test that several images are sent as parts of one request and split back"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requests.append(body)
+        return httpx.Response(200, json=packed_response([
+            {"index": 1, "predictions": [{"label": "Yield", "confidence": 0.8}]},
+            {"index": 0, "predictions": [{"label": "Stop", "confidence": 0.9}]},
+        ]))
+
+    service = create_gemini_service(handler)
+    results = asyncio.run(service.classify_many([(b"first", "image/jpeg"), (b"second", "image/png")]))
+
+    assert len(requests) == 1
+    parts = requests[0]["contents"][0]["parts"]
+    assert [part["inlineData"]["mimeType"] for part in parts if "inlineData" in part] == [
+        "image/jpeg", "image/png"
+    ]
+    assert [result["classification"] for result in results] == ["Stop", "Yield"]
+
+
+def test_gemini_classify_many_falls_back_to_single_requests():
+    """Test that images missing from the packed response are classified individually"""
+    calls = {"packed": 0, "single": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        parts = json.loads(request.content)["contents"][0]["parts"]
+        if sum(1 for part in parts if "inlineData" in part) > 1:
+            calls["packed"] += 1
+            return httpx.Response(200, json=packed_response([
+                {"index": 0, "predictions": [{"label": "Stop", "confidence": 0.9}]},
+            ]))
+        calls["single"] += 1
+        return httpx.Response(200, json=gemini_response([{"label": "Yield", "confidence": 0.7}]))
+
+    service = create_gemini_service(handler)
+    results = asyncio.run(service.classify_many([(b"first", None), (b"second", None)]))
+
+    assert calls == {"packed": 1, "single": 1}
+    assert [result["classification"] for result in results] == ["Stop", "Yield"]
+    assert service.pack_fallbacks == 1
+
+
+def test_gemini_packs_concurrent_classify_calls(monkeypatch):
+    """Test that the collector fills packs from concurrent classify calls"""
+    monkeypatch.setenv("GEMINI_PACK_SIZE", "4")
+    monkeypatch.setenv("GEMINI_PACK_WINDOW_MS", "20")
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        parts = json.loads(request.content)["contents"][0]["parts"]
+        images = sum(1 for part in parts if "inlineData" in part)
+        requests.append(images)
+        return httpx.Response(200, json=packed_response([
+            {"index": index, "predictions": [{"label": f"Sign {index}", "confidence": 0.9}]}
+            for index in range(images)
+        ]))
+
+    service = create_gemini_service(handler)
+
+    async def classify_concurrently():
+        return await asyncio.gather(
+            *(service.classify(f"image-{index}".encode(), "image/jpeg") for index in range(4))
+        )
+
+    results = asyncio.run(classify_concurrently())
+
+    assert requests == [4]
+    assert [result["classification"] for result in results] == [f"Sign {index}" for index in range(4)]
+    assert service.stats()["packing"]["batches"] == 1
+
+
+def test_parse_packed_predictions_accepts_wrapped_and_fenced_arrays():
+    """Test that packed responses are parsed from common response shapes"""
+    fenced = '```json\n[{"index": 0, "predictions": [{"label": "Stop", "confidence": 0.9}]}]\n```'
+    wrapped = '{"results": [{"predictions": [{"label": "Stop", "confidence": 0.9}]}]}'
+
+    assert GeminiClassificationService._parse_packed_predictions(fenced, 1)[0][0]["label"] == "Stop"
+    assert GeminiClassificationService._parse_packed_predictions(wrapped, 1)[0][0]["label"] == "Stop"
+    assert GeminiClassificationService._parse_packed_predictions("not json", 2) == {}
+
+
+def test_gemini_structured_output_requests_a_response_schema(monkeypatch):
+    """Test that structured mode sends responseSchema and parses plain JSON"""
+    monkeypatch.setenv("GEMINI_STRUCTURED_OUTPUT", "true")
+    monkeypatch.setenv("GEMINI_CANONICAL_LABELS", "true")
+    payloads = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payloads.append(json.loads(request.content))
+        return httpx.Response(
+            200,
+            json=gemini_response(
+                [
+                    {"label": "Speed limit 60 km/h", "confidence": 0.7},
+                    {"label": "Speed Limit 60", "confidence": 0.2},
+                    {"label": "give way", "confidence": 0.1},
+                ]
+            ),
+        )
+
+    service = create_gemini_service(handler)
+    result = asyncio.run(service.classify(b"image-bytes", "image/jpeg"))
+
+    config = payloads[0]["generationConfig"]
+    assert config["responseMimeType"] == "application/json"
+    assert config["responseSchema"]["required"] == ["predictions"]
+    assert payloads[0]["contents"][0]["parts"][0]["text"] == service.STRUCTURED_PROMPT
+    assert result["classification"] == "Speed Limit 60"
+    assert result["confidence"] == 0.9
+    assert [item["label"] for item in result["all_classes"]] == ["Speed Limit 60", "Yield"]
+
+
+def test_gemini_prompt_mode_does_not_send_a_schema(monkeypatch):
+    """Test that the default mode keeps the prompt-described format and Gemini's labels"""
+    monkeypatch.delenv("GEMINI_STRUCTURED_OUTPUT", raising=False)
+    monkeypatch.delenv("GEMINI_CANONICAL_LABELS", raising=False)
+    payloads = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payloads.append(json.loads(request.content))
+        return httpx.Response(200, json=gemini_response([{"label": "Stop sign", "confidence": 0.9}]))
+
+    result = asyncio.run(create_gemini_service(handler).classify(b"image-bytes", "image/jpeg"))
+
+    assert "generationConfig" not in payloads[0]
+    assert result["classification"] == "Stop sign"
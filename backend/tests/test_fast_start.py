@@ -0,0 +1,121 @@
+"""
+Tests for the Fast-Start Serverless Entry Point
+Related Jira Ticket: RSCI-10
+"""
+
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+BACKEND_DIR = ROOT_DIR / "backend"
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from api.index import FastStartApp  # noqa: E402
+
+
+def imported_modules(target: str, candidates: list) -> list:
+    """Helper function to list which candidate modules importing target pulls in"""
+    code = (
+        f"import sys; sys.path[:0] = [{str(ROOT_DIR)!r}, {str(BACKEND_DIR)!r}]; "
+        f"import {target}; import json; "
+        f"print(json.dumps([m for m in {candidates!r} if m in sys.modules]))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def create_backend_app(calls: list) -> FastAPI:
+    """Helper function to build a small backend app recording lifespan events"""
+    from contextlib import asynccontextmanager
+
+    @asynccontextmanager
+    async def lifespan(app):
+        calls.append("startup")
+        yield
+        calls.append("shutdown")
+
+    backend = FastAPI(lifespan=lifespan)
+
+    @backend.get("/api/classification/stats")
+    def stats():
+        return {"backend": "stub"}
+
+    @backend.get("/api/health")
+    def health():
+        return {"status": "ok", "from": "backend"}
+
+    return backend
+
+
+def test_entry_point_import_stays_light():
+    """Test that importing the serverless entry point does not import FastAPI or the backend"""
+    loaded = imported_modules("api.index", ["fastapi", "pydantic", "httpx", "numpy", "PIL", "app"])
+    assert loaded == []
+
+
+def test_backend_import_defers_heavy_dependencies():
+    """Test that importing the FastAPI app leaves httpx, NumPy and Pillow unloaded"""
+    loaded = imported_modules("app", ["httpx", "numpy", "PIL", "requests"])
+    assert loaded == []
+
+
+def test_health_is_answered_without_loading_the_backend():
+    """Test that /api/health does not trigger the backend import"""
+    loads = []
+    shim = FastStartApp(loader=lambda: loads.append(1) or create_backend_app([]))
+
+    response = TestClient(shim).get("/api/health")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+    assert loads == []
+    assert not shim.loaded
+
+
+def test_other_requests_load_the_backend_once():
+    """Test that the backend is imported on first use and then handles all requests"""
+    loads = []
+    shim = FastStartApp(loader=lambda: loads.append(1) or create_backend_app([]))
+    client = TestClient(shim)
+
+    assert client.get("/api/classification/stats").json() == {"backend": "stub"}
+    assert client.get("/api/classification/stats").status_code == 200
+    assert client.get("/api/health").json()["from"] == "backend"
+    assert loads == [1]
+
+
+def test_backend_lifespan_runs_when_the_server_supports_it():
+    """Test that a lazily loaded backend still gets its startup and shutdown events"""
+    calls = []
+    shim = FastStartApp(loader=lambda: create_backend_app(calls))
+
+    with TestClient(shim) as client:
+        assert calls == []
+        client.get("/api/classification/stats")
+        assert calls == ["startup"]
+
+    assert calls == ["startup", "shutdown"]
+
+
+def test_warm_up_loads_the_backend_in_the_background():
+    """Test that WARMUP_ON_START loads the backend during server startup"""
+    calls = []
+    shim = FastStartApp(loader=lambda: create_backend_app(calls), warm_up=True)
+
+    with TestClient(shim):
+        # The server's event loop runs in a background thread; no request needed
+        deadline = time.monotonic() + 5
+        while not calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert shim.loaded
+
+    assert calls == ["startup", "shutdown"]
@@ -0,0 +1,146 @@
+"""
+Tests for Request Hedging
+Related Jira Ticket: RSCI-10
+"""
+
+import asyncio
+import json
+
+import httpx
+from services.classification_service import (
+    GeminiClassificationService,
+    UnifiedClassificationService,
+)
+from services.hedging import HedgePolicy
+
+
+def trained_policy(**kwargs) -> HedgePolicy:
+    """Helper function to build a policy whose hedge delay is about 20 ms"""
+    policy = HedgePolicy(min_samples=5, min_delay_seconds=0.0, **kwargs)
+    for _ in range(10):
+        policy.latency.record(0.02)
+    return policy
+
+
+def call(result, seconds: float, calls: list, error: Exception = None):
+    """Helper function to build a call that answers (or fails) after a delay"""
+    async def run():
+        calls.append(result)
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            calls.append(f"{result} cancelled")
+            raise
+        if error is not None:
+            raise error
+        return result
+    return run
+
+
+def test_no_hedging_until_latency_is_known():
+    """Test that calls are not hedged before min_samples latencies"""
+    policy = HedgePolicy(min_samples=5)
+    calls = []
+
+    result = asyncio.run(policy.run(call("primary", 0.05, calls), call("hedge", 0, calls)))
+
+    assert result == "primary"
+    assert calls == ["primary"]
+    assert policy.delay() is None
+    assert policy.latency.count == 1
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    """Test that the hedge answers a stalled call and the primary is cancelled"""
+    policy = trained_policy()
+    calls = []
+
+    result = asyncio.run(policy.run(call("primary", 5, calls), call("hedge", 0.01, calls)))
+
+    assert result == "hedge"
+    assert calls == ["primary", "hedge", "primary cancelled"]
+    assert policy.stats()["hedged"] == 1
+    assert policy.stats()["hedge_wins"] == 1
+
+
+def test_fast_primary_is_not_hedged():
+    """Test that calls answering within the hedge delay send one request"""
+    policy = trained_policy()
+    calls = []
+
+    result = asyncio.run(policy.run(call("primary", 0, calls), call("hedge", 0, calls)))
+
+    assert result == "primary"
+    assert calls == ["primary"]
+
+
+def test_failed_call_does_not_win():
+    """Test that a failure waits for the other call and both failing raises the primary error"""
+    policy = trained_policy()
+    calls = []
+
+    result = asyncio.run(
+        policy.run(call("primary", 0.05, calls, ValueError("primary")), call("hedge", 0.1, calls))
+    )
+    assert result == "hedge"
+
+    async def both_fail():
+        return await policy.run(
+            call("primary", 0.05, calls, ValueError("primary")),
+            call("hedge", 0.01, calls, ValueError("hedge")),
+        )
+
+    try:
+        asyncio.run(both_fail())
+    except ValueError as exc:
+        assert str(exc) == "primary"
+    else:
+        raise AssertionError("Expected the primary's error")
+
+
+def test_budget_caps_the_hedged_fraction():
+    """Test that uniformly slow calls are only hedged up to the budget"""
+    policy = trained_policy(max_ratio=0.25)
+    policy.budget._tokens = 0.0
+    policy.delay = lambda: 0.01
+    calls = []
+
+    async def run_many():
+        for _ in range(40):
+            await policy.run(call("primary", 0.03, calls), call("hedge", 0.1, calls))
+
+    asyncio.run(run_many())
+
+    assert policy.hedged == 10
+    assert policy.budget.stats()["exhausted"] == 30
+
+
+def test_unified_hedges_gemini_calls_to_the_hedge_model(monkeypatch):
+    """Test that a stalled Gemini call is answered by a request to GEMINI_HEDGE_MODEL"""
+    monkeypatch.delenv("GEMINI_API", raising=False)
+    monkeypatch.setenv("CLASSIFICATION_HEDGING", "1")
+    monkeypatch.setenv("HEDGE_MIN_SAMPLES", "1")
+    monkeypatch.setenv("GEMINI_MODELS", "models/slow,models/fast")
+    monkeypatch.setenv("GEMINI_HEDGE_MODEL", "models/fast")
+    models = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        model = request.url.path.split("/")[-1].split(":")[0]
+        models.append(model)
+        if model == "slow":
+            await asyncio.sleep(5)
+        text = json.dumps({"predictions": [{"label": "Stop", "confidence": 0.9}]})
+        return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+    service = UnifiedClassificationService()
+    service.gemini = GeminiClassificationService(
+        api_key="test-key", model="models/slow",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    service.hedging.latency.record(0.01)
+
+    result = asyncio.run(service.classify(b"stalled image", "image/jpeg"))
+
+    assert result["classification"] == "Stop"
+    assert models == ["slow", "fast"]
+    assert service.get_stats()["hedging"]["hedge_wins"] == 1
@@ -0,0 +1,150 @@
+"""
+Tests for HTTP Caching of Result and History Reads
+Related Jira Tickets: RSCI-12, RSCI-14
+"""
+
+import gzip
+from io import BytesIO
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app import app
+from services import http_cache
+from services.http_cache import ResponseCache, accepted_encodings, etag_matches, response_cache
+from services.job_queue import job_queue
+from services.results_store import results_store
+
+client = TestClient(app)
+
+
+def create_test_image(filename: str) -> tuple:
+    """Helper function to create a small, valid image upload"""
+    buffer = BytesIO()
+    Image.new("RGB", (32, 32), color=(200, 30, 30)).save(buffer, format="JPEG")
+    return (filename, BytesIO(buffer.getvalue()), "image/jpeg")
+
+
+def classify(filename: str) -> str:
+    """Helper function to classify an upload and return its image id"""
+    response = client.post(
+        "/api/classification/classify", files={"file": create_test_image(filename)}
+    )
+    return response.json()["image_id"]
+
+
+def test_completed_result_is_revalidated_with_etag():
+    """Test that a finished result carries an ETag and answers 304 when it matches"""
+    image_id = classify("etag.jpg")
+    url = f"/api/classification/results/{image_id}"
+
+    first = client.get(url, headers={"Accept-Encoding": "identity"})
+    etag = first.headers["etag"]
+
+    assert first.status_code == 200
+    assert "immutable" in first.headers["cache-control"]
+    assert first.headers["vary"] == "Accept-Encoding"
+
+    second = client.get(url, headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+    stale = client.get(url, headers={"Accept-Encoding": "identity", "If-None-Match": '"other"'})
+    assert stale.status_code == 200
+    assert stale.json()["image_id"] == image_id
+
+
+def test_queued_and_stored_results_have_the_same_etag(monkeypatch):
+    """Test that a finished job and its stored result are served with one body and ETag"""
+    with TestClient(app) as lifespan_client:
+        queued = lifespan_client.post(
+            "/api/classification/classify",
+            params={"mode": "async"},
+            files={"file": create_test_image("same-etag.jpg")},
+        ).json()
+        url = queued["status_url"]
+        headers = {"Accept-Encoding": "identity"}
+
+        from_job = lifespan_client.get(url, params={"wait": 5}, headers=headers)
+        assert job_queue.get(queued["image_id"]) is not None
+
+        # Another worker: no cached body and no in-memory job
+        monkeypatch.setattr(response_cache, "get", lambda key: None)
+        monkeypatch.setattr(job_queue, "get", lambda job_id: None)
+        results_store.flush()
+        from_store = lifespan_client.get(url, headers=headers)
+
+    assert from_job.status_code == from_store.status_code == 200
+    assert from_job.headers["etag"] == from_store.headers["etag"]
+    assert from_job.content == from_store.content
+
+
+def test_history_etag_changes_when_a_result_is_stored():
+    """Test that a history page is revalidated until a newer result is stored"""
+    classify("history-before.jpg")
+    results_store.flush()
+    params = {"limit": 5}
+
+    first = client.get("/api/classification/history", params=params)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+    assert client.get(
+        "/api/classification/history", params=params, headers={"If-None-Match": etag}
+    ).status_code == 304
+
+    newest = classify("history-after.jpg")
+    results_store.flush()
+
+    changed = client.get(
+        "/api/classification/history", params=params, headers={"If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["history"][0]["image_id"] == newest
+
+
+def test_large_bodies_are_compressed_when_accepted(monkeypatch):
+    """Test that bodies above the threshold are gzip-compressed and cached once"""
+    cache = ResponseCache(min_compress_bytes=64)
+    cached = cache.put("key", {"history": [{"label": "Stop"}] * 50})
+
+    compressed = cache.respond({"accept-encoding": "gzip, br;q=0"}, cached, "no-cache")
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] == cached.etag[:-1] + '-gzip"'
+    assert gzip.decompress(compressed.body) == cached.body
+    assert cached.encoded("gzip") is cached.encoded("gzip")
+
+    # The encoded ETag revalidates the same content
+    not_modified = cache.respond(
+        {"accept-encoding": "gzip", "if-none-match": compressed.headers["etag"]}, cached, "no-cache"
+    )
+    assert not_modified.status_code == 304
+
+    plain = cache.respond({"accept-encoding": "identity"}, cached, "no-cache")
+    assert "content-encoding" not in plain.headers
+    assert plain.body == cached.body
+
+    small = cache.put("small", {"ok": True})
+    small_response = cache.respond({"accept-encoding": "gzip"}, small, "no-cache")
+    assert "content-encoding" not in small_response.headers
+
+    monkeypatch.setattr(http_cache, "_brotli", lambda: None)
+    fallback = cache.respond({"accept-encoding": "br, gzip"}, cached, "no-cache")
+    assert fallback.headers["content-encoding"] == "gzip"
+
+
+def test_header_parsing_and_eviction():
+    """Test Accept-Encoding and If-None-Match parsing and LRU eviction"""
+    assert accepted_encodings("gzip;q=0.5, br;q=0, deflate") == {"gzip", "deflate"}
+    assert accepted_encodings(None) == set()
+    assert etag_matches('W/"abc", "def"', '"def"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
+
+    cache = ResponseCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, {"key": key})
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+    assert cache.stats()["entries"] == 2
@@ -0,0 +1,112 @@
+"""
+Tests for Image Inspection
+Related Jira Tickets: RSCI-6, RSCI-9
+"""
+
+import pytest
+from fastapi import UploadFile, HTTPException
+from io import BytesIO
+from PIL import Image
+from services.image_inspection import ImageInspectionError, inspect_image
+from services.validation_service import validate_image_content
+
+
+def create_image_bytes(image_format: str = "JPEG", mode: str = "RGB", size: tuple = (40, 30), **save_args) -> bytes:
+    """Helper function to encode a small image"""
+    buffer = BytesIO()
+    Image.new(mode, size).save(buffer, format=image_format, **save_args)
+    return buffer.getvalue()
+
+
+def create_upload(filename: str, content_type: str) -> UploadFile:
+    """Helper function to create an UploadFile with the given declared type"""
+    return UploadFile(filename=filename, file=BytesIO(), headers={"content-type": content_type})
+
+
+def test_inspect_jpeg_extracts_dimensions():
+    """Test that JPEG dimensions and components are read from the SOF header"""
+    info = inspect_image(create_image_bytes("JPEG", size=(40, 30)))
+
+    assert info.format == "jpeg"
+    assert info.mime_type == "image/jpeg"
+    assert (info.width, info.height) == (40, 30)
+    assert info.color_type == "ycbcr"
+    assert info.bit_depth == 8
+    assert info.progressive is False
+
+
+def test_inspect_progressive_grayscale_jpeg():
+    """Test that progressive and grayscale JPEGs are recognised"""
+    info = inspect_image(create_image_bytes("JPEG", mode="L", progressive=True))
+
+    assert info.color_type == "grayscale"
+    assert info.progressive is True
+
+
+def test_inspect_png_extracts_ihdr_fields():
+    """Test that PNG dimensions and color type are read from IHDR"""
+    info = inspect_image(create_image_bytes("PNG", mode="RGBA", size=(7, 9)))
+
+    assert info.format == "png"
+    assert (info.width, info.height) == (7, 9)
+    assert info.color_type == "rgba"
+    assert info.bit_depth == 8
+
+
+@pytest.mark.parametrize("image_format", ["JPEG", "PNG"])
+def test_inspect_rejects_truncated_images(image_format):
+    """Test that files cut short are rejected"""
+    data = create_image_bytes(image_format)
+
+    with pytest.raises(ImageInspectionError) as exc_info:
+        inspect_image(data[: len(data) // 2])
+
+    assert exc_info.value.reason == "truncated"
+
+
+def test_inspect_rejects_non_image_content():
+    """Test that arbitrary bytes are rejected as unsupported"""
+    with pytest.raises(ImageInspectionError) as exc_info:
+        inspect_image(b"x" * 1024)
+
+    assert exc_info.value.reason == "unsupported"
+
+
+def test_inspect_rejects_corrupted_png_header():
+    """Test that a damaged IHDR chunk fails its checksum"""
+    data = bytearray(create_image_bytes("PNG"))
+    data[18] ^= 0xFF
+
+    with pytest.raises(ImageInspectionError) as exc_info:
+        inspect_image(bytes(data))
+
+    assert exc_info.value.reason == "corrupted"
+
+
+def test_validate_image_content_rejects_mismatched_type():
+    """Test that PNG content uploaded as a JPG is rejected"""
+    upload = create_upload("sign.jpg", "image/jpeg")
+
+    with pytest.raises(HTTPException) as exc_info:
+        validate_image_content(upload, create_image_bytes("PNG"))
+
+    assert exc_info.value.status_code == 400
+    assert "does not match" in exc_info.value.detail
+
+
+def test_validate_image_content_returns_image_info():
+    """Test that valid content returns its structured header information"""
+    upload = create_upload("sign.png", "image/png")
+
+    info = validate_image_content(upload, create_image_bytes("PNG", size=(12, 5)))
+
+    assert info.to_dict() == {
+        "format": "png",
+        "width": 12,
+        "height": 5,
+        "color_type": "rgb",
+        "bit_depth": 8,
+        "progressive": False,
+        "orientation": 1,
+        "mime_type": "image/png",
+    }
@@ -0,0 +1,145 @@
+"""
+Tests for Job Queue
+Related Jira Tickets: RSCI-10, RSCI-12
+"""
+
+import asyncio
+
+import pytest
+from services.job_queue import ClassificationJobQueue, Job, QueueFullError
+from services.results_store import ResultsStore
+
+
+def test_jobs_move_from_queued_to_completed():
+    """Test that workers run queued jobs and record their results"""
+    queue = ClassificationJobQueue(workers=2, max_depth=10)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return {"classification": "Stop"}
+
+        job = await queue.submit("job-1", work)
+        assert job.status == Job.QUEUED
+        await asyncio.sleep(0)
+        assert queue.get("job-1").status == Job.RUNNING
+
+        release.set()
+        finished = await queue.wait("job-1", timeout=1)
+        await queue.stop()
+        return finished
+
+    job = asyncio.run(run())
+
+    assert job.status == Job.COMPLETED
+    assert job.result == {"classification": "Stop"}
+
+
+def test_failed_jobs_report_their_error():
+    """Test that exceptions are captured on the job"""
+    queue = ClassificationJobQueue(workers=1, max_depth=10)
+
+    async def run():
+        async def work():
+            raise ValueError("upstream exploded")
+
+        await queue.submit("job-1", work)
+        job = await queue.wait("job-1", timeout=1)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(run())
+
+    assert job.status == Job.FAILED
+    assert job.to_dict() == {"image_id": "job-1", "status": "failed", "error": "upstream exploded"}
+
+
+def test_submit_rejects_when_queue_is_full():
+    """Test that the queue depth is bounded"""
+    queue = ClassificationJobQueue(workers=1, max_depth=2)
+
+    async def run():
+        blocker = asyncio.Event()
+
+        async def work():
+            await blocker.wait()
+            return {}
+
+        await queue.submit("running", work)
+        await asyncio.sleep(0)  # the single worker picks up the first job
+        await queue.submit("queued-1", work)
+        await queue.submit("queued-2", work)
+        with pytest.raises(QueueFullError):
+            await queue.submit("overflow", work)
+        blocker.set()
+        await queue.stop()
+
+    asyncio.run(run())
+
+    assert queue.stats()["rejected"] == 1
+    assert queue.stats()["completed"] == 3
+
+
+def test_finished_jobs_are_retained_up_to_limit():
+    """Test that only the most recent finished jobs stay in memory"""
+    queue = ClassificationJobQueue(workers=1, max_depth=10, retain_finished=2)
+
+    async def run():
+        async def work():
+            return {}
+
+        for index in range(4):
+            await queue.submit(f"job-{index}", work)
+        await queue.stop()
+
+    asyncio.run(run())
+
+    assert queue.get("job-0") is None
+    assert queue.get("job-1") is None
+    assert queue.get("job-3").status == Job.COMPLETED
+
+
+def test_job_states_are_shared_through_the_store(tmp_path):
+    """Test that another worker process sees queued, running and failed jobs"""
+    path = str(tmp_path / "results.db")
+    store = ResultsStore(path)
+    other_worker = ResultsStore(path)
+    queue = ClassificationJobQueue(workers=1, max_depth=10, store=store)
+    seen = {}
+
+    async def run():
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return {}
+
+        async def fail():
+            raise ValueError("upstream exploded")
+
+        await queue.submit("job-1", work)
+        seen["submitted"] = other_worker.get_job("job-1").status
+        await asyncio.sleep(0)
+        store.flush()
+        seen["started"] = other_worker.get_job("job-1").status
+
+        await queue.submit("job-2", fail)
+        release.set()
+        await queue.stop()
+        store.flush()
+
+    asyncio.run(run())
+
+    assert seen == {"submitted": Job.QUEUED, "started": Job.RUNNING}
+    assert other_worker.get_job("job-1") is None  # completed: the result is stored instead
+    assert other_worker.get_job("job-2").to_dict() == {
+        "image_id": "job-2", "status": "failed", "error": "upstream exploded",
+    }
+
+    # A late "queued" write never hides a job that already started
+    store.save_job("job-2", Job.QUEUED)
+    assert other_worker.get_job("job-2").status == Job.FAILED
+    store.close()
+    other_worker.close()
@@ -0,0 +1,83 @@
+"""
+Tests for Label Index
+Related Jira Ticket: RSCI-10
+"""
+
+import pytest
+from services.classification_service import StubbedClassificationService
+from services.label_index import DEFAULT_ALIASES, LabelIndex, normalise_label
+
+
+def create_index() -> LabelIndex:
+    """Helper function to build an index over the default vocabulary"""
+    return LabelIndex(StubbedClassificationService.TRAFFIC_SIGNS, DEFAULT_ALIASES)
+
+
+def test_normalise_label_strips_case_units_and_filler():
+    """Test label normalisation"""
+    assert normalise_label("Speed limit 60 km/h") == "speed limit 60"
+    assert normalise_label("STOP sign!") == "stop"
+    assert normalise_label("60kmh") == "60"
+
+
+@pytest.mark.parametrize(
+    "label, canonical",
+    [
+        ("Speed limit 60 km/h", "Speed Limit 60"),
+        ("SPEED LIMIT 80", "Speed Limit 80"),
+        ("50 km/h", "Speed Limit 50"),
+        ("Give way", "Yield"),
+        ("no-entry", "No Entry"),
+        ("Pedestrian crosing", "Pedestrian Crossing"),
+        ("Stopp", "Stop"),
+    ],
+)
+def test_resolve_maps_variants_to_canonical_labels(label, canonical):
+    """Test exact, alias and fuzzy matches"""
+    assert create_index().resolve(label) == canonical
+
+
+def test_fuzzy_matching_never_changes_numbers():
+    """Test that a speed limit is not matched to a different speed limit"""
+    index = create_index()
+
+    assert index.resolve("Speed Limit 90") is None
+    assert index.resolve("Speed Limit 6") is None
+
+
+def test_canonicalise_merges_duplicate_labels():
+    """Test that predictions for the same canonical label are merged"""
+    predictions = [
+        {"sign": "Stop sign", "label": "Stop sign", "confidence": 0.6},
+        {"sign": "STOP", "label": "STOP", "confidence": 0.3},
+        {"sign": "Deer crossing", "label": "Deer crossing", "confidence": 0.1},
+    ]
+
+    canonical = create_index().canonicalise(predictions)
+
+    assert canonical == [
+        {"sign": "Stop", "label": "Stop", "confidence": 0.9},
+        {"sign": "Deer crossing", "label": "Deer crossing", "confidence": 0.1},
+    ]
+
+
+def test_resolve_counts_matches_and_memoises():
+    """Test the exact/fuzzy/unmatched counters, including memoised lookups"""
+    index = create_index()
+    for label in ("Stop", "Stopp", "Stopp", "Deer crossing"):
+        index.resolve(label)
+
+    assert index.stats() == {"labels": 15, "exact": 1, "fuzzy": 2, "unmatched": 1}
+
+
+def test_vocabulary_file_defines_labels_and_aliases(tmp_path, monkeypatch):
+    """Test loading the vocabulary from LABEL_VOCABULARY_PATH"""
+    vocabulary = tmp_path / "labels.txt"
+    vocabulary.write_text("Stop\nAnimal Crossing: deer crossing, wildlife\n", encoding="utf-8")
+    monkeypatch.setenv("LABEL_VOCABULARY_PATH", str(vocabulary))
+
+    index = LabelIndex.from_env(default_labels=["Unused"])
+
+    assert index.labels == ["Stop", "Animal Crossing"]
+    assert index.resolve("Wildlife") == "Animal Crossing"
+    assert index.resolve("Yield") is None
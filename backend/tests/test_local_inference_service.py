@@ -0,0 +1,128 @@
+"""
+Tests for Local Inference Service
+Related Jira Ticket: RSCI-10
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from io import BytesIO
+from PIL import Image
+from services.classification_service import UnifiedClassificationService
+from services.local_inference_service import LocalClassificationService
+from services.micro_batcher import MicroBatcher
+
+LABELS = ["Stop", "Yield", "No Entry", "Speed Limit 30", "Speed Limit 50", "Roundabout"]
+
+
+def create_model_file(tmp_path, input_size: tuple = (8, 8)) -> str:
+    """Helper function to save a two-layer NumPy model that prefers red images for "Stop" """
+    rng = np.random.default_rng(0)
+    features = input_size[0] * input_size[1] * 3
+    weights_0 = rng.normal(0, 0.01, (features, 16)).astype(np.float32)
+    weights_0[0::3, 0] = 1.0  # hidden unit 0 responds to the red channel
+    weights_1 = rng.normal(0, 0.01, (16, len(LABELS))).astype(np.float32)
+    weights_1[0, 0] = 1.0  # ...and drives the "Stop" output
+    path = tmp_path / "signs.npz"
+    np.savez(
+        path,
+        weights_0=weights_0,
+        bias_0=np.zeros(16, dtype=np.float32),
+        weights_1=weights_1,
+        bias_1=np.zeros(len(LABELS), dtype=np.float32),
+        labels=np.array(LABELS),
+        input_size=np.array(input_size),
+    )
+    return str(path)
+
+
+def create_image_bytes(color: tuple) -> bytes:
+    """Helper function to encode a solid-color JPEG"""
+    buffer = BytesIO()
+    Image.new("RGB", (40, 40), color=color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def test_classify_batch_returns_standard_result_shape(tmp_path):
+    """Test that local predictions use the classification/confidence/all_classes shape"""
+    service = LocalClassificationService(create_model_file(tmp_path))
+
+    results = service.classify_batch([create_image_bytes((255, 0, 0)), create_image_bytes((0, 0, 255))])
+
+    assert len(results) == 2
+    red = results[0]
+    assert red["classification"] == "Stop"
+    assert red["confidence"] == red["all_classes"][0]["confidence"]
+    assert len(red["all_classes"]) == 5
+    confidences = [item["confidence"] for item in red["all_classes"]]
+    assert confidences == sorted(confidences, reverse=True)
+    assert all(item["label"] in LABELS for item in red["all_classes"])
+
+
+def test_classify_batch_reports_undecodable_images(tmp_path):
+    """Test that one bad image does not fail the rest of the batch"""
+    service = LocalClassificationService(create_model_file(tmp_path))
+
+    results = service.classify_batch([b"not an image", create_image_bytes((255, 0, 0))])
+
+    assert isinstance(results[0], ValueError)
+    assert results[1]["classification"] == "Stop"
+
+
+def test_concurrent_classify_calls_share_one_forward_pass(tmp_path):
+    """Test that concurrent requests are micro-batched"""
+    service = LocalClassificationService(create_model_file(tmp_path), max_wait_seconds=0.05)
+    images = [create_image_bytes((255, 0, 0)) for _ in range(5)]
+
+    async def classify_all():
+        return await asyncio.gather(*(service.classify(image) for image in images))
+
+    results = asyncio.run(classify_all())
+
+    assert [result["classification"] for result in results] == ["Stop"] * 5
+    assert service.batcher.stats() == {"batches": 1, "items": 5, "average_batch_size": 5.0}
+
+
+def test_load_rejects_label_count_mismatch(tmp_path):
+    """Test that labels must match the model outputs"""
+    service = LocalClassificationService(create_model_file(tmp_path), labels=["Stop", "Yield"])
+
+    with pytest.raises(ValueError):
+        service.load()
+
+
+def test_unified_service_selects_local_backend(tmp_path, monkeypatch):
+    """Test that CLASSIFICATION_BACKEND=local routes requests to the local model"""
+    monkeypatch.setenv("CLASSIFICATION_BACKEND", "local")
+    monkeypatch.setenv("LOCAL_MODEL_PATH", create_model_file(tmp_path))
+    monkeypatch.delenv("GEMINI_API", raising=False)
+    service = UnifiedClassificationService()
+
+    async def run():
+        await service.startup()
+        return await service.classify(create_image_bytes((255, 0, 0)), "image/jpeg")
+
+    result = asyncio.run(run())
+
+    assert service.backend is service.local
+    assert result["classification"] == "Stop"
+    assert service.get_stats()["backend"] == "local"
+
+
+def test_micro_batcher_flushes_full_batches_immediately():
+    """Test that a full batch is processed without waiting for the window"""
+    batches = []
+
+    async def process(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(process, max_batch_size=3, max_wait_seconds=10)
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(3))), timeout=1
+        )
+
+    assert asyncio.run(run()) == [0, 2, 4]
+    assert batches == [[0, 1, 2]]
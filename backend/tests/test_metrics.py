@@ -0,0 +1,60 @@
+"""
+Tests for Metrics
+Related Jira Ticket: RSCI-10
+"""
+
+import pytest
+from services.metrics import MetricsRegistry
+
+
+def test_counter_renders_per_label_values():
+    """Test that counters keep one series per label set"""
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("backend",))
+
+    requests.inc(backend="gemini")
+    requests.inc(backend="gemini")
+    requests.inc(backend="stub")
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{backend="gemini"} 2' in text
+    assert 'requests_total{backend="stub"} 1' in text
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test that histogram buckets are cumulative and include +Inf, sum and count"""
+    registry = MetricsRegistry()
+    latency = registry.histogram("stage_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0))
+
+    latency.observe(0.05, stage="validate")
+    latency.observe(0.5, stage="validate")
+    latency.observe(3.0, stage="validate")
+
+    text = registry.render()
+    assert 'stage_seconds_bucket{stage="validate",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="validate",le="1"} 2' in text
+    assert 'stage_seconds_bucket{stage="validate",le="+Inf"} 3' in text
+    assert 'stage_seconds_sum{stage="validate"} 3.55' in text
+    assert 'stage_seconds_count{stage="validate"} 3' in text
+
+
+def test_gauge_tracks_in_flight_work():
+    """Test that the gauge is raised inside the block and restored afterwards"""
+    registry = MetricsRegistry()
+    in_flight = registry.gauge("in_flight", "In flight.", ("backend",))
+
+    with in_flight.track(backend="gemini"):
+        assert in_flight.value(backend="gemini") == 1
+    assert in_flight.value(backend="gemini") == 0
+
+
+def test_wrong_labels_are_rejected():
+    """Test that recording with missing labels fails loudly"""
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("backend",))
+
+    with pytest.raises(ValueError):
+        requests.inc()
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "Duplicate.")
@@ -0,0 +1,211 @@
+"""
+Tests for Perceptual Hash
+Related Jira Ticket: RSCI-10
+"""
+
+import asyncio
+import json
+import math
+import random
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+from services.classification_service import (
+    GeminiClassificationService,
+    UnifiedClassificationService,
+)
+from services.perceptual_hash import (
+    HASH_BITS,
+    THUMBNAIL_SIZE,
+    Fingerprint,
+    NearDuplicateIndex,
+    dhash,
+    fingerprint,
+    hamming_distance,
+)
+
+
+def encode(image: Image.Image, quality: int = 90) -> bytes:
+    """Helper function to encode a drawn frame as JPEG"""
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def create_frame(offset: int = 0, quality: int = 90, shape: str = "circle") -> bytes:
+    """Helper function to draw a sign-like frame, optionally shifted by a few pixels"""
+    image = Image.new("RGB", (160, 120), (90, 120, 160))
+    draw = ImageDraw.Draw(image)
+    box = (40 + offset, 20, 120 + offset, 100)
+    if shape == "circle":
+        draw.ellipse(box, fill=(200, 20, 30))
+        draw.rectangle((55 + offset, 52, 105 + offset, 68), fill=(250, 250, 250))
+    else:
+        draw.polygon([(80 + offset, 15), (125 + offset, 100), (35 + offset, 100)], fill=(250, 210, 0))
+    return encode(image, quality)
+
+
+def create_sign(kind: str, quality: int = 90) -> bytes:
+    """Helper function to draw a speed limit ("30", "80", ...), "stop" or "no_entry" sign"""
+    image = Image.new("RGB", (160, 160), (90, 120, 160))
+    draw = ImageDraw.Draw(image)
+    if kind == "stop":
+        corners = [math.radians(22.5 + 45 * index) for index in range(8)]
+        draw.polygon([(80 + 60 * math.cos(a), 80 + 60 * math.sin(a)) for a in corners], fill=(200, 20, 30))
+        draw.text((80, 80), "STOP", fill=(250, 250, 250), font=ImageFont.load_default(size=30), anchor="mm")
+    elif kind == "no_entry":
+        draw.ellipse((20, 20, 140, 140), fill=(200, 20, 30))
+        draw.rectangle((40, 70, 120, 90), fill=(250, 250, 250))
+    else:
+        draw.ellipse((20, 20, 140, 140), fill=(200, 20, 30))
+        draw.ellipse((36, 36, 124, 124), fill=(250, 250, 250))
+        draw.text((80, 80), kind, fill=(0, 0, 0), font=ImageFont.load_default(size=44), anchor="mm")
+    return encode(image, quality)
+
+
+def create_service(monkeypatch, labels: list) -> tuple:
+    """Helper function to build a unified service whose Gemini answers with ``labels`` in turn"""
+    monkeypatch.delenv("GEMINI_API", raising=False)
+    monkeypatch.setenv("NEAR_DUPLICATE_MAX_ENTRIES", "64")
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        label = labels[len(calls) % len(labels)]
+        calls.append(label)
+        text = json.dumps({"predictions": [{"label": label, "confidence": 0.9}]})
+        return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+    service = UnifiedClassificationService()
+    service.gemini = GeminiClassificationService(
+        api_key="test-key", client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    return service, calls
+
+
+def test_dhash_is_stable_across_recompression_and_small_motion():
+    """Test that near-identical frames have close hashes and different shapes do not"""
+    base = dhash(create_frame())
+
+    assert base.bit_length() <= HASH_BITS
+    assert hamming_distance(base, dhash(create_frame(quality=40))) <= 2
+    assert hamming_distance(base, dhash(create_frame(shape="triangle"))) > 20
+
+
+def test_dhash_skips_flat_and_undecodable_images():
+    """Test that images without structure are not hashed"""
+    buffer = BytesIO()
+    Image.new("RGB", (32, 32), (200, 30, 30)).save(buffer, format="PNG")
+
+    assert dhash(buffer.getvalue()) is None
+    assert dhash(b"not an image") is None
+
+
+def test_fingerprint_follows_exif_orientation():
+    """Test that a copy stored sideways with an Orientation tag matches the upright image"""
+    upright = Image.open(BytesIO(create_sign("stop")))
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    buffer = BytesIO()
+    # Orientation 6 is displayed after a 90 degree clockwise turn, so store it turned back
+    upright.rotate(90, expand=True).save(buffer, format="JPEG", quality=90, exif=exif.tobytes())
+
+    assert hamming_distance(dhash(create_sign("stop")), dhash(buffer.getvalue())) <= 8
+
+
+def test_index_finds_every_hash_within_the_distance():
+    """Test the multi-index lookup against random bit flips"""
+    rng = random.Random(7)
+    thumbnail = bytes(THUMBNAIL_SIZE * THUMBNAIL_SIZE)
+    index = NearDuplicateIndex(max_distance=8, max_entries=1000, frames_per_namespace=1000)
+    stored = [rng.getrandbits(HASH_BITS) for _ in range(200)]
+    for value in stored:
+        index.put("gemini:model:a", Fingerprint(value, thumbnail), {"classification": str(value)})
+
+    for value in stored[:50]:
+        flipped = value
+        for bit in rng.sample(range(HASH_BITS), 8):
+            flipped ^= 1 << bit
+        result, distance = index.get("gemini:model:a", Fingerprint(flipped, thumbnail))
+        assert result == {"classification": str(value)}
+        assert distance == 8
+
+    assert index.get("gemini:model:a", Fingerprint(stored[0] ^ 0x1FF, thumbnail)) is None
+    assert index.get("gemini:model:b", Fingerprint(stored[0], thumbnail)) is None
+
+
+def test_index_keeps_recent_frames_per_namespace_and_evicts_lru():
+    """Test that each namespace keeps its last frames and the index stays within max_entries"""
+    thumbnail = bytes(THUMBNAIL_SIZE * THUMBNAIL_SIZE)
+    index = NearDuplicateIndex(max_distance=2, max_entries=2)
+    index.put("a", Fingerprint(0xFFFF, thumbnail), {"id": 1})
+    index.put("a", Fingerprint(0xFFFF << 32, thumbnail), {"id": 2})
+    assert index.get("a", Fingerprint(0xFFFF, thumbnail)) is None
+    assert index.get("a", Fingerprint(0xFFFF << 32, thumbnail)) == ({"id": 2}, 0)
+
+    index.put("b", Fingerprint(0xFFFF, thumbnail), {"id": 3})
+    index.put("c", Fingerprint(0xFFFF, thumbnail), {"id": 4})
+    assert index.get("a", Fingerprint(0xFFFF << 32, thumbnail)) is None
+    assert index.stats()["entries"] == 2
+    assert index.stats()["evictions"] == 1
+
+    index.discard_namespace("b")
+    assert index.get("b", Fingerprint(0xFFFF, thumbnail)) is None
+    assert index.stats()["entries"] == 1
+
+
+SIGN_LABELS = {
+    "30": "Speed Limit 30",
+    "50": "Speed Limit 50",
+    "60": "Speed Limit 60",
+    "80": "Speed Limit 80",
+    "stop": "Stop",
+    "no_entry": "No Entry",
+}
+
+
+@pytest.mark.parametrize("first, second", [("30", "80"), ("30", "50"), ("80", "60"), ("stop", "no_entry")])
+def test_different_signs_never_reuse_each_others_result(monkeypatch, first, second):
+    """Test that signs sharing a shape and colour are classified separately"""
+    labels = [SIGN_LABELS[first], SIGN_LABELS[second]]
+    service, calls = create_service(monkeypatch, labels)
+
+    async def classify_both():
+        return [
+            await service.classify(create_sign(kind), "image/jpeg", session="stream")
+            for kind in (first, second)
+        ]
+
+    results = asyncio.run(classify_both())
+
+    assert calls == labels
+    assert [result["classification"] for result in results] == labels
+    assert not any(result.get("near_duplicate") for result in results)
+
+
+def test_unified_reuses_results_for_near_identical_frames_of_a_session(monkeypatch):
+    """Test that re-sent frames of one stream skip the upstream, and other uploads do not"""
+    service, calls = create_service(monkeypatch, ["Stop"])
+    frames = [create_frame(quality=70 + step) for step in range(5)]
+
+    async def classify_frames():
+        stream = [await service.classify(frame, "image/jpeg", session="stream") for frame in frames]
+        uploads = [await service.classify(frame, "image/jpeg") for frame in frames[1:3]]
+        other = await service.classify(frames[3], "image/jpeg", session="other-stream")
+        return stream, uploads, other
+
+    stream, uploads, other = asyncio.run(classify_frames())
+
+    assert stream[0].get("near_duplicate") is None
+    assert all(result["near_duplicate"] for result in stream[1:])
+    # Uploads and other sessions never share results by similarity
+    assert not any(result.get("near_duplicate") for result in uploads + [other])
+    assert service.get_stats()["near_duplicates"]["hits"] == 4
+
+
+def test_near_duplicate_index_is_disabled_by_default(monkeypatch):
+    """Test that the index is opt-in"""
+    monkeypatch.delenv("NEAR_DUPLICATE_MAX_ENTRIES", raising=False)
+    assert NearDuplicateIndex.from_env().enabled is False
+    assert fingerprint(create_frame()).thumbnail != b""
@@ -0,0 +1,112 @@
+"""
+Tests for Preprocessing Service
+Related Jira Ticket: RSCI-10
+"""
+
+import pytest
+from io import BytesIO
+from PIL import Image
+from services.image_inspection import inspect_image
+from services.preprocessing_service import ImagePreprocessor
+
+
+def create_image_bytes(image_format: str = "JPEG", mode: str = "RGB", size: tuple = (2000, 1000)) -> bytes:
+    """Helper function to encode a textured image that does not compress to nothing"""
+    image = Image.effect_noise((128, 128), 64).convert(mode).resize(size)
+    buffer = BytesIO()
+    save_args = {"quality": 95} if image_format == "JPEG" else {}
+    image.save(buffer, format=image_format, **save_args)
+    return buffer.getvalue()
+
+
+def test_preprocess_downscales_large_jpeg():
+    """Test that large images are shrunk to the maximum edge size"""
+    data = create_image_bytes("JPEG", size=(2000, 1000))
+    preprocessor = ImagePreprocessor(max_edge=256)
+
+    prepared = preprocessor.preprocess(data, inspect_image(data))
+
+    assert prepared.mime_type == "image/jpeg"
+    assert len(prepared.data) < len(data)
+    with Image.open(BytesIO(prepared.data)) as image:
+        assert max(image.size) <= 256
+    assert prepared.metadata["original_width"] == 2000
+    assert prepared.metadata["original_height"] == 1000
+    assert prepared.metadata["original_bytes"] == len(data)
+    assert prepared.metadata["bytes"] == len(prepared.data)
+    assert prepared.metadata["resized"] is True
+
+
+def test_preprocess_passes_small_images_through():
+    """Test that images within the limits are not re-encoded"""
+    data = create_image_bytes("PNG", size=(64, 64))
+    preprocessor = ImagePreprocessor(max_edge=256, max_bytes=len(data))
+
+    prepared = preprocessor.preprocess(data, inspect_image(data))
+
+    assert prepared.data is data
+    assert prepared.mime_type == "image/png"
+    assert prepared.metadata["resized"] is False
+
+
+def test_preprocess_converts_transparent_png_to_jpeg():
+    """Test that RGBA images are flattened and re-encoded as JPEG"""
+    data = create_image_bytes("PNG", mode="RGBA", size=(600, 600))
+    preprocessor = ImagePreprocessor(max_edge=128)
+
+    prepared = preprocessor.preprocess(data, inspect_image(data))
+
+    assert prepared.mime_type == "image/jpeg"
+    assert inspect_image(prepared.data).color_type == "ycbcr"
+
+
+def test_preprocess_meets_byte_budget():
+    """Test that quality is lowered to fit the byte budget"""
+    data = create_image_bytes("JPEG", size=(1024, 1024))
+    preprocessor = ImagePreprocessor(max_edge=512, jpeg_quality=95, max_bytes=60 * 1024)
+
+    prepared = preprocessor.preprocess(data, inspect_image(data))
+
+    assert len(prepared.data) <= 60 * 1024
+
+
+def test_preprocess_disabled_returns_original():
+    """Test that preprocessing can be switched off"""
+    data = create_image_bytes("JPEG", size=(1024, 512))
+    preprocessor = ImagePreprocessor(max_edge=128, enabled=False)
+
+    prepared = preprocessor.preprocess(data, inspect_image(data))
+
+    assert prepared.data is data
+
+
+def create_rotated_jpeg(size: tuple = (400, 200)) -> bytes:
+    """Helper function to encode a JPEG stored sideways with EXIF Orientation=6 (red left, blue right)"""
+    image = Image.new("RGB", size, (0, 0, 255))
+    image.paste((255, 0, 0), (0, 0, size[0] // 2, size[1]))
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("max_edge", [256, 1024])
+def test_preprocess_applies_exif_orientation(max_edge):
+    """Test that sideways phone photos are rotated upright, even when small enough to pass through"""
+    data = create_rotated_jpeg()
+    info = inspect_image(data)
+    assert info.orientation == 6
+    assert info.display_size == (200, 400)
+
+    prepared = ImagePreprocessor(max_edge=max_edge).preprocess(data, info)
+
+    assert prepared.metadata["original_width"] == 200
+    assert prepared.metadata["original_height"] == 400
+    with Image.open(BytesIO(prepared.data)) as image:
+        assert image.height > image.width
+        # Orientation 6 is a 90 degree clockwise turn: the stored left half ends up on top
+        top = image.getpixel((image.width // 2, image.height // 4))
+        bottom = image.getpixel((image.width // 2, image.height * 3 // 4))
+    assert top[0] > 200 and top[2] < 60
+    assert bottom[2] > 200 and bottom[0] < 60
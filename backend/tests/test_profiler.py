@@ -0,0 +1,134 @@
+"""
+Tests for the Sampling Profiler
+Related Jira Ticket: RSCI-10
+"""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from services.profiler import SamplingProfiler, parse_collapsed, profiling_service
+
+
+def busy_loop(stop: threading.Event) -> None:
+    """Helper function to keep a thread running Python code"""
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def enabled_profiler(monkeypatch, tmp_path):
+    """Helper function to enable the global profiling service with a temporary directory"""
+    monkeypatch.setattr(profiling_service, "token", "secret")
+    monkeypatch.setattr(profiling_service, "directory", str(tmp_path))
+    return profiling_service
+
+
+def test_sampler_records_stacks_of_running_threads():
+    """Test that a busy thread shows up in collapsed stacks with its thread name"""
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="busy-worker")
+    worker.start()
+    profiler = SamplingProfiler(interval=0.002).start()
+    time.sleep(0.2)
+    profiler.stop()
+    stop.set()
+    worker.join()
+
+    busy = [stack for stack in profiler.stacks if stack.startswith("busy-worker;")]
+    assert busy
+    assert "busy_loop (tests/test_profiler.py:" in busy[0]
+    assert profiler.summary()["samples"] > 0
+    assert parse_collapsed(profiler.collapsed()) == profiler.stacks
+
+
+def test_profile_routes_require_the_token(monkeypatch):
+    """Test that the routes are hidden without PROFILER_TOKEN and guarded with it"""
+    client = TestClient(app)
+    monkeypatch.setattr(profiling_service, "token", None)
+    assert client.get("/debug/profile", params={"seconds": 0.1}).status_code == 404
+
+    monkeypatch.setattr(profiling_service, "token", "secret")
+    response = client.get(
+        "/debug/profile", params={"seconds": 0.1}, headers={"X-Profiler-Token": "wrong"}
+    )
+    assert response.status_code == 403
+
+
+def test_profile_route_returns_collapsed_stacks(enabled_profiler):
+    """Test that a worker profile is returned as collapsed-stack text"""
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        response = TestClient(app).get(
+            "/debug/profile",
+            params={"seconds": 0.2, "scope": "all"},
+            headers={"X-Profiler-Token": "secret"},
+        )
+    finally:
+        stop.set()
+        worker.join()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.headers["x-profile-workers"] == "1"
+    assert any(line.startswith("busy-worker;") for line in response.text.splitlines())
+
+
+def test_second_all_worker_profile_is_rejected_while_one_runs(enabled_profiler):
+    """Test that concurrent scope=all profiles do not share the request file"""
+    client = TestClient(app)
+    params = {"seconds": 0.5, "scope": "all"}
+    headers = {"X-Profiler-Token": "secret"}
+    responses = []
+
+    first = threading.Thread(
+        target=lambda: responses.append(client.get("/debug/profile", params=params, headers=headers))
+    )
+    first.start()
+    lock_path = os.path.join(enabled_profiler.directory, "all-workers.lock")
+    deadline = time.monotonic() + 5
+    while not os.path.exists(lock_path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    second = client.get("/debug/profile", params=params, headers=headers)
+    first.join()
+
+    assert second.status_code == 409
+    assert responses[0].status_code == 200
+    assert not os.path.exists(lock_path)
+    assert client.get("/debug/profile", params={"seconds": 0.05, "scope": "all"},
+                      headers=headers).status_code == 200
+
+
+def test_request_profile_is_triggered_by_header(enabled_profiler):
+    """Test that X-Profile returns a profile id whose profile can be fetched"""
+    client = TestClient(app)
+    headers = {"X-Profiler-Token": "secret"}
+
+    response = client.get("/health", headers={**headers, "X-Profile": "1"})
+    profile_id = response.headers["x-profile-id"]
+
+    assert client.get(f"/debug/profile/{profile_id}", headers=headers).status_code == 200
+    assert client.get("/debug/profile/unknown", headers=headers).status_code == 404
+    assert "x-profile-id" not in client.get("/health", headers={"X-Profile": "1"}).headers
+
+
+def test_signal_handler_writes_the_requested_profile(enabled_profiler):
+    """Test that SIGUSR2 handling profiles for the requested run and writes the result"""
+    os.makedirs(enabled_profiler.directory, exist_ok=True)
+    with open(os.path.join(enabled_profiler.directory, "request.json"), "w") as f:
+        json.dump({"run_id": "run1", "seconds": 0.05, "created": time.time()}, f)
+
+    enabled_profiler._handle_signal(None, None)
+
+    path = os.path.join(enabled_profiler.directory, "runs", "run1", f"{os.getpid()}.folded")
+    deadline = time.monotonic() + 5
+    while not os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert os.path.exists(path)
@@ -0,0 +1,221 @@
+"""
+Tests for Quota Scheduler
+Related Jira Ticket: RSCI-10
+"""
+
+import asyncio
+from io import BytesIO
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from app import app
+from routes import classification_routes
+from services.classification_service import GeminiClassificationService
+from services.quota_scheduler import (
+    QuotaExceededError,
+    QuotaLane,
+    QuotaScheduler,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    """Manually advanced clock whose sleep advances time instead of waiting"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def create_scheduler(clock: FakeClock, keys=("key-aaaa",), rpm=0, tpm=0, max_wait=2.0) -> QuotaScheduler:
+    """Helper function to build a scheduler with one lane per key"""
+    lanes = [QuotaLane(key, "models/test", rpm, tpm, 100, clock=clock) for key in keys]
+    return QuotaScheduler(lanes, max_wait_seconds=max_wait, clock=clock, sleep=clock.sleep)
+
+
+def gemini_success(usage: dict = None) -> httpx.Response:
+    """Helper function to build a successful Gemini response"""
+    text = '{"predictions": [{"label": "Stop", "confidence": 0.9}]}'
+    body = {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+    if usage:
+        body["usageMetadata"] = usage
+    return httpx.Response(200, json=body)
+
+
+def test_token_bucket_refills_continuously():
+    """Test that a bucket refills at its per-minute rate and caps at capacity"""
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock)
+
+    bucket.take(60)
+    assert bucket.available() == 0
+    assert bucket.seconds_until(1) == 1
+
+    clock.now = 30
+    assert bucket.available() == 30
+    clock.now = 600
+    assert bucket.available() == 60
+
+
+def test_token_bucket_without_limit_is_unlimited():
+    """Test that a non-positive limit never throttles"""
+    bucket = TokenBucket(0)
+    bucket.take(1_000_000)
+    assert bucket.seconds_until(1_000_000) == 0
+    assert bucket.headroom() == 1.0
+
+
+def test_scheduler_spreads_load_across_lanes():
+    """Test that requests go to the lane with the most headroom"""
+    clock = FakeClock()
+    scheduler = create_scheduler(clock, keys=("key-aaaa", "key-bbbb"), rpm=10)
+
+    async def acquire_four():
+        return [await scheduler.acquire() for _ in range(4)]
+
+    leases = asyncio.run(acquire_four())
+
+    assert sorted(lease.api_key for lease in leases) == ["key-aaaa"] * 2 + ["key-bbbb"] * 2
+    assert [lane["admitted"] for lane in scheduler.stats()["lanes"]] == [2, 2]
+
+
+def test_scheduler_waits_for_capacity_then_sheds():
+    """Test that short waits are absorbed and longer ones raise QuotaExceededError"""
+    clock = FakeClock()
+    scheduler = create_scheduler(clock, rpm=60, max_wait=2.0)
+    scheduler.lanes[0].requests.take(60)
+
+    lease = asyncio.run(scheduler.acquire())
+    assert lease.api_key == "key-aaaa"
+    assert clock.sleeps == [1.0]
+
+    scheduler.lanes[0].requests.take(10)
+    with pytest.raises(QuotaExceededError) as error:
+        asyncio.run(scheduler.acquire())
+
+    assert error.value.retry_after == pytest.approx(11.0)
+    assert scheduler.stats()["waited"] == 1
+    assert scheduler.stats()["shed"] == 1
+
+
+def test_scheduler_corrects_token_estimate_from_usage():
+    """Test that reported usage settles the reservation and updates the estimate"""
+    clock = FakeClock()
+    scheduler = create_scheduler(clock, tpm=1000)
+    lane = scheduler.lanes[0]
+
+    lease = asyncio.run(scheduler.acquire(images=2))
+    assert lane.tokens.available() == 800
+
+    lease.complete({"totalTokenCount": 300})
+
+    assert lane.tokens.available() == 700
+    assert lane.tokens_used == 300
+    assert lane.tokens_per_image == pytest.approx(110.0)
+
+
+def test_failed_and_cancelled_calls_refund_their_reservation():
+    """Test that token reservations are returned when a call reports no usage"""
+    clock = FakeClock()
+    scheduler = create_scheduler(clock, tpm=1000)
+    lane = scheduler.lanes[0]
+    release = asyncio.Event()
+
+    def failing(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(400)
+
+    async def stalled(request: httpx.Request) -> httpx.Response:
+        await release.wait()
+        return gemini_success({"totalTokenCount": 120})
+
+    def create_service(handler) -> GeminiClassificationService:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return GeminiClassificationService(api_key="key-aaaa", client=client, scheduler=scheduler)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(create_service(failing).classify(b"image-bytes", "image/jpeg"))
+    assert lane.tokens.available() == 1000
+
+    async def cancel_in_flight():
+        task = asyncio.create_task(create_service(stalled).classify(b"image-bytes", "image/jpeg"))
+        await asyncio.sleep(0.01)
+        assert lane.tokens.available() == 900
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_in_flight())
+    assert lane.tokens.available() == 1000
+    assert lane.admitted == 2
+
+
+def test_quota_is_divided_between_worker_processes(monkeypatch):
+    """Test that each worker process gets its share of GEMINI_RPM and GEMINI_TPM"""
+    monkeypatch.setenv("GEMINI_RPM", "60")
+    monkeypatch.setenv("GEMINI_TPM", "12000")
+    monkeypatch.delenv("GEMINI_API_KEYS", raising=False)
+    monkeypatch.delenv("GEMINI_MODELS", raising=False)
+
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    lane = QuotaScheduler.from_env("key-aaaa", "models/test").lanes[0]
+    assert (lane.requests.capacity, lane.tokens.capacity) == (60, 12000)
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    lane = QuotaScheduler.from_env("key-aaaa", "models/test").lanes[0]
+    assert (lane.requests.capacity, lane.tokens.capacity) == (15, 3000)
+
+
+def test_lane_names_hide_api_keys():
+    """Test that stats never include a full API key"""
+    scheduler = create_scheduler(FakeClock(), keys=("secret-key-1234",))
+    assert scheduler.stats()["lanes"][0]["lane"] == "...1234:models/test"
+
+
+def test_gemini_moves_to_another_lane_after_429():
+    """Test that a rate-limited key is taken out of rotation for the retry"""
+    clock = FakeClock()
+    scheduler = create_scheduler(clock, keys=("key-aaaa", "key-bbbb"))
+    used_keys = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        used_keys.append(request.url.params["key"])
+        if len(used_keys) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.01"})
+        return gemini_success({"totalTokenCount": 120})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service = GeminiClassificationService(api_key="key-aaaa", client=client, scheduler=scheduler)
+
+    result = asyncio.run(service.classify(b"image-bytes", "image/jpeg"))
+
+    assert result["classification"] == "Stop"
+    assert len(set(used_keys)) == 2
+    stats = service.stats()["quota"]
+    assert sum(lane["rate_limited"] for lane in stats["lanes"]) == 1
+
+
+def test_classify_route_returns_429_when_quota_is_exhausted(monkeypatch):
+    """Test that shed requests are answered with 429 and Retry-After"""
+    async def exhausted(image_data, mime_type="image/jpeg", **kwargs):
+        raise QuotaExceededError("quota exhausted", retry_after=2.4)
+
+    monkeypatch.setattr(classification_routes.classification_service, "classify", exhausted)
+    buffer = BytesIO()
+    Image.new("RGB", (32, 32), color=(200, 30, 30)).save(buffer, format="JPEG")
+
+    response = TestClient(app).post(
+        "/api/classification/classify",
+        files={"file": ("sign.jpg", BytesIO(buffer.getvalue()), "image/jpeg")},
+    )
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
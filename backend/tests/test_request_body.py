@@ -0,0 +1,116 @@
+"""
+Tests for Streaming Request Body
+Related Jira Ticket: RSCI-10
+"""
+
+import asyncio
+import json
+import os
+
+import httpx
+import pytest
+from services.classification_service import GeminiClassificationService
+from services.metrics import stage_seconds
+from services.request_body import InlineData, JsonStreamBody
+
+
+def create_payload(image: bytes) -> dict:
+    """Helper function to build a generateContent payload with one image"""
+    return {
+        "contents": [
+            {
+                "role": "user",
+                "parts": [{"text": "Classify \"this\" sign ✓"}, {"inlineData": InlineData(image, "image/png")}],
+            }
+        ],
+        "generationConfig": {"temperature": 0.0, "candidateCount": 1, "stop": None},
+    }
+
+
+def serialise(payload: dict) -> bytes:
+    """Helper function to serialise a payload the non-streaming way"""
+    def default(value):
+        return value.to_json()
+
+    return json.dumps(payload, separators=(",", ":"), default=default).encode("utf-8")
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 47, 48 * 1024, 48 * 1024 + 1, 300_001])
+def test_streamed_body_matches_json_dumps(size):
+    """Test that the streamed body is byte-identical to json.dumps for any image size"""
+    payload = create_payload(os.urandom(size))
+    body = JsonStreamBody(payload)
+
+    streamed = body.to_bytes()
+
+    assert streamed == serialise(payload)
+    assert len(body) == len(streamed)
+    assert body.headers["Content-Length"] == str(len(streamed))
+
+
+def test_streamed_body_encodes_image_in_chunks():
+    """Test that a large image is emitted as several bounded chunks"""
+    body = JsonStreamBody(create_payload(os.urandom(10_000)), chunk_size=3000)
+
+    chunks = list(body.iter_chunks())
+
+    assert [len(chunk) for chunk in chunks].count(4000) == 3
+
+
+def test_encoding_time_is_measured_while_the_body_streams():
+    """Test that base64 time is counted when chunks are produced, once per send"""
+    body = JsonStreamBody(create_payload(os.urandom(3_000_000)))
+    assert body.encode_seconds == 0
+
+    body.to_bytes()
+    first = body.encode_seconds
+    body.to_bytes()
+
+    assert first > 0
+    assert body.encode_seconds > first
+
+
+def test_gemini_reports_encode_and_upstream_stages_separately():
+    """Test that each Gemini call observes the encode and upstream stages once"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        text = '{"predictions": [{"label": "Stop", "confidence": 0.9}]}'
+        return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service = GeminiClassificationService(api_key="test-key", client=client)
+    encodes, upstreams = stage_seconds.count(stage="encode"), stage_seconds.count(stage="upstream")
+
+    asyncio.run(service.classify(os.urandom(100_000), "image/png"))
+
+    assert stage_seconds.count(stage="encode") == encodes + 1
+    assert stage_seconds.count(stage="upstream") == upstreams + 1
+
+
+def test_streamed_body_rejects_chunk_sizes_that_break_base64():
+    """Test that chunk sizes must be a multiple of 3"""
+    with pytest.raises(ValueError):
+        JsonStreamBody({}, chunk_size=1000)
+
+
+def test_gemini_streams_body_with_content_length_and_resends_on_retry():
+    """Test that Gemini requests are not chunked and retries resend the same body"""
+    bodies = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert "transfer-encoding" not in request.headers
+        assert int(request.headers["content-length"]) == len(request.content)
+        bodies.append(request.content)
+        if len(bodies) == 1:
+            return httpx.Response(503)
+        text = '{"predictions": [{"label": "Stop", "confidence": 0.9}]}'
+        return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service = GeminiClassificationService(api_key="test-key", client=client)
+
+    result = asyncio.run(service.classify(b"\x89PNG image bytes", "image/png"))
+
+    assert result["classification"] == "Stop"
+    assert len(bodies) == 2 and bodies[0] == bodies[1]
+    part = json.loads(bodies[0])["contents"][0]["parts"][1]["inlineData"]
+    assert part == {"mimeType": "image/png", "data": "iVBORyBpbWFnZSBieXRlcw=="}
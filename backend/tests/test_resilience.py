@@ -0,0 +1,199 @@
+"""
+Tests for Resilience Helpers
+Related Jira Ticket: RSCI-10
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from services import resilience
+from services.classification_service import (
+    GeminiClassificationService,
+    UnifiedClassificationService,
+)
+from services.resilience import (
+    AdaptiveTimeout,
+    CircuitBreaker,
+    LatencyTracker,
+    RetryBudget,
+)
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def gemini_success() -> httpx.Response:
+    """Helper function to build a successful Gemini response"""
+    text = '{"predictions": [{"label": "Stop", "confidence": 0.9}]}'
+    return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+
+def test_breaker_opens_on_failure_rate_and_recovers_after_probe():
+    """Test closed -> open -> half-open -> closed transitions"""
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=4, window_size=4, open_seconds=30, clock=clock)
+
+    for _ in range(2):
+        breaker.record_success(0.1)
+    for _ in range(2):
+        breaker.record_failure(0.1)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request() is False
+
+    clock.now = 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False  # only one probe at a time
+
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_reopens_when_probe_fails():
+    """Test that a failed half-open probe opens the breaker again"""
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=1, window_size=1, open_seconds=10, clock=clock)
+    breaker.record_failure(0.1)
+    clock.now = 10
+    assert breaker.allow_request() is True
+
+    breaker.record_failure(0.1)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.snapshot()["times_opened"] == 2
+
+
+def test_breaker_opens_on_slow_calls():
+    """Test that successful but slow calls also open the breaker"""
+    breaker = CircuitBreaker(min_calls=3, window_size=3, slow_call_seconds=5, slow_call_rate_threshold=0.6)
+
+    for _ in range(3):
+        breaker.record_success(20.0)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_retry_budget_limits_retries_to_a_fraction_of_requests():
+    """Test that retries stop once the budget is spent"""
+    clock = FakeClock()
+    budget = RetryBudget(ratio=0.5, min_per_second=0, max_tokens=2, clock=clock)
+
+    assert budget.try_acquire() is True
+    assert budget.try_acquire() is True
+    assert budget.try_acquire() is False
+
+    budget.record_request()
+    budget.record_request()
+    assert budget.try_acquire() is True
+
+
+def test_adaptive_timeout_follows_observed_p99():
+    """Test that the timeout tracks recent latency within its bounds"""
+    tracker = LatencyTracker()
+    timeout = AdaptiveTimeout(tracker, min_seconds=1, max_seconds=45, multiplier=2, min_samples=10)
+
+    assert timeout.seconds == 45
+    for _ in range(10):
+        tracker.record(2.0)
+    assert timeout.seconds == 4.0
+
+    for _ in range(10):
+        tracker.record(0.01)
+    assert timeout.seconds == 4.0  # p99 still reflects the slow calls
+
+    tracker = LatencyTracker()
+    timeout = AdaptiveTimeout(tracker, min_seconds=1, max_seconds=45, multiplier=2, min_samples=1)
+    tracker.record(0.01)
+    assert timeout.seconds == 1
+
+
+def test_gemini_retries_transient_errors(monkeypatch):
+    """Test that 503 responses are retried with backoff"""
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: 0)
+    responses = [httpx.Response(503), httpx.Response(429), gemini_success()]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return responses.pop(0)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service = GeminiClassificationService(api_key="test-key", client=client)
+
+    result = asyncio.run(service.classify(b"image-bytes", "image/jpeg"))
+
+    assert result["classification"] == "Stop"
+    assert responses == []
+    assert service.retry_budget.stats()["retries"] == 2
+
+
+def test_gemini_retries_timeouts_and_records_them_as_slow(monkeypatch):
+    """Test that timed-out attempts are retried and count at the timeout in the latency window"""
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: 0)
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ReadTimeout("upstream too slow", request=request)
+        return gemini_success()
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service = GeminiClassificationService(api_key="test-key", client=client)
+    timeout = service.timeout.seconds
+
+    result = asyncio.run(service.classify(b"image-bytes", "image/jpeg"))
+
+    assert result["classification"] == "Stop"
+    assert len(calls) == 2
+    assert service.retry_budget.stats()["retries"] == 1
+    assert service.latency.count == 2
+    assert service.latency.percentile(99) == timeout
+
+
+def test_gemini_does_not_retry_client_errors():
+    """Test that non-retryable errors fail immediately"""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(400)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service = GeminiClassificationService(api_key="test-key", client=client)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(service.classify(b"image-bytes", "image/jpeg"))
+    assert len(calls) == 1
+
+
+def test_open_breaker_skips_upstream_and_reports_degraded(monkeypatch):
+    """Test that an open breaker answers from the fallback without calling Gemini"""
+    monkeypatch.delenv("GEMINI_API", raising=False)
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return gemini_success()
+
+    service = UnifiedClassificationService()
+    service.gemini = GeminiClassificationService(
+        api_key="test-key", client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    service.breaker = CircuitBreaker(min_calls=1, window_size=1)
+    service.breaker.record_failure(1.0)
+
+    result = asyncio.run(service.classify(b"image-bytes", "image/jpeg"))
+
+    assert calls == []
+    assert result["classification"] in service.stub.TRAFFIC_SIGNS
+    health = service.health()
+    assert health["degraded"] is True
+    assert health["circuit_breaker"]["state"] == "open"
@@ -0,0 +1,97 @@
+"""
+Tests for Result Cache
+Related Jira Ticket: RSCI-10
+"""
+
+import pytest
+from services.result_cache import ResultCache
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def create_result(label: str) -> dict:
+    """Helper function to build a classification result"""
+    return {
+        "classification": label,
+        "confidence": 0.9,
+        "all_classes": [{"sign": label, "label": label, "confidence": 0.9}],
+    }
+
+
+def test_key_depends_on_content_backend_and_model():
+    """Test that cache keys separate images, backends and models"""
+    key = ResultCache.make_key(b"image", "gemini", "model-a")
+
+    assert key == ResultCache.make_key(b"image", "gemini", "model-a")
+    assert key != ResultCache.make_key(b"other", "gemini", "model-a")
+    assert key != ResultCache.make_key(b"image", "gemini", "model-b")
+    assert key != ResultCache.make_key(b"image", "local", "model-a")
+
+
+def test_get_returns_independent_copy_and_counts_hits():
+    """Test that hits return copies and update counters"""
+    cache = ResultCache()
+    cache.put("key", create_result("Stop"))
+
+    first = cache.get("key")
+    first["classification"] = "mutated"
+
+    assert cache.get("key")["classification"] == "Stop"
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_evicts_least_recently_used_entry():
+    """Test LRU eviction when the entry limit is reached"""
+    cache = ResultCache(max_entries=2)
+    cache.put("a", create_result("Stop"))
+    cache.put("b", create_result("Yield"))
+    cache.get("a")
+    cache.put("c", create_result("No Entry"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_respects_byte_budget():
+    """Test that the byte budget bounds the cache size"""
+    cache = ResultCache(max_bytes=400)
+    for index in range(10):
+        cache.put(f"key-{index}", create_result(f"Sign {index}"))
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 400
+    assert stats["entries"] < 10
+
+
+def test_expires_entries_after_ttl():
+    """Test that entries are dropped once their TTL has elapsed"""
+    clock = FakeClock()
+    cache = ResultCache(ttl_seconds=10, clock=clock)
+    cache.put("key", create_result("Stop"))
+
+    clock.now = 9.9
+    assert cache.get("key") is not None
+    clock.now = 10.0
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_disabled_cache_stores_nothing():
+    """Test that a zero entry limit disables caching"""
+    cache = ResultCache(max_entries=0)
+    cache.put("key", create_result("Stop"))
+
+    assert cache.get("key") is None
@@ -0,0 +1,116 @@
+"""
+Tests for Results Store
+Related Jira Tickets: RSCI-12, RSCI-14
+"""
+
+import sqlite3
+
+import pytest
+from services.results_store import ResultsStore
+
+
+def create_result(label: str, confidence: float = 0.9) -> dict:
+    """Helper function to build a classification result"""
+    return {
+        "classification": label,
+        "confidence": confidence,
+        "all_classes": [{"sign": label, "label": label, "confidence": confidence}],
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    results = ResultsStore(str(tmp_path / "results.db"))
+    yield results
+    results.close()
+
+
+def test_get_returns_recorded_result_before_and_after_commit(store):
+    """Test that results can be read back immediately and once committed"""
+    store.record("image-1", create_result("Stop"), filename="stop.jpg")
+
+    assert store.get("image-1")["classification"] == "Stop"
+
+    store.flush()
+    entry = store.get("image-1")
+    assert entry["classification"] == "Stop"
+    assert entry["filename"] == "stop.jpg"
+    assert entry["all_classes"][0]["label"] == "Stop"
+    assert store.get("missing") is None
+
+
+def test_writes_are_batched(store):
+    """Test that queued results are committed together"""
+    for index in range(50):
+        store.record(f"image-{index}", create_result("Stop"))
+    store.flush()
+
+    stats = store.stats()
+    assert stats["writes"] == 50
+    assert stats["write_batches"] < 50
+    assert stats["pending"] == 0
+
+
+def test_history_uses_keyset_pagination(store):
+    """Test that history pages are newest first and follow the cursor"""
+    for index in range(5):
+        store.record(f"image-{index}", create_result("Stop"))
+    store.flush()
+
+    first_page, cursor = store.history(limit=2)
+    second_page, cursor = store.history(limit=2, cursor=cursor)
+    last_page, end_cursor = store.history(limit=2, cursor=cursor)
+
+    ids = [entry["image_id"] for entry in first_page + second_page + last_page]
+    assert ids == ["image-4", "image-3", "image-2", "image-1", "image-0"]
+    assert end_cursor is None
+
+
+def test_history_filters_by_label_and_time(store):
+    """Test label and timestamp filters"""
+    store.record("stop", create_result("Stop"))
+    store.record("yield", create_result("Yield"))
+    store.flush()
+    created_at = store.get("yield")["created_at"]
+
+    labelled, _ = store.history(label="Yield")
+    recent, _ = store.history(since=created_at)
+    older, _ = store.history(until=created_at)
+
+    assert [entry["image_id"] for entry in labelled] == ["yield"]
+    assert "yield" in [entry["image_id"] for entry in recent]
+    assert [entry["image_id"] for entry in older] == ["stop"]
+
+
+def test_database_uses_wal_and_indexes(store, tmp_path):
+    """Test that the store is created in WAL mode with lookup indexes"""
+    store.record("image-1", create_result("Stop"))
+    store.flush()
+
+    connection = sqlite3.connect(str(tmp_path / "results.db"))
+    journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+    indexes = {row[1] for row in connection.execute("PRAGMA index_list(classifications)")}
+    plan = connection.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM classifications WHERE image_id = ?", ("image-1",)
+    ).fetchall()
+    connection.close()
+
+    assert journal_mode == "wal"
+    assert {
+        "idx_classifications_image_id",
+        "idx_classifications_created_at",
+        "idx_classifications_label",
+    } <= indexes
+    assert "idx_classifications_image_id" in plan[0][-1]
+
+
+def test_results_survive_restart(tmp_path):
+    """Test that committed results persist across store instances"""
+    path = str(tmp_path / "results.db")
+    first = ResultsStore(path)
+    first.record("image-1", create_result("Stop"))
+    first.close()
+
+    second = ResultsStore(path)
+    assert second.get("image-1")["classification"] == "Stop"
+    second.close()
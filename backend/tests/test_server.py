@@ -0,0 +1,97 @@
+"""
+Tests for the Production Server Launcher
+Related Jira Ticket: RSCI-10
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+import server
+
+
+def free_port() -> int:
+    """Helper function to find an unused local port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_workers_default_to_cpu_count(monkeypatch):
+    """Test that the worker count comes from WEB_CONCURRENCY or the CPU count"""
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setattr(server.os, "cpu_count", lambda: 6)
+    assert server.parse_args([]).workers == 6
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert server.parse_args([]).workers == 3
+    assert server.parse_args(["--workers", "2"]).workers == 2
+
+
+def test_loop_and_parser_fall_back_when_not_installed(monkeypatch):
+    """Test that auto selects uvloop/httptools only when they are importable"""
+    monkeypatch.setattr(server, "_installed", lambda module: False)
+    assert server.resolve_loop("auto") == "asyncio"
+    assert server.resolve_http("auto") == "h11"
+
+    monkeypatch.setattr(server, "_installed", lambda module: True)
+    monkeypatch.setattr(server.sys, "platform", "linux")
+    assert server.resolve_loop("auto") == "uvloop"
+    assert server.resolve_http("auto") == "httptools"
+    assert server.resolve_loop("asyncio") == "asyncio"
+
+
+def test_uvicorn_config_enables_warm_up_and_draining(monkeypatch):
+    """Test the launcher's uvicorn settings and the worker environment"""
+    monkeypatch.setenv("WARMUP_ON_START", "0")
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+    args = server.parse_args(["--workers", "4", "--graceful-timeout", "12", "--max-requests", "1000"])
+
+    server.prepare_environment(args)
+    config = server.uvicorn_config(args)
+
+    assert os.environ["WARMUP_ON_START"] == "1"
+    assert os.environ["WEB_CONCURRENCY"] == "4"
+    assert config["app"] == "app:app"
+    assert config["workers"] == 4
+    assert config["lifespan"] == "on"
+    assert config["timeout_graceful_shutdown"] == 12
+    assert config["limit_max_requests"] == 1000
+    assert server.gunicorn_options(args)["graceful_timeout"] == 12
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses SIGTERM")
+def test_server_serves_with_several_workers_and_stops_cleanly(tmp_path):
+    """Test a real two-worker launch and a graceful SIGTERM shutdown"""
+    port = free_port()
+    env = dict(os.environ, RESULTS_DB_PATH=str(tmp_path / "results.db"))
+    env.pop("GEMINI_API", None)
+    process = subprocess.Popen(
+        [sys.executable, "server.py", "--workers", "2", "--port", str(port),
+         "--host", "127.0.0.1", "--log-level", "warning"],
+        cwd=os.path.dirname(server.__file__),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            assert process.poll() is None, "server exited during startup"
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+                break
+            except httpx.TransportError:
+                assert time.monotonic() < deadline, "server did not start"
+                time.sleep(0.1)
+        assert response.status_code == 200
+    finally:
+        process.send_signal(signal.SIGTERM)
+        returncode = process.wait(timeout=30)
+
+    assert returncode == 0
@@ -0,0 +1,165 @@
+"""
+Tests for Sign Detection
+Related Jira Ticket: RSCI-10
+"""
+
+import asyncio
+import json
+from io import BytesIO
+
+import httpx
+from fastapi.testclient import TestClient
+from PIL import Image, ImageDraw
+
+from app import app
+from routes import classification_routes
+from services.classification_service import (
+    GeminiClassificationService,
+    UnifiedClassificationService,
+)
+from services.sign_detection import SignDetector, _components
+
+
+def create_scene(signs: bool = True) -> bytes:
+    """Helper function to draw a street scene with a red, a blue and a yellow sign"""
+    image = Image.new("RGB", (1280, 720), (110, 120, 110))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, 1280, 220), fill=(160, 185, 210))
+    if signs:
+        draw.ellipse((100, 300, 260, 460), fill=(250, 250, 250), outline=(220, 20, 30), width=18)
+        draw.rectangle((600, 250, 720, 370), fill=(20, 60, 200))
+        draw.polygon([(1000, 500), (1100, 330), (1200, 500)], fill=(250, 210, 0))
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def overlaps(bbox: dict, box: tuple) -> bool:
+    """Helper function to check that a detected bbox covers most of a drawn box"""
+    left, top, right, bottom = box
+    width = min(bbox["x"] + bbox["width"], right) - max(bbox["x"], left)
+    height = min(bbox["y"] + bbox["height"], bottom) - max(bbox["y"], top)
+    return width > 0.8 * (right - left) and height > 0.8 * (bottom - top)
+
+
+def test_components_labels_connected_runs():
+    """Test that diagonal neighbours join and separate blobs stay apart"""
+    import numpy as np
+
+    mask = np.zeros((6, 8), dtype=bool)
+    mask[0, 0] = mask[1, 1] = mask[2, 2] = True
+    mask[3:6, 5:8] = True
+    mask[4, 6] = False
+
+    components = sorted(_components(mask))
+
+    assert components == [(0, 0, 3, 3, 3), (3, 5, 6, 8, 8)]
+    assert _components(np.zeros((4, 4), dtype=bool)) == []
+
+
+def test_detector_finds_each_sign_and_crops_it():
+    """Test that red, blue and yellow signs are proposed with boxes in original pixels"""
+    regions = SignDetector().detect(create_scene(), (1280, 720))
+
+    by_color = {region.color: region for region in regions}
+    assert set(by_color) == {"red", "blue", "yellow"}
+    assert overlaps(by_color["red"].bbox, (100, 300, 260, 460))
+    assert overlaps(by_color["blue"].bbox, (600, 250, 720, 370))
+    assert overlaps(by_color["yellow"].bbox, (1000, 330, 1200, 500))
+    with Image.open(BytesIO(by_color["red"].crop)) as crop:
+        assert crop.size == (224, 224)
+
+
+def test_detector_ignores_scenes_without_signs():
+    """Test that unsaturated sky and road produce no regions"""
+    assert SignDetector().detect(create_scene(signs=False), (1280, 720)) == []
+
+
+def test_classify_many_sends_crops_in_one_request(monkeypatch):
+    """Test that uncached crops are classified with a single packed Gemini call"""
+    monkeypatch.delenv("GEMINI_API", raising=False)
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(1)
+        text = json.dumps([
+            {"index": 0, "predictions": [{"label": "Stop", "confidence": 0.9}]},
+            {"index": 1, "predictions": [{"label": "Yield", "confidence": 0.8}]},
+        ])
+        return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+    service = UnifiedClassificationService()
+    service.gemini = GeminiClassificationService(
+        api_key="test-key", client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    images = [(b"first crop", "image/jpeg"), (b"second crop", "image/jpeg")]
+
+    results = asyncio.run(service.classify_many(images))
+    cached = asyncio.run(service.classify_many(images))
+
+    assert len(requests) == 1
+    assert [result["classification"] for result in results] == ["Stop", "Yield"]
+    assert cached == results
+
+
+def test_classify_many_joins_crops_already_in_flight(monkeypatch):
+    """Test that repeated crops are packed once and crops in flight elsewhere are joined"""
+    monkeypatch.delenv("GEMINI_API", raising=False)
+    images_per_request = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        parts = json.loads(await request.aread())["contents"][0]["parts"]
+        images_per_request.append(sum("inlineData" in part for part in parts))
+        await asyncio.sleep(0.05)
+        text = '{"predictions": [{"label": "Stop", "confidence": 0.9}]}'
+        return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+    service = UnifiedClassificationService()
+    service.gemini = GeminiClassificationService(
+        api_key="test-key", client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    crops = [(b"shared crop", "image/jpeg"), (b"other crop", "image/jpeg"), (b"other crop", "image/jpeg")]
+
+    async def run():
+        single = asyncio.ensure_future(service.classify(b"shared crop", "image/jpeg"))
+        await asyncio.sleep(0)  # the single upload is in flight first
+        return await asyncio.gather(single, service.classify_many(crops))
+
+    single, results = asyncio.run(run())
+
+    assert images_per_request == [1, 1]
+    assert [result["classification"] for result in results] == ["Stop"] * 3
+    assert results[0] == single
+    assert service.inflight.stats()["coalesced"] == 1
+
+
+def test_scene_route_returns_a_result_per_sign(monkeypatch):
+    """Test the scene endpoint, including the full-frame fallback"""
+    batches = []
+
+    async def classify_many(images):
+        batches.append(len(images))
+        return [
+            {"classification": "Stop", "confidence": 0.9, "all_classes": []} for _ in images
+        ]
+
+    monkeypatch.setattr(classification_routes.classification_service, "classify_many", classify_many)
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/classification/classify/scene",
+        files={"file": ("scene.jpg", create_scene(), "image/jpeg")},
+    )
+    empty = client.post(
+        "/api/classification/classify/scene",
+        files={"file": ("empty.jpg", create_scene(signs=False), "image/jpeg")},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["detected"] == 3
+    assert {sign["color"] for sign in body["signs"]} == {"red", "blue", "yellow"}
+    assert set(body["signs"][0]) == {"bbox", "classification", "confidence", "color"}
+    assert empty.json()["signs"][0]["bbox"] == {"x": 0, "y": 0, "width": 1280, "height": 720}
+    assert empty.json()["detected"] == 0
+    assert batches == [3, 1]
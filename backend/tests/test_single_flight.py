@@ -0,0 +1,93 @@
+"""
+Tests for Single Flight
+Related Jira Ticket: RSCI-10
+"""
+
+import asyncio
+
+import pytest
+from services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    """Test that callers with the same key receive the same result from one call"""
+    flight = SingleFlight()
+    calls = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def work():
+            calls.append(1)
+            await release.wait()
+            return {"classification": "Stop"}
+
+        waiters = [asyncio.ensure_future(flight.do("key", work)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*waiters)
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(result == {"classification": "Stop"} for result in results)
+    assert flight.stats()["executions"] == 1
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_errors_propagate_to_every_waiter():
+    """Test that a failed execution raises the same error to all callers"""
+    flight = SingleFlight()
+
+    async def run():
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream exploded")
+
+        return await asyncio.gather(
+            flight.do("key", work), flight.do("key", work), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.stats()["executions"] == 1
+
+
+def test_different_keys_and_later_calls_run_separately():
+    """Test that keys are independent and released once the work finishes"""
+    flight = SingleFlight()
+
+    async def run():
+        async def work():
+            await asyncio.sleep(0)
+            return "done"
+
+        await asyncio.gather(flight.do("a", work), flight.do("b", work))
+        await flight.do("a", work)
+
+    asyncio.run(run())
+
+    assert flight.stats()["executions"] == 3
+    assert flight.stats()["coalesced"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    """Test that other waiters still get the result when the first caller is cancelled"""
+    flight = SingleFlight()
+
+    async def run():
+        async def work():
+            await asyncio.sleep(0.01)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("key", work))
+        second = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
@@ -0,0 +1,192 @@
+"""
+Tests for Stream Service
+Related Jira Ticket: RSCI-10
+"""
+
+import asyncio
+from io import BytesIO
+
+from fastapi.testclient import TestClient
+from PIL import Image
+from app import app
+from services.stream_service import FrameStreamSession, LatestFrameSlot, TemporalSmoother
+
+
+def create_result(label: str, confidence: float) -> dict:
+    """Helper function to build a classification result"""
+    return {
+        "classification": label,
+        "confidence": confidence,
+        "all_classes": [{"sign": label, "label": label, "confidence": confidence}],
+    }
+
+
+def create_frame_bytes() -> bytes:
+    """Helper function to encode a small JPEG frame"""
+    buffer = BytesIO()
+    Image.new("RGB", (32, 32), color=(200, 30, 30)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def test_latest_frame_slot_keeps_only_the_newest_frame():
+    """Test that unclaimed frames are replaced and counted as dropped"""
+    async def scenario():
+        slot = LatestFrameSlot()
+        slot.put((1, b"a", 0.0))
+        slot.put((2, b"b", 0.0))
+        slot.put((3, b"c", 0.0))
+        first = await slot.get()
+        slot.close()
+        return first, await slot.get(), slot.dropped
+
+    assert asyncio.run(scenario()) == ((3, b"c", 0.0), None, 2)
+
+
+def test_smoother_votes_over_the_window():
+    """Test that a single flickering frame does not change the label"""
+    smoother = TemporalSmoother(window=3)
+
+    smoother.update(create_result("Stop", 0.9))
+    smoother.update(create_result("Stop", 0.8))
+    smoothed = smoother.update(create_result("Yield", 0.95))
+
+    assert smoothed["classification"] == "Stop"
+    assert smoothed["confidence"] == round(1.7 / 3, 3)
+    assert smoother.update(create_result("Yield", 0.9))["classification"] == "Yield"
+
+
+def test_session_drops_stale_frames_when_classification_is_slow():
+    """Test that a fast sender gets results for the latest frames with bounded latency"""
+    sent = []
+
+    async def slow_classify(data: bytes) -> dict:
+        await asyncio.sleep(0.05)
+        return create_result(data.decode(), 0.9)
+
+    async def scenario():
+        frames = [str(index).encode() for index in range(1, 21)]
+
+        async def send(message):
+            sent.append(message)
+
+        async def receive():
+            if frames:
+                await asyncio.sleep(0.005)
+                return frames.pop(0)
+            # Keep the connection open until the last frame's result is sent
+            while not sent or sent[-1]["frame"] != 20:
+                await asyncio.sleep(0.01)
+            return None
+
+        session = FrameStreamSession(slow_classify, send, lambda exc: {"detail": str(exc)}, window=3)
+        await session.run(receive)
+        return session.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["received"] == 20
+    assert stats["classified"] < 10
+    assert stats["dropped"] == 20 - stats["classified"]
+    assert sent[-1]["frame"] == 20
+    assert max(message["latency_ms"] for message in sent) < 200
+
+
+def test_session_reports_errors_and_continues():
+    """Test that a failing frame is answered with an error message"""
+    sent = []
+
+    async def classify(data: bytes) -> dict:
+        if data == b"bad":
+            raise ValueError("broken frame")
+        return create_result("Stop", 0.9)
+
+    async def scenario():
+        frames = [b"bad", b"good"]
+
+        async def send(message):
+            sent.append(message)
+
+        async def receive():
+            while len(sent) < 2 - len(frames):
+                await asyncio.sleep(0.001)
+            return frames.pop(0) if frames else None
+
+        session = FrameStreamSession(classify, send, lambda exc: {"detail": str(exc)})
+        await session.run(receive)
+
+    asyncio.run(scenario())
+
+    assert sent == [
+        {"type": "error", "frame": 1, "detail": "broken frame"},
+        {
+            "type": "result",
+            "frame": 2,
+            "classification": "Stop",
+            "confidence": 0.9,
+            "frames": 1,
+            "frame_classification": "Stop",
+            "frame_confidence": 0.9,
+            "near_duplicate": False,
+            "latency_ms": sent[1]["latency_ms"],
+            "dropped": 0,
+        },
+    ]
+
+
+def test_session_sends_one_message_at_a_time():
+    """Test that the reader's messages and the worker's results never overlap on the socket"""
+    active = []
+    overlaps = []
+    sent = []
+
+    async def classify(data: bytes) -> dict:
+        return create_result("Stop", 0.9)
+
+    async def scenario():
+        frames = [b"one", b"two", b"three"]
+
+        async def send(message):
+            if active:
+                overlaps.append(message)
+            active.append(message)
+            await asyncio.sleep(0.01)
+            active.remove(message)
+            sent.append(message)
+
+        session = FrameStreamSession(classify, send, lambda exc: {"detail": str(exc)})
+
+        async def receive():
+            if frames:
+                # The reader reports a bad message while a result is being sent
+                await session.send({"type": "error", "status": 400})
+                return frames.pop(0)
+            while sum(message["type"] == "result" for message in sent) < 3:
+                await asyncio.sleep(0.005)
+            return None
+
+        await session.run(receive)
+
+    asyncio.run(scenario())
+
+    assert overlaps == []
+    assert sum(message["type"] == "result" for message in sent) == 3
+
+
+def test_stream_endpoint_classifies_frames_and_rejects_bad_messages():
+    """Test the WebSocket endpoint end to end with the stubbed classifier"""
+    client = TestClient(app)
+    with client.websocket_connect("/api/classification/stream?window=3") as websocket:
+        websocket.send_bytes(create_frame_bytes())
+        result = websocket.receive_json()
+        assert result["type"] == "result"
+        assert result["frame"] == 1
+        assert 0 <= result["confidence"] <= 1
+
+        websocket.send_bytes(b"not an image")
+        error = websocket.receive_json()
+        assert error["type"] == "error"
+        assert error["frame"] == 2
+        assert error["status"] == 400
+
+        websocket.send_text("hello")
+        assert websocket.receive_json()["status"] == 400
@@ -6,7 +6,7 @@ Related Jira Ticket: RSCI-7
 import pytest
 from fastapi import UploadFile, HTTPException
 from io import BytesIO
-from services.validation_service import validate_file_size
+from services.validation_service import validate_file_size, read_validated_upload
 
 
 def create_test_file(filename: str, content_size_bytes: int, content_type: str = "image/jpeg") -> UploadFile:
@@ -73,3 +73,72 @@ def test_validate_file_size_preserves_file_pointer():
     # File should be readable again (pointer reset)
     assert file.file.readable()
 
+
+
+class TrackingStream:
+    """Non-seekable stream that records how many bytes were read"""
+
+    def __init__(self, size: int):
+        self.remaining = size
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            size = self.remaining
+        size = min(size, self.remaining)
+        self.remaining -= size
+        self.bytes_read += size
+        return b"x" * size
+
+    def tell(self) -> int:
+        raise OSError("stream is not seekable")
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return 0
+
+
+def test_read_validated_upload_returns_content():
+    """Test that the validated content is returned in one pass"""
+    file = create_test_file("test.jpg", 1024)
+
+    content = read_validated_upload(file)
+
+    assert content == b"x" * 1024
+    assert file.file.tell() == 0
+
+
+def test_read_validated_upload_rejects_known_oversize_without_reading():
+    """Test that oversized uploads with a known size are rejected before reading"""
+    file = create_test_file("test.jpg", 11 * 1024 * 1024)
+    file.size = 11 * 1024 * 1024
+    reads = []
+    original_read = file.file.read
+    file.file.read = lambda *args: reads.append(args) or original_read(*args)
+
+    with pytest.raises(HTTPException) as exc_info:
+        read_validated_upload(file)
+
+    assert exc_info.value.status_code == 413
+    assert reads == []
+
+
+def test_read_validated_upload_stops_streaming_once_over_limit():
+    """Test that unknown-size uploads are aborted as soon as the limit is crossed"""
+    stream = TrackingStream(50 * 1024 * 1024)
+    file = UploadFile(filename="test.jpg", file=stream)
+
+    with pytest.raises(HTTPException) as exc_info:
+        read_validated_upload(file)
+
+    assert exc_info.value.status_code == 413
+    assert stream.bytes_read <= 10 * 1024 * 1024 + 64 * 1024
+
+
+def test_read_validated_upload_rejects_empty_file():
+    """Test that empty uploads are rejected (RSCI-9)"""
+    file = create_test_file("test.jpg", 0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        read_validated_upload(file)
+
+    assert exc_info.value.status_code == 400